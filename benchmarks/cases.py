@@ -0,0 +1,170 @@
+"""ベンチマーク対象の定義（ホットパスごとに1ケース）
+
+各ケースは「準備（計測外）」を行い、計測対象の引数なし関数を返す。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import copy
+import json
+import random
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from share_cycle_monitor.fetch_direct import COMMON_KEYWORDS, extract_info, extract_update_date
+from share_cycle_monitor.fetch_google import extract_prefecture, parse_search_result
+from share_cycle_monitor.fetch_kkj import parse_xml_response
+from share_cycle_monitor.main import deduplicate_by_url, load_json, merge_results, save_json
+from share_cycle_monitor.config import NOTIFY
+from share_cycle_monitor.digests import CandidateIndex, SentLedger, first_day
+from share_cycle_monitor.notifier import build_notification, render
+from share_cycle_monitor.profiles import Matcher, load as load_profiles
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# name -> setup(scale) -> 計測対象の関数
+CASES: Dict[str, Callable[[int], Callable[[], Any]]] = {}
+
+
+def case(name: str):
+    """ベンチマークケースを登録するデコレータ"""
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+def read_fixture(name: str) -> str:
+    """フィクスチャファイルを文字列で読み込み"""
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def scaled_results(scale: int, duplicate_ratio: float = 0.1, seed: int = 26) -> List[Dict[str, Any]]:
+    """results_sample.json を指定件数まで合成的に拡大（URL重複を一定割合含む）"""
+    rnd = random.Random(seed)
+    base = json.loads(read_fixture("results_sample.json"))
+    records = []
+    for i in range(scale):
+        if records and rnd.random() < duplicate_ratio:
+            records.append(copy.copy(rnd.choice(records)))
+            continue
+        record = dict(base[i % len(base)])
+        record["url"] = f"{record['url']}#bench-{i}"
+        records.append(record)
+    return records
+
+
+@case("extract_info")
+def bench_extract_info(scale: int) -> Callable[[], Any]:
+    html = read_fixture("municipal_proposal.html")
+    page_config = {
+        "url": "https://www.city.taito.lg.jp/jigyosha/keiyaku/proposal/index.html",
+        "prefecture": "東京",
+        "organization": "台東区",
+        "keywords": COMMON_KEYWORDS,
+    }
+    return lambda: extract_info(html, page_config)
+
+
+@case("extract_update_date")
+def bench_extract_update_date(scale: int) -> Callable[[], Any]:
+    # 日付パターンが本文末尾にしかない（正規表現が全文を走査する）最悪ケースを計測
+    html = read_fixture("municipal_proposal.html").replace("更新日：2026年2月5日", "")
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.find("div", {"id": "content"}).get_text(" ", strip=True) + " 2026-02-05"
+    return lambda: extract_update_date(soup, text)
+
+
+@case("parse_xml_response")
+def bench_parse_xml_response(scale: int) -> Callable[[], Any]:
+    xml_text = read_fixture("kkj_response.xml")
+    return lambda: parse_xml_response(xml_text)
+
+
+@case("parse_search_result")
+def bench_parse_search_result(scale: int) -> Callable[[], Any]:
+    raw = read_fixture("cse_response.json")
+
+    def run():
+        results = []
+        for item in json.loads(raw).get("items", []):
+            result = parse_search_result(item)
+            result["prefecture"] = extract_prefecture(result["title"] + result["snippet"] + result["url"])
+            results.append(result)
+        return results
+    return run
+
+
+@case("merge_results")
+def bench_merge_results(scale: int) -> Callable[[], Any]:
+    records = scaled_results(scale)
+    split = len(records) * 9 // 10
+    google_results, kkj_results = records[:split], records[split:]
+    seen_urls = {r["url"] for r in records[::2]}
+    return lambda: merge_results(google_results, kkj_results, seen_urls)
+
+
+@case("deduplicate_by_url")
+def bench_deduplicate_by_url(scale: int) -> Callable[[], Any]:
+    records = scaled_results(scale)
+    return lambda: deduplicate_by_url(records)
+
+
+@case("build_notification")
+def bench_build_notification(scale: int) -> Callable[[], Any]:
+    records = scaled_results(scale)
+    today = datetime.now().strftime("%Y-%m-%d")
+    old = (datetime.now() - timedelta(days=40)).strftime("%Y-%m-%d")
+    # 約1割を24時間以内の更新として扱う
+    for i, record in enumerate(records):
+        record["update_date"] = today if i % 10 == 0 else old
+    seen_urls = {r["url"] for r in records[::3]}
+    return lambda: build_notification(records, seen_urls)
+
+
+@case("notify_digest")
+def bench_notify_digest(scale: int) -> Callable[[], Any]:
+    """通知の候補1万件（scale によらない）: 索引への追加 -> 期間内の日の読み出し -> 振り分け -> 未送信の絞り込み -> 描画"""
+    records = scaled_results(10000, duplicate_ratio=0)
+    now = datetime.now()
+    # 更新日を直近10日に散らす（期間内は約2割）。半数は送信済みとして記録しておく
+    for i, record in enumerate(records):
+        record["update_date"] = (now - timedelta(days=i % 10 // 2)).strftime("%Y-%m-%d")
+    directory = tempfile.mkdtemp(prefix="scm-bench-")
+    matcher = Matcher(load_profiles())
+    ledger = SentLedger(os.path.join(directory, "notify_ledger.json"), NOTIFY)
+    ledger.mark("default", records[::2], now)
+
+    def run():
+        index = CandidateIndex(os.path.join(directory, "notify_index.json"), NOTIFY)
+        index.add(records)
+        routed = matcher.route(index.recent(first_day(now)))
+        reported = ledger.reported("default")
+        return render(ledger.unsent("default", routed["default"]), reported)
+    return run
+
+
+@case("route_profiles")
+def bench_route_profiles(scale: int) -> Callable[[], Any]:
+    records = scaled_results(scale)
+    matcher = Matcher(load_profiles())
+    return lambda: matcher.route(records)
+
+
+@case("save_json")
+def bench_save_json(scale: int) -> Callable[[], Any]:
+    records = scaled_results(scale)
+    path = os.path.join(tempfile.mkdtemp(prefix="scm-bench-"), "results.json")
+    return lambda: save_json(path, records)
+
+
+@case("load_json")
+def bench_load_json(scale: int) -> Callable[[], Any]:
+    path = os.path.join(tempfile.mkdtemp(prefix="scm-bench-"), "results.json")
+    save_json(path, scaled_results(scale))
+    return lambda: load_json(path)
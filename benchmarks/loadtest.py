@@ -0,0 +1,358 @@
+"""合成負荷試験: CSE・官公需API・自治体サイトのスタンドインに対して main を実行
+
+使い方:
+    python benchmarks/loadtest.py                                   # 監視ページ5,000件・蓄積10万件
+    python benchmarks/loadtest.py --pages 500 --records 10000 --latency-ms 200 --error-rate 0.1
+    python benchmarks/loadtest.py --encoding shift_jis --slow-hosts 0.1 --failing-hosts 0.05 --runs-per-day 1
+    python benchmarks/loadtest.py --pages 2000 --latency-ms 500 --deadline 0.5     # 締め切りでの打ち切り
+
+スタンドインは1つの ThreadingHTTPServer で、Google Custom Search の JSON・官公需API の XML・
+合成した自治体ページ（UTF-8 / Shift_JIS）を返す。127.0.0.0/8 の別々のアドレス（--hosts 個）を
+別々の自治体サイトとして扱うので、ホスト単位の間隔制御・robots.txt・ヘルス管理がそのまま働く。
+応答の遅延・エラー率・ページの大きさ・文字コード、遅いホスト・落ちているホストの割合を指定できる。
+
+main は一時ディレクトリの data/（蓄積結果 --records 件・既出URL入り）に対して別プロセスで実行し、
+所要時間・スループット・スタンドイン側で測った応答時間の分位点・ピークRSS（解析プロセスを含む
+子プロセスの最大値）と、main の計測（run_metrics.jsonl）のステージ別の所要時間を表示・保存する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import hashlib
+import json
+import random
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "results", "load.json")
+
+TOPICS = ["シェアサイクル", "電動キックボード", "コミュニティサイクル", "サイクルポート", "公園管理", "道路占用", "防災訓練"]
+FILLER = ["入札参加資格", "仕様書", "質問の受付", "提出書類", "審査結果", "契約締結", "説明会", "お問い合わせ"]
+PREFECTURES = ["東京都", "神奈川県", "埼玉県", "千葉県", "茨城県", "栃木県", "群馬県", "沖縄県"]
+
+
+def host_address(index: int) -> str:
+    """ホスト番号 -> ループバックのアドレス（127.0.1.1 から）"""
+    return f"127.0.{index // 250 + 1}.{index % 250 + 1}"
+
+
+def host_index(address: str) -> int:
+    """host_address の逆変換（ループバック以外は 0）"""
+    parts = address.split(".")
+    if len(parts) != 4 or parts[0] != "127":
+        return 0
+    return (int(parts[2]) - 1) * 250 + int(parts[3]) - 1
+
+
+def _fraction(key: str) -> float:
+    """キーから決まる 0〜1 の値（ホストの性質をシードによらず固定する）"""
+    return int.from_bytes(hashlib.sha1(key.encode("utf-8")).digest()[:4], "big") / 2 ** 32
+
+
+class StandIn:
+    """スタンドインの設定と、種類別の応答時間の記録"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.port = 0
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self.latencies[kind].append(seconds)
+            self.statuses[kind][status] += 1
+
+    def page_url(self, n: int) -> str:
+        return f"http://{host_address(n % self.args.hosts)}:{self.port}/pages/{n}.html"
+
+    def delay_for(self, host: int, rnd: random.Random) -> float:
+        """応答までの遅延（秒）。遅いホストは10倍"""
+        latency = self.args.latency_ms / 1000 * (0.5 + rnd.random())
+        if _fraction(f"slow:{host}") < self.args.slow_hosts:
+            latency *= 10
+        return latency
+
+    def cse(self, query: Dict[str, List[str]]) -> bytes:
+        """Custom Search JSON API と同じ形の結果（クエリ・開始位置ごとに固定）"""
+        q = query.get("q", [""])[0]
+        start = int(query.get("start", ["1"])[0])
+        if start > 30:
+            return json.dumps({"searchInformation": {"totalResults": "30"}}).encode("utf-8")
+        base = int(hashlib.sha1(q.encode("utf-8")).hexdigest()[:8], 16)
+        items = []
+        for k in range(10):
+            n = (base + start + k) % (self.args.pages * 4)
+            topic = TOPICS[n % len(TOPICS)]
+            items.append({
+                "title": f"{topic}事業者の募集について | {PREFECTURES[n % len(PREFECTURES)]}",
+                "link": self.page_url(n),
+                "snippet": f"Oct {n % 28 + 1}, 2026 ... {topic}の運営事業者を公募型プロポーザルで募集します。",
+            })
+        return json.dumps({"searchInformation": {"totalResults": "30"}, "items": items},
+                          ensure_ascii=False).encode("utf-8")
+
+    def kkj(self, query: Dict[str, List[str]]) -> bytes:
+        """官公需API と同じ形の XML（20件）"""
+        q = query.get("Query", [""])[0]
+        base = int(hashlib.sha1(q.encode("utf-8")).hexdigest()[:8], 16)
+        results = []
+        for k in range(20):
+            n = (base + k) % (self.args.pages * 4)
+            results.append(
+                "<SearchResult>"
+                f"<ProjectName>{escape(q)}関連業務委託 {n}</ProjectName>"
+                f"<ExternalDocumentURI>{escape(self.page_url(n))}?kkj</ExternalDocumentURI>"
+                f"<OrganizationName>合成市{n % 97}</OrganizationName>"
+                f"<PrefectureName>{PREFECTURES[n % len(PREFECTURES)]}</PrefectureName>"
+                "<Category>役務</Category>"
+                f"<CftIssueDate>2026-10-{n % 28 + 1:02d}</CftIssueDate>"
+                f"<PeriodEndTime>2026-11-{n % 28 + 1:02d}</PeriodEndTime>"
+                "</SearchResult>"
+            )
+        return ("<?xml version=\"1.0\" encoding=\"UTF-8\"?><Results><SearchResults>"
+                + "".join(results) + "</SearchResults></Results>").encode("utf-8")
+
+    def page(self, n: int) -> bytes:
+        """合成した自治体ページ（--page-kb 程度の大きさ、--encoding の文字コード）"""
+        encoding = self.args.encoding
+        if encoding == "mixed":
+            encoding = "shift_jis" if n % 2 else "utf-8"
+        topic = TOPICS[n % len(TOPICS)]
+        rnd = random.Random(n)
+        lines = [f"<p>{topic}に関するお知らせです。更新日：2026年{n % 12 + 1}月{n % 28 + 1}日</p>"]
+        links = [f'<li><a href="/pages/{(n + k) % (self.args.pages * 4)}.html">{rnd.choice(FILLER)}</a></li>'
+                 for k in range(1, 11)]
+        size = self.args.page_kb * 1024
+        while sum(len(line) for line in lines) * 2 < size:
+            lines.append(f"<p>{'、'.join(rnd.sample(FILLER, 4))}については担当課へお問い合わせください。</p>")
+        html = (
+            f'<!DOCTYPE html><html lang="ja"><head><meta charset="{encoding}">'
+            f"<title>{topic}事業者の募集 | 合成市{n % 97}</title></head><body>"
+            f'<div id="content"><h1>{topic}事業者の募集</h1>{"".join(lines)}<ul>{"".join(links)}</ul></div>'
+            "</body></html>"
+        )
+        return html.encode(encoding, errors="replace")
+
+
+def make_handler(stand_in: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _respond(self, status: int, body: bytes, content_type: str) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            start = time.perf_counter()
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            host = host_index((self.headers.get("Host") or "").rsplit(":", 1)[0])
+            rnd = random.Random()
+            if parts.path == "/robots.txt":
+                kind, status, body, content_type = "robots", 200, b"User-agent: *\nAllow: /\n", "text/plain"
+            elif parts.path.startswith("/customsearch/"):
+                kind, status, body, content_type = "cse", 200, stand_in.cse(query), "application/json; charset=UTF-8"
+            elif parts.path.startswith("/api/"):
+                kind, status, body, content_type = "kkj", 200, stand_in.kkj(query), "application/xml"
+            elif parts.path.startswith("/pages/"):
+                n = int(parts.path.rsplit("/", 1)[-1].split(".")[0])
+                kind, status, body, content_type = "page", 200, stand_in.page(n), "text/html"
+            else:
+                kind, status, body, content_type = "other", 404, b"not found", "text/plain"
+
+            if kind != "robots":
+                time.sleep(stand_in.delay_for(host, rnd))
+                if _fraction(f"fail:{host}") < stand_in.args.failing_hosts or rnd.random() < stand_in.args.error_rate:
+                    status, body, content_type = 503, b"unavailable", "text/plain"
+            self._respond(status, body, content_type)
+            stand_in.record(kind, status, time.perf_counter() - start)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+def seed_data(data_dir: str, records: int, seed: int = 44) -> None:
+    """蓄積結果・既出URLを合成して保存"""
+    rnd = random.Random(seed)
+    now = datetime.now()
+    results = []
+    for i in range(records):
+        topic = TOPICS[i % len(TOPICS)]
+        results.append({
+            "title": f"{topic}事業者募集 {i}",
+            "url": f"https://stored.example.jp/{i // 1000}/{i}.html",
+            "snippet": f"{topic}の運営事業者を募集します。" * 3,
+            "update_date": (now - timedelta(days=i // 50)).strftime("%Y-%m-%d"),
+            "source": rnd.choice(["google", "kkj", "njss", "direct"]),
+            "fetched_at": (now - timedelta(minutes=i)).isoformat(),
+            "prefecture": rnd.choice(["東京", "神奈川", "千葉", ""]),
+            "organization": f"合成市{i % 97}",
+            "matched_keywords": [topic],
+        })
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "results.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(data_dir, "seen_urls.json"), "w", encoding="utf-8") as f:
+        json.dump(sorted(r["url"] for r in results), f, indent=2)
+
+
+def write_watch_pages(path: str, stand_in: StandIn, high_ratio: float) -> None:
+    """監視ページの一覧（watch_pages.csv と同じ列）"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["url", "prefecture", "organization", "priority", "keywords", "note"])
+        for n in range(stand_in.args.pages):
+            priority = "high" if _fraction(f"page:{n}") < high_ratio else "normal"
+            writer.writerow([stand_in.page_url(n), "東京", f"合成市{n % 97}", priority, "", ""])
+
+
+def run_child(config: Dict[str, Any]) -> None:
+    """子プロセス: 接続先と監視ページをスタンドインに向けて main を実行"""
+    from share_cycle_monitor import fetch_direct, fetch_google, fetch_kkj, main, politeness, watchlist
+
+    fetch_google.CSE_URL = f"{config['base_url']}/customsearch/v1"
+    fetch_kkj.KKJ_API_URL = f"{config['base_url']}/api/v1/"
+    fetch_direct.WATCH_PAGES[:] = watchlist.load(config["watch_pages"])
+    watchlist.WATCH_LIST["runs_per_day"] = config["runs_per_day"]
+    politeness.limiter.crawl_delay = config["crawl_delay"]
+    main.main(sources=config["sources"], notify=False, deadline_minutes=config["deadline"])
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    """分位点（ミリ秒）"""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {f"p{int(q * 100)}": round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+              for q in (0.5, 0.9, 0.99)}
+    result["max"] = round(ordered[-1] * 1000, 1)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="スタンドインに対する main の負荷試験")
+    parser.add_argument("--pages", type=int, default=5000, help="監視ページ数")
+    parser.add_argument("--records", type=int, default=100_000, help="蓄積結果の件数")
+    parser.add_argument("--hosts", type=int, default=250, help="自治体サイトのホスト数")
+    parser.add_argument("--high-ratio", type=float, default=0.05, help="毎回巡回する（priority=high）ページの割合")
+    parser.add_argument("--runs-per-day", type=float, default=4, help="WATCH_LIST の runs_per_day（1 なら全ページを巡回）")
+    parser.add_argument("--latency-ms", type=float, default=50, help="応答の遅延（平均、±50%%）")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="503 を返す割合")
+    parser.add_argument("--slow-hosts", type=float, default=0.05, help="遅延が10倍のホストの割合")
+    parser.add_argument("--failing-hosts", type=float, default=0.02, help="常に 503 を返すホストの割合")
+    parser.add_argument("--page-kb", type=int, default=40, help="ページの大きさ（KiB）")
+    parser.add_argument("--encoding", choices=["utf-8", "shift_jis", "mixed"], default="mixed", help="ページの文字コード")
+    parser.add_argument("--crawl-delay", type=float, default=2.0, help="同一ホストへのリクエスト間隔（秒）")
+    parser.add_argument("--deadline", type=float, default=0, help="main の制限時間（分、0 で無制限）")
+    parser.add_argument("--sources", default="google,kkj,njss,procurement,direct", help="実行するソース（カンマ区切り）")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果のJSON")
+    parser.add_argument("--keep", action="store_true", help="一時ディレクトリを削除しない")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+
+    stand_in = StandIn(args)
+    server = ThreadingHTTPServer(("", 0), make_handler(stand_in))
+    server.daemon_threads = True
+    stand_in.port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    workdir = tempfile.mkdtemp(prefix="scm-load-")
+    data_dir = os.path.join(workdir, "data")
+    watch_pages = os.path.join(workdir, "watch_pages.csv")
+    print(f"準備: 蓄積 {args.records:,}件 / 監視ページ {args.pages:,}件（{args.hosts}ホスト） -> {workdir}")
+    seed_data(data_dir, args.records)
+    write_watch_pages(watch_pages, stand_in, args.high_ratio)
+
+    config = {
+        "base_url": f"http://127.0.0.1:{stand_in.port}",
+        "watch_pages": watch_pages,
+        "runs_per_day": args.runs_per_day,
+        "crawl_delay": args.crawl_delay,
+        "deadline": args.deadline,
+        "sources": [name for name in args.sources.split(",") if name],
+    }
+    env = {**os.environ, "SCM_DATA_DIR": data_dir, "GOOGLE_API_KEY": "load-test", "GOOGLE_CSE_ID": "load-test"}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", json.dumps(config)],
+                          cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss  # Linux は KiB
+    server.shutdown()
+    if proc.returncode != 0:
+        print(proc.stdout[-2000:])
+        print(proc.stderr[-2000:])
+        raise SystemExit(f"main が異常終了しました（終了コード {proc.returncode}）")
+
+    run_metrics = {}
+    metrics_path = os.path.join(data_dir, "run_metrics.jsonl")
+    if os.path.exists(metrics_path):
+        with open(metrics_path, encoding="utf-8") as f:
+            run_metrics = json.loads(f.read().splitlines()[-1])
+    pipeline = run_metrics.get("stages", {}).get("pipeline", {})
+    requests_total = sum(len(v) for v in stand_in.latencies.values())
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in ("child", "output", "keep")},
+        "wall_seconds": round(wall, 2),
+        "peak_rss_mib": round(peak_rss / 1024, 1),
+        "requests": {kind: dict(statuses) for kind, statuses in stand_in.statuses.items()},
+        "requests_per_second": round(requests_total / wall, 1),
+        "pages_per_second": round(len(stand_in.latencies["page"]) / wall, 1),
+        "records_in": pipeline.get("records_in"),
+        "records_out": pipeline.get("records_out"),
+        "deadline_dropped": run_metrics.get("counters", {}).get("deadline_dropped", 0),
+        "server_latency_ms": {kind: _percentiles(values) for kind, values in stand_in.latencies.items()},
+        "stages": run_metrics.get("stages", {}),
+    }
+
+    print(f"所要時間: {report['wall_seconds']}秒 / ピークRSS: {report['peak_rss_mib']} MiB")
+    print(f"リクエスト: {requests_total:,}件（{report['requests_per_second']}件/秒、ページ {report['pages_per_second']}件/秒）")
+    print(f"パイプライン: 入力 {report['records_in']}件 -> 新着 {report['records_out']}件")
+    if report["deadline_dropped"]:
+        print(f"締め切りで打ち切り: {report['deadline_dropped']}件")
+    for kind, values in sorted(report["server_latency_ms"].items()):
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(report["requests"][kind].items()))
+        print(f"  {kind:6s} {values}  ({statuses})")
+    for stage, stats in sorted(report["stages"].items()):
+        print(f"  stage {stage}: {stats}")
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"結果を保存: {args.output}")
+    if args.keep:
+        print(f"作業ディレクトリ: {workdir}")
+    else:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
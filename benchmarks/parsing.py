@@ -0,0 +1,135 @@
+"""直接監視ページの解析（parsing）のプロセス数によるスケーリング
+
+使い方:
+    python benchmarks/parsing.py [--pages 1000] [--corpus DIR] [--workers 1,2,4] [--output benchmarks/results/parsing.json]
+
+--corpus を指定するとそのディレクトリの *.html（保存したページ）を、指定しなければ
+municipal_proposal.html から本文・更新日・文字コード（UTF-8 / Shift_JIS）を変えた
+ページを一時ディレクトリに --pages 件保存して使う。
+各設定で「ファイルから読んだバイト列 -> parse_page -> ParsedPage」を全ページ分行い、
+同一プロセス内で解析した場合（inline）に対する速度比を表示する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import pickle
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List
+
+from cases import read_fixture
+from share_cycle_monitor import parsing
+from share_cycle_monitor.fetch_direct import COMMON_KEYWORDS
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "results", "parsing.json")
+
+FILLER = ["入札参加資格", "仕様書", "質問の受付", "提出書類", "審査結果", "契約締結", "説明会", "お問い合わせ"]
+
+
+def build_corpus(directory: str, pages: int, seed: int = 38) -> List[str]:
+    """フィクスチャから合成したページを保存し、パスのリストを返す"""
+    rnd = random.Random(seed)
+    base = read_fixture("municipal_proposal.html")
+    paths = []
+    for i in range(pages):
+        extra = "".join(
+            f"<p>{rnd.choice(FILLER)}（第{rnd.randint(1, 99)}号）: {rnd.choice(COMMON_KEYWORDS)}に関するお知らせ</p>\n"
+            for _ in range(rnd.randint(20, 200))
+        )
+        html = base.replace('<div id="content">', '<div id="content">\n' + extra).replace(
+            "2026年2月5日", f"2026年{rnd.randint(1, 12)}月{rnd.randint(1, 28)}日")
+        if i % 4 == 3:
+            data = html.replace('charset="UTF-8"', 'charset="Shift_JIS"').encode("shift_jis", errors="replace")
+        else:
+            data = html.encode("utf-8")
+        path = os.path.join(directory, f"page{i:04d}.html")
+        with open(path, "wb") as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def run(executor: Executor, paths: List[str]) -> List[parsing.ParsedPage]:
+    """全ページを読み込み、解析を依頼して結果を集める（取得スレッドの代わりにファイルから読む）"""
+    futures = [executor.submit(parsing.parse_page, _read(path), COMMON_KEYWORDS) for path in paths]
+    return [future.result() for future in futures]
+
+
+def measure(workers: int, paths: List[str], repeat: int) -> Dict[str, float]:
+    """1設定分の計測（プロセスの起動は計測に含め、初回の起動待ちだけ除く）"""
+    timings = []
+    for _ in range(repeat):
+        if workers == 0:
+            executor: Executor = parsing.InProcessExecutor()
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=parsing.mp_context())
+            executor.submit(parsing.parse_page, b"<html></html>", []).result()
+        with executor:
+            start = time.perf_counter()
+            run(executor, paths)
+            timings.append(time.perf_counter() - start)
+    seconds = statistics.median(timings)
+    return {"seconds": seconds, "pages_per_second": len(paths) / seconds}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="解析プロセス数によるスケーリング")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--corpus", help="保存したページ（*.html）のディレクトリ")
+    parser.add_argument("--workers", help="カンマ区切りのプロセス数（既定: 1,2,4,... 利用可能なCPU数まで）")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    cpus = parsing.available_cpus()
+    if args.workers:
+        workers = [int(w) for w in args.workers.split(",")]
+    else:
+        workers = [1]
+        while workers[-1] * 2 <= cpus:
+            workers.append(workers[-1] * 2)
+        if workers[-1] != cpus:
+            workers.append(cpus)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(os.path.join(args.corpus, name) for name in os.listdir(args.corpus) if name.endswith(".html"))
+        else:
+            paths = build_corpus(tmp, args.pages)
+        raw_bytes = sum(os.path.getsize(path) for path in paths)
+        sample = run(parsing.InProcessExecutor(), paths[:50])
+        result_bytes = statistics.mean(len(pickle.dumps(parsed)) for parsed in sample)
+        print(f"{len(paths):,}ページ / 平均 {raw_bytes / len(paths) / 1024:.1f} KB -> 解析結果 {result_bytes:.0f} B / CPU {cpus}")
+
+        results = {"inline": measure(0, paths, args.repeat)}
+        for n in workers:
+            results[f"{n} process"] = measure(n, paths, args.repeat)
+
+    baseline = results["inline"]["seconds"]
+    print(f"{'':<12}{'seconds':>10}{'pages/s':>10}{'speedup':>10}")
+    for name, values in results.items():
+        values["speedup"] = baseline / values["seconds"]
+        print(f"{name:<12}{values['seconds']:>10.2f}{values['pages_per_second']:>10.1f}{values['speedup']:>10.2f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"pages": len(paths), "cpus": cpus, "avg_page_kb": raw_bytes / len(paths) / 1024,
+                   "avg_result_bytes": result_bytes, "results": results}, f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""dict モデルと Record モデルのメモリ・スループット比較
+
+使い方:
+    python benchmarks/records.py [--scale 100000] [--repeat 3] [--output benchmarks/results/records.json]
+
+results_sample.json を指定件数まで拡大した JSON を用意し、
+- dict: 標準 json で読み込んだ dict のリスト（従来）
+- record: serialization（orjson があれば orjson）で読み込み Record に変換したリスト
+それぞれについて、保持メモリ（tracemalloc）と 読み込み・URL重複排除・項目参照・書き出し の時間を計測する。
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from cases import scaled_results
+from share_cycle_monitor import serialization
+from share_cycle_monitor.main import deduplicate_by_url
+from share_cycle_monitor.records import from_dicts
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "results", "records.json")
+
+MODELS: Dict[str, Dict[str, Callable]] = {
+    "dict": {
+        "load": lambda raw: json.loads(raw),
+        "dump": lambda items: json.dumps(items, ensure_ascii=False, indent=2).encode("utf-8"),
+    },
+    "record": {
+        "load": lambda raw: from_dicts(serialization.loads(raw)),
+        "dump": lambda items: serialization.dumps(items),
+    },
+}
+
+
+def _time(func: Callable[[], Any], repeat: int) -> float:
+    """中央値（ミリ秒）"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _retained_bytes(load: Callable[[bytes], List[Any]], raw: bytes) -> int:
+    """読み込んだリストが保持しているメモリ（バイト）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = load(raw)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del items
+    return retained
+
+
+def _read_fields(items: List[Any]) -> int:
+    """通知・統合処理相当の項目参照"""
+    hits = 0
+    for item in items:
+        if item.get("url") and item.get("prefecture") and item.get("update_date"):
+            hits += 1
+    return hits
+
+
+def _read_fetched_at(items: List[Any]) -> List[str]:
+    """fetched_at の参照（Record では整数からISO文字列への変換を含む）"""
+    return [item["fetched_at"] for item in items]
+
+
+def measure(model: Dict[str, Callable], raw: bytes, repeat: int) -> Dict[str, float]:
+    """1モデル分の計測"""
+    items = model["load"](raw)
+    return {
+        "memory_mb": _retained_bytes(model["load"], raw) / 1024 / 1024,
+        "load_ms": _time(lambda: model["load"](raw), repeat),
+        "dedupe_ms": _time(lambda: deduplicate_by_url(items), repeat),
+        "read_fields_ms": _time(lambda: _read_fields(items), repeat),
+        "read_fetched_ms": _time(lambda: _read_fetched_at(items), repeat),
+        "dump_ms": _time(lambda: model["dump"](items), repeat),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="dict / Record モデルの比較")
+    parser.add_argument("--scale", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    raw = json.dumps(scaled_results(args.scale), ensure_ascii=False, indent=2).encode("utf-8")
+    print(f"{args.scale:,}件 / JSON {len(raw) / 1024 / 1024:.1f} MB / orjson: {'あり' if serialization.orjson else 'なし'}")
+
+    results = {name: measure(model, raw, args.repeat) for name, model in MODELS.items()}
+    columns = list(results["dict"])
+    print(f"{'':<8}" + "".join(f"{c:>16}" for c in columns))
+    for name, values in results.items():
+        print(f"{name:<8}" + "".join(f"{values[c]:>16.1f}" for c in columns))
+    print(f"{'ratio':<8}" + "".join(f"{results['record'][c] / results['dict'][c]:>16.2f}" for c in columns))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"scale": args.scale, "orjson": bool(serialization.orjson), "models": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
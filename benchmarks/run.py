@@ -0,0 +1,164 @@
+"""ホットパスのベンチマーク実行・ベースライン比較
+
+使い方:
+    python benchmarks/run.py                                # 全ケースを計測し結果をJSON出力
+    python benchmarks/run.py -k extract                     # 名前に "extract" を含むケースのみ
+    python benchmarks/run.py --save-baseline                # 結果をベースラインとして保存
+    python benchmarks/run.py --compare benchmarks/baseline.json --threshold 0.15
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import gc
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from cases import CASES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# 1ラウンドあたりの最低計測時間（秒）
+MIN_ROUND_TIME = 0.2
+
+
+def calibrate(func: Callable[[], Any]) -> int:
+    """1ラウンドが MIN_ROUND_TIME 以上になる呼び出し回数を決定"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME:
+            return number
+        number *= 2 if elapsed == 0 else max(2, min(10, int(MIN_ROUND_TIME / elapsed) + 1))
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """関数を計測し、1呼び出しあたりの秒数を集計"""
+    number = calibrate(func)
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "rounds": repeat,
+        "number": number,
+    }
+
+
+def run_benchmarks(names: List[str], repeat: int, scale: int) -> Dict[str, Any]:
+    """指定ケースを順に計測"""
+    results = {}
+    for name in names:
+        func = CASES[name](scale)
+        stats = measure(func, repeat)
+        results[name] = stats
+        print(f"{name:<24} min {stats['min'] * 1000:10.3f} ms  median {stats['median'] * 1000:10.3f} ms  (x{stats['number']})")
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "scale": scale,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """ベースラインとの比較（min同士の比率）"""
+    rows = []
+    for name, stats in current["benchmarks"].items():
+        base = baseline.get("benchmarks", {}).get(name)
+        if not base:
+            rows.append({"name": name, "status": "new", "ratio": None})
+            continue
+        ratio = stats["min"] / base["min"] if base["min"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+        rows.append({"name": name, "status": status, "ratio": ratio})
+    return rows
+
+
+def save_report(path: str, data: Dict[str, Any]) -> None:
+    """結果をJSONで保存"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="シェアサイクル監視 ベンチマーク")
+    parser.add_argument("-k", "--filter", default="", help="ケース名の部分一致で絞り込み")
+    parser.add_argument("--repeat", type=int, default=5, help="計測ラウンド数")
+    parser.add_argument("--scale", type=int, default=20000, help="合成 results.json の件数")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="結果JSONの出力先")
+    parser.add_argument("--compare", metavar="BASELINE", help="比較するベースラインJSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="劣化とみなす比率（0.15 = 15%%）")
+    parser.add_argument("--save-baseline", action="store_true", help=f"結果を {DEFAULT_BASELINE} に保存")
+    parser.add_argument("--list", action="store_true", help="ケース一覧を表示")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print(f"該当するケースがありません: {args.filter}")
+        return 2
+
+    report = run_benchmarks(names, args.repeat, args.scale)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {"baseline": args.compare, "threshold": args.threshold, "results": rows}
+        print(f"\n--- ベースライン比較: {args.compare} ---")
+        for row in rows:
+            ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "-"
+            print(f"{row['name']:<24} {ratio:>8}  {row['status']}")
+
+    save_report(args.output, report)
+    print(f"\n結果を保存: {args.output}")
+    if args.save_baseline:
+        save_report(DEFAULT_BASELINE, report)
+        print(f"ベースラインを保存: {DEFAULT_BASELINE}")
+
+    regressions = [r for r in report.get("comparison", {}).get("results", []) if r["status"] == "regression"]
+    if regressions:
+        print(f"劣化を検出: {', '.join(r['name'] for r in regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
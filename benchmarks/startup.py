@@ -0,0 +1,93 @@
+"""エントリポイントの起動コスト計測（python -X importtime）
+
+使い方:
+    python benchmarks/startup.py [--repeat 5] [--output benchmarks/results/startup.json]
+
+各シナリオを別プロセスで import し、-X importtime の累積時間（インタプリタ起動時に
+読み込まれるモジュールを除いた最上位モジュールの合計）とプロセス全体の実行時間を計測する。
+"eager" は全ソース・通知を読み込む旧 main.py 相当。
+"""
+import sys
+import os
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import time
+from typing import Dict, List, Set, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "results", "startup.json")
+
+# シナリオ名 -> 実行するコード
+SCENARIOS = {
+    "cli": "import share_cycle_monitor.cli",
+    "cli+kkj": "import share_cycle_monitor.cli; from share_cycle_monitor.main import _load_source; _load_source('kkj')",
+    "cli+direct": "import share_cycle_monitor.cli; from share_cycle_monitor.main import _load_source; _load_source('direct')",
+    "eager": (
+        "import share_cycle_monitor.cli; from share_cycle_monitor.main import SOURCES, _load_source; "
+        "[_load_source(name) for name in SOURCES]; import share_cycle_monitor.notifier"
+    ),
+}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def _run_importtime(code: str) -> Tuple[Dict[str, int], float]:
+    """-X importtime 付きで実行し、最上位モジュールごとの累積時間(us)と実行時間(秒)を返す"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        # インデントなし = 最上位の import
+        if match and len(match.group(3)) == 1:
+            modules[match.group(4)] = int(match.group(2))
+    return modules, wall
+
+
+def measure_once(code: str, startup_modules: Set[str]) -> Dict[str, float]:
+    """1回分の計測"""
+    modules, wall = _run_importtime(code)
+    cumulative_us = sum(us for name, us in modules.items() if name not in startup_modules)
+    return {"import_ms": cumulative_us / 1000, "wall_ms": wall * 1000}
+
+
+def measure(code: str, repeat: int, startup_modules: Set[str]) -> Dict[str, float]:
+    """複数回計測して中央値を取る"""
+    runs: List[Dict[str, float]] = [measure_once(code, startup_modules) for _ in range(repeat)]
+    return {
+        "import_ms": statistics.median(r["import_ms"] for r in runs),
+        "wall_ms": statistics.median(r["wall_ms"] for r in runs),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="エントリポイントの起動コスト計測")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    startup_modules = set(_run_importtime("pass")[0])
+    results = {"interpreter": measure("pass", args.repeat, set())}
+    print(f"{'interpreter':<12} import {results['interpreter']['import_ms']:8.1f} ms   "
+          f"wall {results['interpreter']['wall_ms']:8.1f} ms")
+    for name, code in SCENARIOS.items():
+        results[name] = measure(code, args.repeat, startup_modules)
+        print(f"{name:<12} import {results[name]['import_ms']:8.1f} ms   wall {results[name]['wall_ms']:8.1f} ms")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "scenarios": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n結果を保存: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+"""シェアサイクル公募・入札情報の監視
+
+    python -m share_cycle_monitor [--sources kkj,direct] [--dry-run] [--no-notify]
+"""
+
+__version__ = "1.0.0"
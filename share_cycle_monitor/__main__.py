@@ -0,0 +1,6 @@
+"""python -m share_cycle_monitor のエントリポイント"""
+import sys
+
+from .cli import main
+
+sys.exit(main())
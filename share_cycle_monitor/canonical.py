@@ -0,0 +1,56 @@
+"""URLの正規化（恒久的な転送先への置き換え）
+
+リンク確認（liveness）で恒久的な転送（301/308）が分かったURLを data/url_aliases.json に
+転送元 -> 転送先 として保存する。パイプラインは取得したレコードの URL をここで転送先に置き換えるので、
+検索結果に古いURLが出ても、転送先と同じ案件として重複排除される。
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from .config import URL_ALIASES_FILE
+from . import serialization
+from . import storage
+
+# 転送の連鎖をたどる上限（循環している場合の打ち切り）
+MAX_HOPS = 5
+
+
+class Aliases:
+    """転送元 -> 転送先 の対応（スレッドセーフ）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._aliases: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, str]:
+        if self._aliases is None:
+            self._aliases = serialization.load_file(self.path) if os.path.exists(self.path) else {}
+        return self._aliases
+
+    def resolve(self, url: str) -> str:
+        """転送先のURL（転送が記録されていなければそのまま）"""
+        with self._lock:
+            aliases = self._load()
+            for _ in range(MAX_HOPS):
+                target = aliases.get(url)
+                if target is None or target == url:
+                    break
+                url = target
+        return url
+
+    def add(self, aliases: Dict[str, str]) -> None:
+        """転送を追加して保存（他のプロセスが保存した分と統合）"""
+        if not aliases:
+            return
+        with self._lock:
+            self._aliases = storage.update_json(self.path, lambda current: {**current, **aliases}, {})
+
+
+aliases = Aliases(URL_ALIASES_FILE)
+
+
+def resolve(url: str) -> str:
+    """URLを転送先に置き換え"""
+    return aliases.resolve(url)
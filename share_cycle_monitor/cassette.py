@@ -0,0 +1,113 @@
+"""main() をカセットに記録し、オフラインで決定的に再生する
+
+使い方:
+    python -m share_cycle_monitor.cassette record CASSETTE_DIR   # 実通信で1回実行し、全HTTPのやり取りを記録
+    python -m share_cycle_monitor.cassette replay CASSETTE_DIR   # 通信なしで再生（時刻は記録開始時刻に固定）
+    python -m share_cycle_monitor.cassette replay CASSETTE_DIR --profile
+
+記録・再生とも data/ を汚さないよう作業用ディレクトリで実行する。
+記録時点の data/ の状態（既出URL・クエリ状態等）をカセットに保存し、
+再生時はそこから開始するため、毎回同じクエリ選択・同じ結果になる。
+メール通知は行わない。
+"""
+import os
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+REPO_DATA_DIR = os.environ.get("SCM_DATA_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+)
+
+# 実行開始時にカセットへ保存する状態ファイル
+STATE_FILES = ["results.json", "seen_urls.json", "query_state.json"]
+
+
+def _prepare_data_dir(source_dir: str, data_dir: str) -> str:
+    """状態ファイルを作業用ディレクトリにコピー"""
+    data_dir = data_dir or tempfile.mkdtemp(prefix="scm-cassette-")
+    os.makedirs(data_dir, exist_ok=True)
+    for name in STATE_FILES:
+        src = os.path.join(source_dir, name)
+        if os.path.exists(src):
+            shutil.copy2(src, os.path.join(data_dir, name))
+    return data_dir
+
+
+def _use_data_dir(data_dir: str) -> None:
+    """作業用ディレクトリを指定（config は import 時に環境変数を読むため、パッケージの import 前に呼ぶ）"""
+    os.environ["SCM_DATA_DIR"] = data_dir
+
+
+def _run_main(profile_dir: str = "") -> float:
+    """main() を通知なしで実行し、所要時間を返す"""
+    from . import metrics
+    from .main import main
+
+    start = time.perf_counter()
+    if profile_dir:
+        with metrics.profile(profile_dir):
+            main(notify=False)
+    else:
+        main(notify=False)
+    return time.perf_counter() - start
+
+
+def record(cassette_dir: str, data_dir: str = "") -> None:
+    """実通信で main() を実行し、カセットに記録"""
+    if os.path.exists(os.path.join(cassette_dir, "meta.json")):
+        shutil.rmtree(cassette_dir)
+    state_dir = _prepare_data_dir(REPO_DATA_DIR, os.path.join(cassette_dir, "state"))
+    data_dir = _prepare_data_dir(state_dir, data_dir)
+    _use_data_dir(data_dir)
+
+    from . import clock
+    from . import http_client
+
+    recorded_at = clock.now()
+    with open(os.path.join(cassette_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"recorded_at": recorded_at.isoformat()}, f, ensure_ascii=False, indent=2)
+
+    http_client.configure("record", cassette_dir)
+    elapsed = _run_main()
+    print(f"\n記録完了: {cassette_dir} ({elapsed:.2f}秒, 作業用ディレクトリ: {data_dir})")
+
+
+def replay(cassette_dir: str, data_dir: str = "", now: str = "", profile_dir: str = "") -> None:
+    """カセットから main() をオフライン再生"""
+    data_dir = _prepare_data_dir(os.path.join(cassette_dir, "state"), data_dir)
+    _use_data_dir(data_dir)
+
+    from . import clock
+    from . import http_client
+
+    with open(os.path.join(cassette_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    clock.freeze(datetime.fromisoformat(now or meta["recorded_at"]))
+
+    http_client.configure("replay", cassette_dir)
+    elapsed = _run_main(profile_dir)
+    print(f"\n再生完了: {elapsed:.2f}秒 (作業用ディレクトリ: {data_dir})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HTTPのやり取りを記録・再生して main() を実行")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("cassette_dir", help="カセットディレクトリ")
+    parser.add_argument("--data-dir", default="", help="作業用データディレクトリ（省略時は一時ディレクトリ）")
+    parser.add_argument("--now", default="", help="再生時に固定する時刻（ISO形式、省略時は記録開始時刻）")
+    parser.add_argument("--profile", nargs="?", const="profiles", default="", metavar="DIR",
+                        help="再生時に cProfile / tracemalloc のスナップショットを出力")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        record(args.cassette_dir, args.data_dir)
+    else:
+        replay(args.cassette_dir, args.data_dir, args.now, args.profile)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""結果の変更ログ（data/changes/）
+
+results.json への追加・更新に、実行をまたいで単調に増える連番（seq）を振って追記していく。
+書き込み1回分の変更を差分ファイルにし、利用側（ダッシュボード・社内ツール）は index.json を見て、
+前回読んだ seq より後の差分ファイルだけを取得する（results.json を丸ごと取得しなくてよい）。
+
+    changes/index.json                   最新の seq、差分ファイルとスナップショットの一覧
+    changes/delta-<from>-<to>.json       seq from..to の変更 [{"seq", "op", "url", "at", "record"}, ...]
+    changes/snapshot-<seq>.json          seq までの変更をすべて反映した結果（新しい順）
+    changes/feed.atom                    新着の直近 CHANGELOG["feed_entries"] 件の Atom フィード
+
+op は add（新着）か update（リンク確認・地域の付与等による既存の結果の書き換え）。record は変更後の結果全体。
+差分ファイルが max_deltas を超えたら古い分をスナップショットに畳む。前回読んだ seq が一番古い差分ファイルより
+前なら、スナップショットを読んでから残りの差分を適用する（read_since がその手順の実装）。
+変更ログがまだない状態で最初に書き込むときは、その時点の results.json を seq 0 のスナップショットにする。
+
+    python -m share_cycle_monitor.changelog                 # 最新の seq と差分ファイル・スナップショット
+    python -m share_cycle_monitor.changelog --since 120     # seq 120 より後の変更
+    python -m share_cycle_monitor.changelog --compact       # 新しい keep_deltas 個を残して古い差分ファイルを畳む
+"""
+import argparse
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .config import CHANGELOG, CHANGES_DIR, RESULTS_FILE
+from . import clock
+from . import serialization
+from . import storage
+
+INDEX_FILE = os.path.join(CHANGES_DIR, "index.json")
+FEED_FILE = os.path.join(CHANGES_DIR, "feed.atom")
+ATOM_NS = "http://www.w3.org/2005/Atom"
+FEED_ID = "urn:share-cycle-monitor:changes"
+
+
+def _path(name: str) -> str:
+    return os.path.join(CHANGES_DIR, name)
+
+
+def _read_index() -> Dict[str, Any]:
+    if os.path.exists(INDEX_FILE):
+        return serialization.load_file(INDEX_FILE)
+    return {"head": 0, "snapshot": None, "deltas": []}
+
+
+def load_index() -> Dict[str, Any]:
+    """index.json（変更ログがまだなければ空の状態）"""
+    return _read_index()
+
+
+def _load_delta(delta: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    return serialization.load_file(_path(delta["file"]))
+
+
+def _load_snapshot(snapshot: Optional[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    return serialization.load_file(_path(snapshot["file"]))["records"] if snapshot else []
+
+
+def apply(records: List[Dict[str, Any]], changes: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """結果（新しい順）に変更を seq 順に反映（新着は先頭に、更新はその位置のまま）"""
+    by_url = {record["url"]: record for record in records}
+    added: List[str] = []
+    for change in changes:
+        url = change["url"]
+        if change["op"] == "add" and url not in by_url:
+            added.append(url)
+        by_url[url] = change["record"]
+    order = added[::-1] + [record["url"] for record in records]
+    return [by_url[url] for url in order]
+
+
+def _bootstrap(index: Dict[str, Any], exclude: Iterable[str]) -> None:
+    """変更ログの最初の書き込みの前に、それまでの results.json を seq 0 のスナップショットにする"""
+    if index["head"] or index["snapshot"] is not None:
+        return
+    exclude = set(exclude)
+    data = serialization.load_file(RESULTS_FILE) if os.path.exists(RESULTS_FILE) else []
+    records = [record for record in data if isinstance(record, dict) and record.get("url") not in exclude]
+    _write_snapshot(index, 0, records)
+
+
+def _write_snapshot(index: Dict[str, Any], seq: int, records: List[Dict[str, Any]]) -> None:
+    name = f"snapshot-{seq:08d}.json"
+    storage.atomic_write(_path(name), serialization.dumps({"seq": seq, "records": records}, indent=False))
+    index["snapshot"] = {"seq": seq, "file": name, "records": len(records)}
+
+
+def record(op: str, records: Iterable[Mapping[str, Any]]) -> Optional[Tuple[int, int]]:
+    """変更を追記し、振った seq の範囲を返す（変更がなければNone）"""
+    records = [r for r in records if r.get("url")]
+    if not records:
+        return None
+    now = clock.now().isoformat()
+    os.makedirs(CHANGES_DIR, exist_ok=True)
+    # 差分ファイル・スナップショットは index.json のロック中にだけ書くので、個別にはロックしない
+    with storage.locked(INDEX_FILE):
+        index = _read_index()
+        _bootstrap(index, [r["url"] for r in records])
+        first = index["head"] + 1
+        changes = [{"seq": first + i, "op": op, "url": r["url"], "at": now, "record": r}
+                   for i, r in enumerate(records)]
+        last = first + len(changes) - 1
+        name = f"delta-{first:08d}-{last:08d}.json"
+        storage.atomic_write(_path(name), serialization.dumps(changes, indent=False))
+        index["head"] = last
+        index["deltas"].append({"from": first, "to": last, "file": name, "count": len(changes), "at": now})
+        if len(index["deltas"]) > CHANGELOG["max_deltas"]:
+            _compact(index, CHANGELOG["keep_deltas"])
+        index["updated_at"] = now
+        serialization.dump_file(INDEX_FILE, index)
+        write_feed(index)
+    return first, last
+
+
+def record_added(records: List[Mapping[str, Any]]) -> Optional[Tuple[int, int]]:
+    """results.json の先頭に追加した新着を追記（先頭の結果に最後の seq を振る）"""
+    return record("add", records[::-1])
+
+
+def record_updated(records: List[Mapping[str, Any]]) -> Optional[Tuple[int, int]]:
+    """書き換えた既存の結果を追記"""
+    return record("update", records)
+
+
+def _compact(index: Dict[str, Any], keep: int) -> int:
+    """新しい keep 個を残して古い差分ファイルをスナップショットに畳み、畳んだ数を返す"""
+    split = max(0, len(index["deltas"]) - keep)
+    old, index["deltas"] = index["deltas"][:split], index["deltas"][split:]
+    if not old:
+        return 0
+    previous = index["snapshot"]
+    records = _load_snapshot(previous)
+    for delta in old:
+        records = apply(records, _load_delta(delta))
+    _write_snapshot(index, old[-1]["to"], records)
+    for name in [delta["file"] for delta in old] + ([previous["file"]] if previous else []):
+        if os.path.exists(_path(name)):
+            os.remove(_path(name))
+    print(f"変更ログ: 差分{len(old)}件をスナップショット（seq {old[-1]['to']}）に畳みました")
+    return len(old)
+
+
+def compact(keep: Optional[int] = None) -> int:
+    """古い差分ファイルをスナップショットに畳む（keep 省略時は CHANGELOG["keep_deltas"] 個を残す）"""
+    with storage.locked(INDEX_FILE):
+        index = _read_index()
+        compacted = _compact(index, CHANGELOG["keep_deltas"] if keep is None else keep)
+        if compacted:
+            serialization.dump_file(INDEX_FILE, index)
+    return compacted
+
+
+def read_since(cursor: int) -> Tuple[int, Optional[List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """seq cursor より後の変更（利用側の手順）
+
+    (最新の seq, スナップショットの結果, 変更) を返す。cursor が差分ファイルの範囲より前なら
+    スナップショットの結果（それを丸ごと置き換えて使う）と、その後の変更。範囲内ならスナップショットは None。
+    """
+    index = _read_index()
+    snapshot = index["snapshot"]
+    records = None
+    if snapshot is not None and cursor < snapshot["seq"]:
+        records, cursor = _load_snapshot(snapshot), snapshot["seq"]
+    changes = [change for delta in index["deltas"] if delta["to"] > cursor
+               for change in _load_delta(delta) if change["seq"] > cursor]
+    return index["head"], records, changes
+
+
+def _timestamp(iso: str) -> str:
+    """Atom の日時（RFC 3339。タイムゾーンのない日時はこの環境の時刻として扱う）"""
+    return datetime.fromisoformat(iso).astimezone().isoformat(timespec="seconds")
+
+
+def _text(parent: ET.Element, tag: str, text: str, **attrib: str) -> ET.Element:
+    elem = ET.SubElement(parent, f"{{{ATOM_NS}}}{tag}", attrib)
+    elem.text = text
+    return elem
+
+
+def write_feed(index: Dict[str, Any]) -> None:
+    """新着の直近分の Atom フィードを書き出す（新しい差分ファイルから順に読む）"""
+    entries: List[Dict[str, Any]] = []
+    for delta in reversed(index["deltas"]):
+        entries.extend(change for change in reversed(_load_delta(delta)) if change["op"] == "add")
+        if len(entries) >= CHANGELOG["feed_entries"]:
+            break
+    entries = entries[:CHANGELOG["feed_entries"]]
+
+    ET.register_namespace("", ATOM_NS)
+    feed = ET.Element(f"{{{ATOM_NS}}}feed")
+    _text(feed, "id", FEED_ID)
+    _text(feed, "title", CHANGELOG["feed_title"])
+    _text(feed, "updated", _timestamp(entries[0]["at"] if entries else index.get("updated_at") or clock.now().isoformat()))
+    if CHANGELOG["feed_url"]:
+        ET.SubElement(feed, f"{{{ATOM_NS}}}link", rel="self", href=CHANGELOG["feed_url"])
+    for change in entries:
+        r = change["record"]
+        entry = ET.SubElement(feed, f"{{{ATOM_NS}}}entry")
+        _text(entry, "id", f"{FEED_ID}:{change['seq']}")
+        _text(entry, "title", r.get("title") or r["url"])
+        ET.SubElement(entry, f"{{{ATOM_NS}}}link", rel="alternate", href=r["url"])
+        _text(entry, "updated", _timestamp(change["at"]))
+        author = ET.SubElement(entry, f"{{{ATOM_NS}}}author")
+        _text(author, "name", r.get("organization") or r.get("source") or "不明")
+        details = [r.get("prefecture"), r.get("update_date") and f"更新日 {r['update_date']}", r.get("snippet")]
+        if any(details):
+            _text(entry, "summary", " / ".join(d for d in details if d))
+    storage.atomic_write(FEED_FILE, ET.tostring(feed, encoding="utf-8", xml_declaration=True))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="結果の変更ログ（data/changes/）")
+    parser.add_argument("--since", type=int, metavar="SEQ", help="SEQ より後の変更を表示")
+    parser.add_argument("--compact", action="store_true", help="古い差分ファイルをスナップショットに畳む")
+    args = parser.parse_args()
+
+    if args.compact:
+        print(f"畳んだ差分ファイル: {compact()}件")
+    elif args.since is not None:
+        head, records, changes = read_since(args.since)
+        if records is not None:
+            print(f"スナップショットから: {len(records)}件")
+        for change in changes:
+            print(f"  {change['seq']} {change['op']} {change['at'][:16]} {change['record'].get('title', '')[:40]} <{change['url']}>")
+        print(f"最新の seq: {head}（{len(changes)}件の変更）")
+    else:
+        index = load_index()
+        snapshot = index["snapshot"]
+        print(f"最新の seq: {index['head']} / 差分ファイル: {len(index['deltas'])}件 ({CHANGES_DIR})")
+        if snapshot:
+            print(f"  スナップショット: seq {snapshot['seq']}（{snapshot['records']}件）")
+        for delta in index["deltas"][-5:]:
+            print(f"  {delta['file']}: {delta['count']}件（{delta['at'][:16]}）")
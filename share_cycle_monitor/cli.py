@@ -0,0 +1,92 @@
+"""コマンドラインエントリポイント（python -m share_cycle_monitor / share-cycle-monitor）"""
+import argparse
+import os
+from typing import List, Optional, Tuple
+
+from .main import SOURCES, main as run
+
+# --profile の既定出力先
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+
+
+def _parse_sources(value: str) -> List[str]:
+    """--sources の値（カンマ区切り）を検証"""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"不明なソース: {', '.join(unknown)}（指定可能: {', '.join(SOURCES)}）"
+        )
+    return names
+
+
+def _parse_worker(value: str) -> Tuple[int, int]:
+    """--worker の値（"2/3" 形式）を検証"""
+    index, _, count = value.partition("/")
+    if not (index.isdigit() and count.isdigit() and 1 <= int(index) <= int(count)):
+        raise argparse.ArgumentTypeError(f"I/N の形式で指定してください（1 <= I <= N）: {value}")
+    return int(index), int(count)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """引数パーサを構築"""
+    parser = argparse.ArgumentParser(prog="share-cycle-monitor", description="シェアサイクル公募・入札情報の監視")
+    parser.add_argument("--sources", type=_parse_sources, default=None, metavar="NAMES",
+                        help=f"実行するソース（カンマ区切り、既定: 全て）: {', '.join(SOURCES)}")
+    parser.add_argument("--dry-run", action="store_true", help="取得・統合のみ行い、保存・通知しない")
+    parser.add_argument("--no-notify", action="store_true", help="メール通知を行わない")
+    parser.add_argument("--daemon", action="store_true",
+                        help="常駐モード（ソースごとの間隔で繰り返し実行、設定は config.DAEMON_JOBS）")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, default="", metavar="DIR",
+                        help=f"cProfile / tracemalloc のスナップショットを出力（既定: {PROFILE_DIR}）")
+    parser.add_argument("--worker", type=_parse_worker, default=None, metavar="I/N",
+                        help="N個の並行ワーカーのI番目として担当分だけ取得し、部分結果を保存（統合は --merge）")
+    parser.add_argument("--merge", action="store_true", help="--run-id の全ワーカーの部分結果を統合して保存・通知")
+    parser.add_argument("--check-links", action="store_true",
+                        help="取得の代わりに蓄積結果のリンクを確認（リクエスト数は config.LIVENESS の budget まで）")
+    parser.add_argument("--deadline", type=float, default=None, metavar="MINUTES",
+                        help="取得の制限時間（分、0 で無制限。既定: config.RUN_DEADLINE_MINUTES）。"
+                             "過ぎたら期待値の低いクエリ・ページから打ち切る")
+    parser.add_argument("--run-id", default=None, metavar="ID",
+                        help="並行ワーカーの実行ID（既定: 現在の日時を1時間単位にしたもの）")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """引数を解釈して監視を実行（既定は1回実行、--daemon で常駐）"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        if args.dry_run or args.profile or args.worker or args.merge or args.deadline is not None:
+            parser.error("--daemon は --dry-run / --profile / --worker / --merge / --deadline と併用できません")
+        from .daemon import run_daemon
+        run_daemon(sources=args.sources, notify=not args.no_notify)
+        return 0
+
+    if args.check_links:
+        if args.daemon or args.worker or args.merge:
+            parser.error("--check-links は --daemon / --worker / --merge と併用できません")
+        from .liveness import run as check_links
+        check_links(dry_run=args.dry_run)
+        return 0
+
+    if args.merge:
+        if args.worker or args.dry_run:
+            parser.error("--merge は --worker / --dry-run と併用できません")
+        from .workers import default_run_id, merge
+        return 0 if merge(args.run_id or default_run_id(), notify=not args.no_notify) else 1
+
+    options = {"sources": args.sources, "dry_run": args.dry_run, "notify": not args.no_notify,
+               "deadline_minutes": args.deadline}
+    if args.worker:
+        from .workers import Worker
+        options["worker"] = Worker(args.worker[0] - 1, args.worker[1], args.run_id)
+
+    if args.profile:
+        from . import metrics
+        with metrics.profile(args.profile):
+            run(**options)
+    else:
+        run(**options)
+    return 0
@@ -0,0 +1,21 @@
+"""現在時刻の取得窓口（記録再生・シミュレーション時に差し替え可能）"""
+from datetime import datetime
+from typing import Callable, Optional
+
+_now_func: Callable[[], datetime] = datetime.now
+
+
+def now() -> datetime:
+    """現在時刻を取得（datetime.now() の代わりに使用）"""
+    return _now_func()
+
+
+def set_clock(func: Optional[Callable[[], datetime]]) -> None:
+    """時刻関数を差し替え（Noneで実時刻に戻す）"""
+    global _now_func
+    _now_func = func or datetime.now
+
+
+def freeze(moment: datetime) -> None:
+    """時刻を固定"""
+    set_clock(lambda: moment)
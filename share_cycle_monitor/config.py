@@ -0,0 +1,288 @@
+"""設定ファイル"""
+import os
+
+# Google Custom Search API
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID", "")
+
+# 官公需API
+KKJ_API_URL = "https://www.kkj.go.jp/api/search"
+
+# メール通知設定
+GMAIL_ADDRESS = os.environ.get("GMAIL_ADDRESS", "")
+GMAIL_APP_PASSWORD = os.environ.get("GMAIL_APP_PASSWORD", "")
+NOTIFY_EMAIL = os.environ.get("NOTIFY_EMAIL", "")
+
+# 購読プロファイル: 1回の取得結果をプロファイルごとに振り分け、別々のダイジェストとして通知する
+# keywords: タイトル・概要・発注機関・マッチしたキーワードのいずれかに含む結果（空なら全件）
+# exclude: 含む結果は除く / prefectures: 都道府県（短い表記。空なら地域を問わない）
+# recipients: 通知先（カンマ区切り。未設定のプロファイルは通知しない） / label・description: 件名・本文の見出し
+# 取得（検索クエリ・LGコード・監視ページ）は全プロファイル共通なので、対象は TOPICS 等にも含めること
+PROFILES = {
+    "default": {
+        "keywords": [], "exclude": [], "prefectures": [],
+        "recipients": NOTIFY_EMAIL,
+        "label": "シェアサイクル監視", "description": "シェアサイクル関連案件",
+    },
+    "okinawa-kickboard": {
+        "keywords": ["電動キックボード", "特定小型原動機付自転車", "マイクロモビリティ"], "exclude": [],
+        "prefectures": ["沖縄"],
+        "recipients": os.environ.get("NOTIFY_EMAIL_OKINAWA", ""),
+        "label": "沖縄 電動キックボード監視", "description": "沖縄県の電動キックボード・マイクロモビリティ関連案件",
+    },
+    "expo": {
+        "keywords": ["横浜万博", "EXPO2027", "園芸博"], "exclude": [], "prefectures": [],
+        "recipients": os.environ.get("NOTIFY_EMAIL_EXPO", ""),
+        "label": "横浜万博 モビリティ監視", "description": "横浜万博（EXPO2027）関連のモビリティ案件",
+    },
+}
+
+# 通知の候補と送信済みの記録
+# window_hours: 更新日がこの時間以内の結果を通知する。候補は更新日の日ごとに索引し（data/notify_index.json）、
+# retention_days を過ぎた日の分は落とす。送った結果はプロファイルごとに更新日・タイトルと合わせて記録し
+# （data/notify_ledger.json）、どちらかが変わるまで再送しない。ledger_days を過ぎた記録は落とす
+NOTIFY = {
+    "window_hours": 24,
+    "retention_days": 3,
+    "ledger_days": 30,
+    "dashboard_url": "https://share-cycle-monitor.vercel.app",
+}
+
+# 検索トピック（組み合わせ自動生成の基盤）
+# weight: 優先度スコア（高いほど頻繁に検索される）
+TOPICS = [
+    {"term": "シェアサイクル", "weight": 10},
+    {"term": "自転車シェアリング", "weight": 8},
+    {"term": "コミュニティサイクル", "weight": 7},
+    {"term": "サイクルポート", "weight": 6},
+    {"term": "シェアリング自転車", "weight": 5},
+    {"term": "電動キックボード", "weight": 8},
+    {"term": "特定小型原動機付自転車", "weight": 6},
+    {"term": "マイクロモビリティ", "weight": 7},
+]
+
+ACTIONS = [
+    {"term": "公募", "weight": 10},
+    {"term": "入札", "weight": 9},
+    {"term": "募集", "weight": 8},
+    {"term": "事業者", "weight": 8},
+    {"term": "プロポーザル", "weight": 7},
+    {"term": "企画提案", "weight": 7},
+    {"term": "事業者選定", "weight": 7},
+    {"term": "協定", "weight": 5},
+    {"term": "連携", "weight": 5},
+    {"term": "スポンサー", "weight": 4},
+    {"term": "実証実験", "weight": 6},
+    {"term": "用地", "weight": 4},
+]
+
+# イベント固有クエリ（期間限定で追加・削除）
+EVENT_QUERIES = [
+    "横浜万博 シェアサイクル",
+    "EXPO2027 シェアサイクル",
+    "園芸博 シェアサイクル",
+    "横浜万博 電動キックボード",
+]
+
+# 官公需APIの検索語（weight: 優先度の重み。締め切りがある実行では期待値の高い語から検索する）
+KKJ_QUERIES = [
+    {"term": "シェアサイクル", "weight": 10},
+    {"term": "サイクルポート", "weight": 6},
+    {"term": "自転車", "weight": 5},
+    {"term": "サイクル", "weight": 3},
+]
+
+# 入札情報サイト（site:指定でGoogle検索）
+PROCUREMENT_SITES = [
+    {"name": "njss", "domain": "njss.info"},
+    {"name": "nyusatsu-king", "domain": "nyusatsu-king.com"},
+]
+
+# クォータ設定（Google CSE無料枠 = 100クエリ/日）
+QUOTA = {
+    "daily_limit": 100,
+    "runs_per_day": 4,
+    "per_run": 25,
+    "allocation": {
+        "google": 10,
+        "njss": 4,
+        "nyusatsu-king": 4,
+        "event": 4,
+        "pagination": 3,  # 追加ページ（start=11, 21, ...）に使える回数
+    },
+}
+
+# 追加ページの取得条件: 前ページが満杯（10件）で、新規URLの割合が novelty_threshold 以上の間だけ
+# 次のページへ進む（1クエリあたり max_pages ページまで）。回数は QUOTA の pagination 枠と1日の残量から
+PAGINATION = {
+    "novelty_threshold": 0.5,
+    "max_pages": 3,
+}
+
+# 検索期間（dateRestrict=dN）: クエリの前回実行からの経過日数 + overlap_days を切り上げ、
+# min_days〜max_days に収める（未実行・長期間未実行のクエリは max_days まで広がる）
+DATE_WINDOW = {
+    "overlap_days": 2,
+    "min_days": 3,
+    "max_days": 30,
+}
+
+# アクセス間隔・robots.txt（ホスト単位）
+# crawl_delay: 同一ホストへのリクエスト間隔（秒）。robots.txt の Crawl-delay が長ければそちらを優先
+# burst: 間隔を空けずに送れるリクエスト数 / host_delays: ホスト別の間隔（API等）
+POLITENESS = {
+    "crawl_delay": 2.0,
+    "burst": 1,
+    "host_delays": {
+        "www.googleapis.com": 0.0,
+        "www.kkj.go.jp": 1.0,
+    },
+    "robots_ttl_hours": 24,
+    # robots.txt が取得できなかった（通信エラー・5xx）ときは全体を禁止とし、この間隔で取得し直す
+    "robots_retry_minutes": 30,
+    "robots_user_agent": "ShareCycleMonitor",
+}
+# 直接監視ページの同時取得数（ホストごとの間隔は POLITENESS に従う）
+DIRECT_FETCH_WORKERS = 8
+# 直接監視ページの解析（文字コード判定・HTML解析・更新日抽出）を行うプロセス数（0 なら利用可能なCPU数）
+# ページ数が pool_min_pages 未満、または使えるCPUが1つなら取得スレッド内で解析する
+PARSING = {
+    "workers": 0,
+    "pool_min_pages": 16,
+}
+
+# 直接監視ページの一覧（resources/watch_pages.csv）の巡回
+# priority=high のページは毎回、それ以外は URL のハッシュで shards 個に分け、1回の実行で1シャードずつ巡回する
+# シャード数 = revisit_hours の間の実行回数（runs_per_day は定期実行の回数。常駐モードはジョブの間隔から計算）
+WATCH_LIST = {
+    "revisit_hours": 24,
+    "runs_per_day": 4,
+}
+
+# 直接監視ページのスナップショット（data/snapshots/）
+# history: URLごとに残す版の数（それより古い版は --gc で削除）
+# 数字だけが変わった行（更新日・アクセス数等）は変更として扱わない
+SNAPSHOTS = {
+    "history": 5,
+}
+
+# 直接監視ページのホストのサイトマップ・RSS/Atom フィード（data/feeds.json）
+# ホストごとに robots.txt の Sitemap 行・ページの <link rel="alternate">・probe_paths から見つけ、
+# 毎回 If-None-Match / If-Modified-Since 付きで取得する。監視ページと同じディレクトリ以下の項目が
+# 載っているフィードがあるページは、新しい・更新された項目があるときだけ取得する（full_fetch_days ごとには必ず取得）
+# probe_paths: rediscover_days ごとに存在を確かめるパス / max_child_sitemaps: 1回に取得する子サイトマップの数
+# max_entries: フィードごとに残す項目の数（監視ページのディレクトリ以下のものだけ、新しく見つけた順）
+FEEDS = {
+    "enabled": True,
+    "full_fetch_days": 7,
+    "probe_paths": ["/sitemap.xml"],
+    "rediscover_days": 7,
+    "max_child_sitemaps": 10,
+    "max_entries": 500,
+    "timeout": 20,
+}
+
+# 結果の変更ログ（data/changes/。results.json を丸ごと取得しなくても前回からの変更だけを取得できる）
+# 結果の追加・更新に連番（seq）を振り、書き込みごとに差分ファイル（delta-<最初のseq>-<最後のseq>.json）を出す。
+# index.json に最新の seq と差分ファイル・スナップショットの一覧を載せる。
+# 差分ファイルが max_deltas を超えたら、新しい keep_deltas 個を残して古い分をスナップショットに畳む
+# feed.atom には新着の直近 feed_entries 件を載せる（feed_url は公開先の URL。あれば self リンクにする）
+CHANGELOG = {
+    "max_deltas": 100,
+    "keep_deltas": 50,
+    "feed_entries": 50,
+    "feed_title": "シェアサイクル関連 新着案件",
+    "feed_url": os.environ.get("SCM_FEED_URL", ""),
+}
+
+# 直接監視ページのヘルス管理（サーキットブレーカー）
+# failure_threshold 回連続で失敗したページは、base_backoff_hours から倍々（上限 max_backoff_hours）の
+# 間隔でのみ再試行し、その際のタイムアウトも失敗回数に応じて短くする
+HEALTH = {
+    "failure_threshold": 2,
+    "base_backoff_hours": 6,
+    "max_backoff_hours": 24 * 7,
+    "timeout": 30,
+    "min_timeout": 5,
+    "latency_smoothing": 0.3,
+}
+
+# 蓄積結果のリンク確認（--check-links）
+# budget: 1回の確認で送るリクエスト数の上限（HEAD と、HEAD を受け付けないサーバーへの Range 付き GET）
+# recheck_days: 確認済みのURLを再確認するまでの日数。未確認・取得日時の新しいURLから確認する
+LIVENESS = {
+    "budget": 100,
+    "workers": 8,
+    "recheck_days": 14,
+    "timeout": 15,
+}
+
+# 1回の実行（--daemon 以外）の制限時間（分）。--deadline で上書きでき、0 なら無制限
+# 締め切りを過ぎると各ソースは残りのクエリ・ページを取得せずに打ち切り、取得済みの結果だけを保存・通知する
+RUN_DEADLINE_MINUTES = 20
+
+# 作業（クエリ・監視ページ）の期待値 = 優先度の重み × 過去の収穫。締め切りがある実行で高い順に行う
+# クエリの収穫: 前回の実行の1回あたりの新規件数（(新規 + 1) / (回数 + 1)。未実行は 1）
+# ページの収穫: 最後に内容が変わってからの日数で change_half_life_days ごとに半減（未取得は 1）。
+# 連続失敗中のページは (失敗回数 + 1) で割る
+WORK_VALUE = {
+    "page_weights": {"high": 3, "normal": 1},
+    "change_half_life_days": 14,
+}
+
+# 常駐モード（--daemon）のジョブ設定
+# sources: 実行するソース / interval_minutes: 実行間隔 / jitter_minutes: 間隔のゆらぎ（±）
+# CSE系（google/njss/procurement）はクエリ選択を共有するため1ジョブにまとめる
+DAEMON_JOBS = {
+    "cse": {"sources": ["google", "njss", "procurement"], "interval_minutes": 360, "jitter_minutes": 20},
+    "kkj": {"sources": ["kkj"], "interval_minutes": 180, "jitter_minutes": 15},
+    "direct": {"sources": ["direct"], "interval_minutes": 60, "jitter_minutes": 10},
+}
+# 常駐モードで状態を data/ に書き出す間隔
+DAEMON_CHECKPOINT_MINUTES = 15
+
+# 監視対象地域のLGコード（都道府県コード）
+TARGET_LG_CODES = [
+    # 関東地方
+    "08",  # 茨城県
+    "09",  # 栃木県
+    "10",  # 群馬県
+    "11",  # 埼玉県
+    "12",  # 千葉県
+    "13",  # 東京都
+    "14",  # 神奈川県
+    # 沖縄県
+    "47",  # 沖縄県
+]
+# 後方互換性のため
+KANTO_LG_CODES = TARGET_LG_CODES
+
+# 地域キーワード
+TARGET_KEYWORDS = ["東京", "神奈川", "埼玉", "千葉", "茨城", "栃木", "群馬", "沖縄", "那覇", "石垣"]
+# 後方互換性のため
+KANTO_KEYWORDS = TARGET_KEYWORDS
+
+# データファイルパス（SCM_DATA_DIR で差し替え可能。記録再生時の作業用ディレクトリ等）
+DATA_DIR = os.environ.get("SCM_DATA_DIR") or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+RESULTS_FILE = os.path.join(DATA_DIR, "results.json")
+SEEN_URLS_FILE = os.path.join(DATA_DIR, "seen_urls.json")
+# results.json の集計（ダッシュボード用。結果の追加時に差分で更新）
+STATS_FILE = os.path.join(DATA_DIR, "stats.json")
+QUERY_STATE_FILE = os.path.join(DATA_DIR, "query_state.json")
+QUOTA_STATE_FILE = os.path.join(DATA_DIR, "quota_state.json")
+ROBOTS_CACHE_FILE = os.path.join(DATA_DIR, "robots_cache.json")
+PAGE_HEALTH_FILE = os.path.join(DATA_DIR, "page_health.json")
+WATCH_STATE_FILE = os.path.join(DATA_DIR, "watch_state.json")
+# 直接監視ページのスナップショット（objects/ に内容のハッシュ名で圧縮保存、index.json に URL ごとの版）
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+# 監視ページのホストのサイトマップ・フィードと、条件付きリクエスト用の ETag / Last-Modified・項目
+FEEDS_FILE = os.path.join(DATA_DIR, "feeds.json")
+# 通知の候補（更新日の日ごと）と、プロファイルごとの送信済みの記録
+NOTIFY_INDEX_FILE = os.path.join(DATA_DIR, "notify_index.json")
+NOTIFY_LEDGER_FILE = os.path.join(DATA_DIR, "notify_ledger.json")
+# 結果の変更ログ（index.json・差分ファイル・スナップショット・feed.atom）
+CHANGES_DIR = os.path.join(DATA_DIR, "changes")
+# 恒久的な転送（301/308）で分かった URL の置き換え（転送元 -> 転送先）
+URL_ALIASES_FILE = os.path.join(DATA_DIR, "url_aliases.json")
+# 並行ワーカーの部分結果（実行IDごとのディレクトリ。統合後に削除）
+PARTIALS_DIR = os.path.join(DATA_DIR, "partials")
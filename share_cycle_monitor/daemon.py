@@ -0,0 +1,141 @@
+"""常駐モード: ソースごとの間隔でジョブを実行し、状態をメモリ上に保持する
+
+    python -m share_cycle_monitor --daemon [--sources kkj,direct] [--no-notify]
+
+既出URLは起動時に1回だけ読み込み、以降はメモリ上で更新する。
+HTTPセッション（接続プール）もプロセス内で使い回される。
+状態は DAEMON_CHECKPOINT_MINUTES ごと、および終了時（SIGINT/SIGTERM）に data/ へ書き出す
+（新着は1回実行と同じく results.json の先頭に追加するので、その間に他の実行が書いた分も残る）。
+直接監視のスナップショットも、その回の結果を書き出したチェックポイントで保存する。
+"""
+import asyncio
+import random
+import signal
+from typing import Any, Dict, List, Optional
+
+from .config import DAEMON_JOBS, DAEMON_CHECKPOINT_MINUTES
+from . import clock
+from . import metrics
+from . import snapshots
+from .digests import recent_filter
+from .pipeline import Sink
+from .main import append_results, collect_async, load_seen_urls, notify_results, save_seen_urls
+
+
+class Daemon:
+    """ジョブスケジューラと常駐状態"""
+
+    def __init__(self, jobs: Dict[str, Dict[str, Any]], checkpoint_minutes: float, notify: bool = True):
+        self.jobs = jobs
+        self.checkpoint_seconds = checkpoint_minutes * 60
+        self.notify = notify
+        self.seen_urls = load_seen_urls()
+        self.dirty = False
+        self.added: List[Dict[str, Any]] = []  # 前回のチェックポイント以降に追加した結果
+        self.snapshots: Dict[str, Dict[str, Any]] = {}  # その結果を検出した直接監視の版の記録
+        self.stopping: Optional[asyncio.Event] = None
+
+    async def _sleep(self, seconds: float) -> bool:
+        """停止要求があるまで待機（停止要求ならTrue）"""
+        try:
+            await asyncio.wait_for(self.stopping.wait(), timeout=max(0.0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _apply(self, name: str, sink: Sink) -> None:
+        """ジョブの結果をメモリ上の状態に反映（イベントループのスレッドでのみ呼ぶ）"""
+        # 並行して動いた他のジョブが既に取り込んだURLは新着から除く（残りは既出URLと照合済み）
+        new_results = [item for item in sink.new if item.get("url") not in self.seen_urls]
+        self.added.extend(new_results)
+        if "direct" in self.jobs[name]["sources"]:
+            self.snapshots.update(snapshots.store.pending())
+        self.seen_urls |= sink.urls
+        self.dirty = True
+        print(f"[{name}] 新着 {len(new_results)}件 / 未保存 {len(self.added)}件")
+
+        # 既出の結果の更新も通知の候補にする（再送の抑止は送信済みの記録が行う）
+        if self.notify and sink.recent:
+            notify_results(sink.recent)
+
+    async def _run_job(self, name: str, job: Dict[str, Any]) -> None:
+        """1ジョブを間隔・ゆらぎ付きで繰り返し実行"""
+        interval = job["interval_minutes"] * 60
+        jitter = job.get("jitter_minutes", 0) * 60
+
+        # 起動直後の一斉実行を避けるため、ゆらぎの範囲でずらして開始
+        if await self._sleep(random.uniform(0, jitter)):
+            return
+        while True:
+            print(f"\n[{name}] 実行開始: {clock.now().isoformat()}")
+            try:
+                # ブロッキングI/Oはスレッド、直接監視は asyncio で取得（seen_urls は参照のみ）
+                keep_recent = recent_filter() if self.notify else None
+                sink = await collect_async(job["sources"], self.seen_urls, keep_recent)
+                self._apply(name, sink)
+            except Exception as e:
+                print(f"[{name}] ジョブエラー: {e}")
+
+            delay = interval + random.uniform(-jitter, jitter)
+            print(f"[{name}] 次回: {delay / 60:.0f}分後")
+            if await self._sleep(delay):
+                return
+
+    def checkpoint(self, final: bool = False) -> None:
+        """メモリ上の状態を data/ に書き出す"""
+        if self.dirty:
+            append_results(self.added)
+            save_seen_urls(self.seen_urls)
+            snapshots.store.save(self.snapshots)
+            print(f"チェックポイント: 新着 {len(self.added)}件 / 既出URL {len(self.seen_urls)}件")
+            self.dirty = False
+            self.added = []
+            self.snapshots = {}
+        # 計測はチェックポイント間隔ごとに1行として記録
+        metrics.finish_run()
+        if not final:
+            metrics.start_run()
+
+    async def _run_checkpoints(self) -> None:
+        """定期的にチェックポイントを取る"""
+        while not await self._sleep(self.checkpoint_seconds):
+            self.checkpoint()
+
+    async def run(self) -> None:
+        """停止要求まで全ジョブを実行し、終了時にチェックポイントを取る"""
+        self.stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stopping.set)
+            except NotImplementedError:
+                pass
+
+        metrics.start_run()
+        print(f"=== 常駐モード開始: {clock.now().isoformat()} ===")
+        for name, job in self.jobs.items():
+            print(f"  {name}: {', '.join(job['sources'])} / {job['interval_minutes']}分ごと (±{job.get('jitter_minutes', 0)}分)")
+
+        tasks = [asyncio.create_task(self._run_job(name, job)) for name, job in self.jobs.items()]
+        tasks.append(asyncio.create_task(self._run_checkpoints()))
+        await self.stopping.wait()
+        print("\n停止要求を受信。実行中のジョブの完了を待っています...")
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.checkpoint(final=True)
+        print(f"=== 常駐モード終了: {clock.now().isoformat()} ===")
+
+
+def select_jobs(sources: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """--sources 指定に合わせてジョブを絞り込み"""
+    jobs = {}
+    for name, job in DAEMON_JOBS.items():
+        job_sources = [s for s in job["sources"] if not sources or s in sources]
+        if job_sources:
+            jobs[name] = {**job, "sources": job_sources}
+    return jobs
+
+
+def run_daemon(sources: Optional[List[str]] = None, notify: bool = True) -> None:
+    """常駐モードで実行"""
+    daemon = Daemon(select_jobs(sources), DAEMON_CHECKPOINT_MINUTES, notify=notify)
+    asyncio.run(daemon.run())
@@ -0,0 +1,110 @@
+"""実行の締め切り（全ソース共通の制限時間と、協調的な打ち切り）
+
+main が実行の開始時に start で制限時間を決め、各ソースは作業単位（CSE のクエリ・官公需APIのクエリ・
+監視ページ）を始める前に skip で締め切りを確認する。締め切りを過ぎていれば残りの作業は取得せずに
+打ち切りとして記録し、取得済みの結果はそのまま統合・保存・通知する。
+各ソースは作業を期待値（優先度の重み × 過去の収穫）の高い順に行うので、打ち切られるのは期待値の低いものから。
+
+打ち切った作業は次回に回す: CSE のクエリは last_run を実行前に戻し、直接監視は巡回カーソルを進めない。
+経過時間は実時刻（time.monotonic）で測る（clock の差し替えの影響を受けない）。
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import metrics
+
+
+class Deadline:
+    """制限時間と、打ち切った作業の記録（スレッドセーフ。seconds=None なら無制限）"""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.dropped: Dict[str, List[str]] = {}
+        self._dropped: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """残り秒数（無制限ならNone）"""
+        if self.seconds is None:
+            return None
+        return self.seconds - (time.monotonic() - self.started)
+
+    def expired(self) -> bool:
+        """締め切りを過ぎたか"""
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, default: float) -> float:
+        """リクエストのタイムアウト秒数（締め切りまでの残りで頭打ち。最短1秒）"""
+        remaining = self.remaining()
+        return default if remaining is None else max(1.0, min(default, remaining))
+
+    def drop(self, source: str, items: List[str]) -> None:
+        """締め切りで打ち切った作業を記録"""
+        if not items:
+            return
+        with self._lock:
+            self.dropped.setdefault(source, []).extend(items)
+            self._dropped.update((source, item) for item in items)
+        metrics.count("deadline_dropped", len(items))
+
+    def skip(self, source: str, item: str) -> bool:
+        """締め切りを過ぎていれば作業を打ち切りとして記録し、True を返す"""
+        if not self.expired():
+            return False
+        self.drop(source, [item])
+        return True
+
+    def is_dropped(self, source: str, item: str) -> bool:
+        """打ち切った作業か"""
+        with self._lock:
+            return (source, item) in self._dropped
+
+    def report(self) -> None:
+        """打ち切った作業を表示"""
+        if not self.dropped:
+            return
+        print(f"\n--- 締め切り（{self.seconds / 60:g}分）により打ち切り ---")
+        for source, items in self.dropped.items():
+            shown = ", ".join(items[:5]) + (f" 他{len(items) - 5}件" if len(items) > 5 else "")
+            print(f"  {source}: {len(items)}件（{shown}）")
+        print("  取得済みの結果は保存し、打ち切った分は次回に回します")
+
+
+current = Deadline()
+
+
+def start(minutes: Optional[float]) -> Deadline:
+    """今回の実行の締め切りを設定（None・0以下なら無制限）"""
+    global current
+    current = Deadline(minutes * 60 if minutes and minutes > 0 else None)
+    if current.seconds is not None:
+        print(f"締め切り: 開始から{minutes:g}分")
+    return current
+
+
+def expired() -> bool:
+    """今回の実行の締め切りを過ぎたか"""
+    return current.expired()
+
+
+def timeout(default: float) -> float:
+    """締め切りまでの残りで頭打ちにしたタイムアウト秒数"""
+    return current.timeout(default)
+
+
+def skip(source: str, item: str) -> bool:
+    """締め切りを過ぎていれば作業を打ち切りとして記録し、True を返す"""
+    return current.skip(source, item)
+
+
+def drop(source: str, items: List[str]) -> None:
+    """締め切りで打ち切った作業を記録"""
+    current.drop(source, items)
+
+
+def is_dropped(source: str, item: str) -> bool:
+    """締め切りで打ち切った作業か"""
+    return current.is_dropped(source, item)
@@ -0,0 +1,233 @@
+"""通知の候補の索引と送信済みの記録
+
+候補の索引（data/notify_index.json）: 更新日が通知の期間（NOTIFY["window_hours"]）内だった結果を、
+更新日の日（YYYY-MM-DD）ごとに残す。通知のたびに結果を1件ずつ日付として解析し直さず、期間の最初の日
+以降の日の分だけを読む（日付の文字列は正規化済みなので比較は文字列のまま）。retention_days を過ぎた日は落とす。
+
+送信済みの記録（data/notify_ledger.json）: プロファイルごとに、送った結果の URL と変更の印
+（更新日とタイトル。直接監視のページの変更はその変更の ID も）。
+同じ印の結果は再送せず、更新日かタイトルが変わったら改めて送る（1回の変更につき1回）。
+ledger_days を過ぎた記録は落とす。
+
+    python -m share_cycle_monitor.digests          # 索引の日ごとの件数と、プロファイルごとの送信済み件数
+"""
+import argparse
+import functools
+import os
+import re
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set
+
+from .config import NOTIFY, NOTIFY_INDEX_FILE, NOTIFY_LEDGER_FILE
+from . import clock
+from . import serialization
+from . import storage
+
+_DATE = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+
+@functools.lru_cache(maxsize=4096)
+def _day(text: str) -> Optional[str]:
+    match = _DATE.fullmatch(text)
+    if not match:
+        return None
+    try:
+        return date(*map(int, match.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def day_of(date_str: Optional[str]) -> Optional[str]:
+    """更新日の日（YYYY-MM-DD に正規化。先頭10文字が YYYY-MM-DD 形式の日付でなければNone）"""
+    return _day(date_str[:10]) if isinstance(date_str, str) else None
+
+
+def first_day(now: Optional[datetime] = None, hours: Optional[float] = None) -> str:
+    """通知の期間に入る最初の日（その日の0時が now から hours 時間以内の日）"""
+    start = (now or clock.now()) - timedelta(hours=NOTIFY["window_hours"] if hours is None else hours)
+    day = start.date()
+    if start.time() != time(0):
+        day += timedelta(days=1)
+    return day.isoformat()
+
+
+def recent_filter(now: Optional[datetime] = None, hours: Optional[float] = None) -> Callable[[Optional[str]], bool]:
+    """更新日が通知の期間内かを判定する関数（期間の最初の日は1回だけ計算する）"""
+    first = first_day(now, hours)
+    return lambda date_str: (day_of(date_str) or "") >= first
+
+
+def change_key(record: Mapping[str, Any]) -> str:
+    """通知の上での変更の印（更新日とタイトル。直接監視のページの変更なら変更の ID も）"""
+    key = f"{record.get('update_date') or ''}|{record.get('title') or ''}"
+    change_id = record.get("change_id")
+    return f"{key}|{change_id}" if change_id else key
+
+
+class CandidateIndex:
+    """通知の候補（更新日の日 -> URL -> 結果。save するまでファイルには書かない）"""
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.path = path
+        self.settings = settings
+        self._days: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None
+        self._day_of_url: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.touched: Set[str] = set()
+
+    def _read(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return serialization.load_file(self.path) if os.path.exists(self.path) else {}
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        if self._days is None:
+            self._days = self._read()
+            self._day_of_url = {url: day for day, records in self._days.items() for url in records}
+        return self._days
+
+    def add(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """更新日のある結果を索引に加え（同じ URL は新しい内容で置き換え）、加えた件数を返す"""
+        added = 0
+        with self._lock:
+            days = self._load()
+            for record in records:
+                url = record.get("url")
+                day = day_of(record.get("update_date"))
+                if not url or day is None:
+                    continue
+                previous = self._day_of_url.get(url)
+                if previous is not None and previous != day:
+                    days[previous].pop(url, None)
+                    self.touched.add(previous)
+                days.setdefault(day, {})[url] = dict(record)
+                self._day_of_url[url] = day
+                self.touched.add(day)
+                added += 1
+        return added
+
+    def recent(self, first: str) -> List[Dict[str, Any]]:
+        """日が first 以降の候補（更新日の新しい順。同じ日の中は索引に加えた順）"""
+        with self._lock:
+            days = self._load()
+            return [record for day in sorted(days, reverse=True) if day >= first for record in days[day].values()]
+
+    def prune(self, now: Optional[datetime] = None) -> None:
+        """retention_days を過ぎた日の候補を落とす"""
+        oldest = ((now or clock.now()) - timedelta(days=self.settings["retention_days"])).date().isoformat()
+        with self._lock:
+            days = self._load()
+            for day in [day for day in days if day < oldest]:
+                for url in days.pop(day):
+                    self._day_of_url.pop(url, None)
+                self.touched.add(day)
+
+    def days(self) -> Dict[str, int]:
+        """日ごとの候補の件数"""
+        with self._lock:
+            return {day: len(records) for day, records in sorted(self._load().items(), reverse=True)}
+
+    def save(self) -> None:
+        """このプロセスで変えた日の分を保存（他のプロセスが保存した他の日の分は残す）"""
+        with self._lock:
+            if not self.touched:
+                return
+            with storage.locked(self.path):
+                days = self._read()
+                for day in self.touched:
+                    if self._days.get(day):
+                        days[day] = self._days[day]
+                    else:
+                        days.pop(day, None)
+                serialization.dump_file(self.path, dict(sorted(days.items(), reverse=True)))
+            self._days = None
+            self.touched = set()
+
+
+class SentLedger:
+    """プロファイルごとの送信済みの記録（プロファイル -> URL -> [変更の印, 送信日時]）"""
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.path = path
+        self.settings = settings
+        self._entries: Optional[Dict[str, Dict[str, List[str]]]] = None
+        self._lock = threading.Lock()
+        self.touched: Set[str] = set()  # (プロファイル, URL) を "\t" でつないだもの
+
+    def _read(self) -> Dict[str, Dict[str, List[str]]]:
+        return serialization.load_file(self.path) if os.path.exists(self.path) else {}
+
+    def _load(self) -> Dict[str, Dict[str, List[str]]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def reported(self, profile: str) -> Set[str]:
+        """プロファイルに送ったことのある URL"""
+        with self._lock:
+            return set(self._load().get(profile, {}))
+
+    def unsent(self, profile: str, records: Iterable[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+        """まだ送っていない（または送った後に変わった）結果。同じ URL は最初の1件だけ"""
+        with self._lock:
+            sent = self._load().get(profile, {})
+        result, urls = [], set()
+        for record in records:
+            url = record.get("url")
+            if url in urls:
+                continue
+            urls.add(url)
+            entry = sent.get(url)
+            if entry is None or entry[0] != change_key(record):
+                result.append(record)
+        return result
+
+    def mark(self, profile: str, records: Iterable[Mapping[str, Any]], now: Optional[datetime] = None) -> None:
+        """結果を送ったものとして記録"""
+        sent_at = (now or clock.now()).isoformat()
+        with self._lock:
+            entries = self._load().setdefault(profile, {})
+            for record in records:
+                entries[record["url"]] = [change_key(record), sent_at]
+                self.touched.add(f"{profile}\t{record['url']}")
+
+    def prune(self, now: Optional[datetime] = None) -> None:
+        """ledger_days を過ぎた記録を落とす"""
+        oldest = ((now or clock.now()) - timedelta(days=self.settings["ledger_days"])).isoformat()
+        with self._lock:
+            for profile, entries in self._load().items():
+                for url in [url for url, (_, sent_at) in entries.items() if sent_at < oldest]:
+                    del entries[url]
+                    self.touched.add(f"{profile}\t{url}")
+
+    def save(self) -> None:
+        """このプロセスで変えた記録を保存（他のプロセスが保存した分は残す）"""
+        with self._lock:
+            if not self.touched:
+                return
+            with storage.locked(self.path):
+                entries = self._read()
+                for key in self.touched:
+                    profile, url = key.split("\t", 1)
+                    entry = self._entries.get(profile, {}).get(url)
+                    if entry is not None:
+                        entries.setdefault(profile, {})[url] = entry
+                    else:
+                        entries.get(profile, {}).pop(url, None)
+                serialization.dump_file(self.path, entries)
+            self._entries = None
+            self.touched = set()
+
+
+candidates = CandidateIndex(NOTIFY_INDEX_FILE, NOTIFY)
+ledger = SentLedger(NOTIFY_LEDGER_FILE, NOTIFY)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="通知の候補の索引と送信済みの記録")
+    parser.parse_args()
+    first = first_day()
+    print(f"通知の候補（{first} 以降が通知の期間内）:")
+    for day, count in candidates.days().items():
+        print(f"  {day}: {count}件" + ("" if day >= first else "（期間外）"))
+    for profile, entries in sorted(ledger._load().items()):
+        print(f"送信済み [{profile}]: {len(entries)}件")
@@ -0,0 +1,400 @@
+"""監視ページのホストのサイトマップ・RSS/Atom フィードによる更新の検出
+
+自治体サイトの多くは lastmod 付きの sitemap.xml や新着情報の RSS/Atom を出しているので、直接監視の前に
+それらを条件付きリクエスト（If-None-Match / If-Modified-Since）で確認し、更新の載ったページだけを取得する
+（一覧ページの HTML を毎回取得・解析しない）。
+
+フィード・サイトマップはホストごとに次から見つけて data/feeds.json に残す:
+  - robots.txt の Sitemap 行
+  - 取得したページの <link rel="alternate" type="application/rss+xml" 等>
+  - FEEDS["probe_paths"]（rediscover_days ごとに確かめる。404・410 やフィードでない応答なら外す）
+サイトマップは iterparse で受信しながら読み、読み終えた要素は捨てる（巨大なサイトマップでも全体を木にしない）。
+項目は残さず、監視ページのディレクトリ（URL の最後の / まで）ごとに、その下の項目（URL と更新日時）の
+ハッシュだけを残し、ハッシュが変わった時刻を changed_at とする。
+サイトマップインデックスは、lastmod が変わった（または lastmod のない）子サイトマップだけを取得する。
+
+ページを取得するのは次のどれかに当てはまるとき:
+  - ページのディレクトリ以下の項目を載せたフィードがない、またはそのフィードの今回の確認に失敗した
+  - 未取得、または前回の取得から full_fetch_days 以上経過
+  - 前回の取得より後に、ディレクトリ以下の項目が新しく載った・更新された
+
+    python -m share_cycle_monitor.feeds            # ホストごとのフィードと、更新を追えているディレクトリ
+"""
+import argparse
+import contextlib
+import hashlib
+import os
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import requests
+import urllib3
+
+from .config import DIRECT_FETCH_WORKERS, FEEDS, FEEDS_FILE
+from . import clock
+from . import deadline
+from . import http_client
+from . import politeness
+from . import serialization
+from . import storage
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; ShareCycleMonitor/1.0)"
+}
+# ルート要素 -> 種類
+ROOT_KINDS = {"urlset": "sitemap", "sitemapindex": "index", "rss": "feed", "RDF": "feed", "feed": "feed"}
+# 存在しないとみなして外すステータス
+GONE = {404, 410}
+
+
+class NotAFeed(ValueError):
+    """フィード・サイトマップではない応答"""
+
+
+def _tag(elem: ET.Element) -> str:
+    return elem.tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem: ET.Element, *names: str) -> Optional[str]:
+    """子要素のうち names の順で最初に見つかったものの文字列"""
+    for name in names:
+        for child in elem:
+            if _tag(child) == name and child.text and child.text.strip():
+                return child.text.strip()
+    return None
+
+
+def _atom_link(entry: ET.Element) -> Optional[str]:
+    for child in entry:
+        if _tag(child) == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+            return child.get("href")
+    return None
+
+
+def parse(stream: IO[bytes]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """サイトマップ・フィードを読みながら (種類, URL, 更新日時) を順に返す
+
+    最初に ("root", 種類, None)、続いて項目ごとに ("url" | "sitemap" | "item", URL, 更新日時)。
+    読み終えた項目はルートから外すので、保持するのは読み途中の1項目だけ。
+    """
+    root = None
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+                kind = ROOT_KINDS.get(_tag(elem))
+                if kind is None:
+                    raise NotAFeed(f"フィード・サイトマップではありません（<{_tag(elem)}>）")
+                yield "root", kind, None
+            continue
+        tag = _tag(elem)
+        if tag in ("url", "sitemap"):
+            loc = _child_text(elem, "loc")
+            if loc:
+                yield tag, loc, _child_text(elem, "lastmod")
+        elif tag == "item":  # RSS 2.0 / RSS 1.0
+            link = _child_text(elem, "link") or elem.get("{http://www.w3.org/1999/02/22-rdf-syntax-ns#}about")
+            if link:
+                yield "item", link, _child_text(elem, "pubDate", "date")
+        elif tag == "entry":  # Atom
+            link = _atom_link(elem)
+            if link:
+                yield "item", link, _child_text(elem, "updated", "published")
+        else:
+            continue
+        root.clear()
+
+
+def _key(url: str) -> str:
+    """照合用のキー（スキームを除いたホスト + パス）"""
+    parts = urlsplit(url)
+    return parts.netloc.lower() + (parts.path or "/")
+
+
+def directory(url: str) -> str:
+    """ページのディレクトリ（照合用のキーの最後の / まで）"""
+    key = _key(url)
+    return key[:key.rfind("/") + 1]
+
+
+class FeedTracker:
+    """ホストごとのフィードと、ディレクトリごとの更新の記録（スレッドセーフ。save するまでファイルには書かない）"""
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.path = path
+        self.settings = settings
+        self._state: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self.touched_hosts: Set[str] = set()
+        self.touched_sources: Set[str] = set()
+        self.polled: Dict[str, bool] = {}  # 今回確認したフィード -> 確認できたか
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        state = serialization.load_file(self.path) if os.path.exists(self.path) else {}
+        return {"hosts": state.get("hosts", {}), "sources": state.get("sources", {})}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._state is None:
+            self._state = self._read()
+        return self._state
+
+    def _host(self, host: str) -> Dict[str, Any]:
+        return self._load()["hosts"].setdefault(host, {"sources": [], "discovered_at": None})
+
+    def source(self, url: str) -> Optional[Dict[str, Any]]:
+        """フィードの記録（未確認ならNone）"""
+        with self._lock:
+            entry = self._load()["sources"].get(url)
+            return dict(entry) if entry else None
+
+    def sources(self, host: str) -> List[str]:
+        """ホストのフィード（サイトマップインデックスの子サイトマップを含む）"""
+        with self._lock:
+            state = self._load()
+            urls = list(state["hosts"].get(host, {}).get("sources", []))
+            for url in list(urls):
+                urls.extend(state["sources"].get(url, {}).get("children", {}))
+            return urls
+
+    def register(self, page_url: str, urls: Iterable[str]) -> None:
+        """ページのホストのフィードに加える（相対URLはページからの相対）"""
+        host = urlsplit(page_url).netloc.lower()
+        with self._lock:
+            entry = self._host(host)
+            for url in urls:
+                url = urljoin(page_url, url)
+                if url not in entry["sources"]:
+                    entry["sources"].append(url)
+                    self.touched_hosts.add(host)
+
+    def _remove(self, host: str, url: str) -> None:
+        with self._lock:
+            entry = self._host(host)
+            if url in entry["sources"]:
+                entry["sources"].remove(url)
+                self.touched_hosts.add(host)
+            if self._load()["sources"].pop(url, None) is not None:
+                self.touched_sources.add(url)
+
+    def _discover(self, origin: str) -> List[str]:
+        """ホストのフィード（robots.txt の Sitemap 行と、期限が来ていれば probe_paths を加えて）"""
+        host = urlsplit(origin).netloc.lower()
+        found = politeness.robots.sitemaps(origin + "/")
+        now = clock.now()
+        with self._lock:
+            entry = self._host(host)
+            discovered = entry["discovered_at"]
+            if not discovered or now - datetime.fromisoformat(discovered) >= timedelta(days=self.settings["rediscover_days"]):
+                found += [urljoin(origin, path) for path in self.settings["probe_paths"]]
+                entry["discovered_at"] = now.isoformat()
+                self.touched_hosts.add(host)
+            for url in found:
+                if url not in entry["sources"]:
+                    entry["sources"].append(url)
+                    self.touched_hosts.add(host)
+            return list(entry["sources"])
+
+    def _request(self, url: str, state: Dict[str, Any]) -> Optional[requests.Response]:
+        """条件付きリクエスト（robots.txt で禁止・通信エラーなら None）"""
+        if not politeness.check_robots(url):
+            return None
+        headers = dict(HEADERS)
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+        try:
+            return http_client.get(url, headers=headers, timeout=deadline.timeout(self.settings["timeout"]), stream=True)
+        except requests.exceptions.RequestException as e:
+            print(f"  フィード取得エラー ({url}): {e}")
+            return None
+
+    def _poll_source(self, host: str, url: str, directories: Set[str], nested: bool = False) -> bool:
+        """フィードを確認し、ディレクトリごとの更新を記録（確認できたか）"""
+        with self._lock:
+            previous = self._load()["sources"].get(url) or {}
+        response = self._request(url, previous)
+        if response is None:
+            return False
+        now = clock.now().isoformat()
+        with contextlib.closing(response):
+            if response.status_code == 304:
+                with self._lock:
+                    self._load()["sources"][url] = {**previous, "checked_at": now}
+                    self.touched_sources.add(url)
+                return self._poll_children(host, url, previous.get("children", {}), directories, nested)
+            if response.status_code != 200:
+                print(f"  フィード取得エラー ({url}): HTTP {response.status_code}")
+                if response.status_code in GONE:
+                    self._remove(host, url)
+                return False
+            digests = {d: hashlib.sha1() for d in directories}
+            items = dict.fromkeys(directories, 0)
+            children: Dict[str, Optional[str]] = {}
+            kind = None
+            try:
+                for tag, link, updated in parse(http_client.open_body(response)):
+                    if tag == "root":
+                        kind = link
+                    elif tag == "sitemap":
+                        children[urljoin(url, link)] = updated
+                    else:
+                        key = _key(urljoin(url, link))
+                        for d in directories:
+                            if key.startswith(d):
+                                digests[d].update(f"{key}\t{updated}\n".encode("utf-8"))
+                                items[d] += 1
+            except (ET.ParseError, NotAFeed) as e:
+                if kind is None:  # HTML 等（存在しないパスにトップページを返すサイト等）
+                    print(f"  フィードとして読めないため外します ({url}): {e}")
+                    self._remove(host, url)
+                else:
+                    print(f"  フィード解析エラー ({url}): {e}")
+                return False
+            except (OSError, urllib3.exceptions.HTTPError, requests.exceptions.RequestException) as e:
+                print(f"  フィード取得エラー ({url}): {e}")
+                return False
+
+        entry = {
+            "kind": kind,
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "checked_at": now,
+            "directories": dict(previous.get("directories", {})),
+        }
+        for d in directories:
+            # 一度も項目の載らないディレクトリは追えていないものとして記録しない
+            recorded = entry["directories"].get(d)
+            if recorded is None and not items[d]:
+                continue
+            digest = digests[d].hexdigest()
+            if recorded is None or recorded["digest"] != digest:
+                entry["directories"][d] = {"digest": digest, "items": items[d], "changed_at": now}
+        if kind == "index":
+            entry["children"] = previous.get("children", {})
+        with self._lock:
+            self._load()["sources"][url] = entry
+            self.touched_sources.add(url)
+        if kind == "index" and not nested:
+            return self._poll_children(host, url, children, directories, nested)
+        return True
+
+    def _poll_children(self, host: str, url: str, children: Dict[str, Optional[str]],
+                       directories: Set[str], nested: bool) -> bool:
+        """サイトマップインデックスの子のうち lastmod が変わったものを確認（全部確認できたか）"""
+        if nested:
+            return True
+        with self._lock:
+            entry = self._load()["sources"].get(url)
+            if entry is None or entry.get("kind") != "index":
+                return True
+            known = dict(entry.get("children", {}))
+        changed = [child for child, lastmod in children.items() if lastmod is None or known.get(child) != lastmod]
+        complete = len(changed) <= self.settings["max_child_sitemaps"]
+        polled = {}
+        for child in changed[:self.settings["max_child_sitemaps"]]:
+            if deadline.expired():
+                complete = False
+                break
+            ok = self._poll_source(host, child, directories, nested=True)
+            self.polled[child] = ok
+            if ok:
+                polled[child] = children[child]
+            complete = complete and ok
+        with self._lock:
+            state = self._load()
+            # 確認できた子だけ lastmod を進める（残りは次回に確認）。インデックスから消えた子は記録も消す
+            current = {child: polled.get(child, known.get(child)) for child in children}
+            for child in set(known) - set(children):
+                if state["sources"].pop(child, None) is not None:
+                    self.touched_sources.add(child)
+            state["sources"][url] = {**state["sources"][url], "children": current}
+            self.touched_sources.add(url)
+        for child in children:  # lastmod の変わっていない子は前回の記録のまま使える
+            self.polled.setdefault(child, child not in changed)
+        return complete
+
+    def _poll_host(self, origin: str, directories: Set[str]) -> None:
+        host = urlsplit(origin).netloc.lower()
+        for url in self._discover(origin):
+            if deadline.expired():
+                return
+            self.polled[url] = self._poll_source(host, url, directories)
+
+    def poll(self, pages: List[Dict[str, Any]], watched: List[Dict[str, Any]]) -> None:
+        """今回取得するページのホストのフィードを確認（ディレクトリは watched の全ページ分を追う）"""
+        self.polled = {}
+        if not self.settings["enabled"] or not pages:
+            return
+        origins: Dict[str, str] = {}
+        for page in pages:
+            parts = urlsplit(page["url"])
+            origins.setdefault(parts.netloc.lower(), f"{parts.scheme}://{parts.netloc}")
+        directories: Dict[str, Set[str]] = {}
+        for page in watched + pages:
+            directories.setdefault(urlsplit(page["url"]).netloc.lower(), set()).add(directory(page["url"]))
+        with ThreadPoolExecutor(max_workers=DIRECT_FETCH_WORKERS) as pool:
+            list(pool.map(lambda host: self._poll_host(origins[host], directories[host]), origins))
+
+    def should_fetch(self, url: str, checked_at: Optional[str]) -> bool:
+        """ページを取得すべきか（checked_at は前回の取得日時。未取得ならNone）"""
+        if not self.settings["enabled"] or checked_at is None:
+            return True
+        checked = datetime.fromisoformat(checked_at)
+        if clock.now() - checked >= timedelta(days=self.settings["full_fetch_days"]):
+            return True
+        d = directory(url)
+        covered = False
+        for source in self.sources(urlsplit(url).netloc.lower()):
+            entry = self.source(source)
+            recorded = (entry or {}).get("directories", {}).get(d)
+            if recorded is None:
+                continue
+            if not self.polled.get(source) or datetime.fromisoformat(recorded["changed_at"]) > checked:
+                return True
+            covered = True
+        return not covered
+
+    def save(self) -> None:
+        """このプロセスで記録したホスト・フィードを保存（他のプロセスが保存した分は残す）"""
+        with self._lock:
+            if not self.touched_hosts and not self.touched_sources:
+                return
+            with storage.locked(self.path):
+                state = self._read()
+                for section, touched in (("hosts", self.touched_hosts), ("sources", self.touched_sources)):
+                    for key in touched:
+                        if key in self._state[section]:
+                            state[section][key] = self._state[section][key]
+                        else:
+                            state[section].pop(key, None)
+                serialization.dump_file(self.path, state)
+            self._state = state
+            self.touched_hosts = set()
+            self.touched_sources = set()
+
+
+tracker = FeedTracker(FEEDS_FILE, FEEDS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="監視ページのホストのサイトマップ・フィード")
+    parser.parse_args()
+    state = tracker._load()
+    for host, entry in sorted(state["hosts"].items()):
+        print(f"{host}（確認 {(entry['discovered_at'] or '未')[:16]}）")
+        if not entry["sources"]:
+            print("  フィードなし")
+        for url in tracker.sources(host):
+            source = state["sources"].get(url)
+            if source is None:
+                print(f"  {url}: 未確認")
+                continue
+            directories = source.get("directories", {})
+            print(f"  {url}: {source['kind']}（確認 {source['checked_at'][:16]}）")
+            for d, recorded in sorted(directories.items()):
+                print(f"    {d}: {recorded['items']}件（更新 {recorded['changed_at'][:16]}）")
@@ -0,0 +1,344 @@
+"""重要なページを直接監視するスクリプト"""
+import asyncio
+import hashlib
+import time
+import requests
+from concurrent.futures import BrokenExecutor, Executor, Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from .config import DIRECT_FETCH_WORKERS, WORK_VALUE
+from . import clock
+from . import deadline
+from . import feeds
+from . import health
+from . import http_client
+from . import parsing
+from . import politeness
+from . import snapshots
+from . import watchlist
+from .parsing import ParsedPage, extract_update_date  # extract_update_date は従来どおりここからも使える
+from .records import Record
+from .watchlist import COMMON_KEYWORDS  # 従来どおりここからも使える
+
+# 直接監視するページのリスト（resources/watch_pages.csv）
+WATCH_PAGES = watchlist.load()
+
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; ShareCycleMonitor/1.0)"
+}
+
+
+def _check_before_fetch(url: str) -> bool:
+    """robots.txt とヘルス状態（回路遮断中か）を確認"""
+    if not health.tracker.should_fetch(url):
+        entry = health.tracker.entry(url)
+        print(f"回路遮断中のため取得しません ({url}): {entry['consecutive_failures']}回連続失敗、次回 {entry['next_probe'][:16]}")
+        return False
+    if not politeness.check_robots(url):
+        print(f"robots.txtにより取得しません ({url})")
+        return False
+    return True
+
+
+def _record_failure(url: str, e: requests.exceptions.RequestException) -> None:
+    if deadline.expired():  # 締め切りで短くしたタイムアウト等による失敗は、ページの失敗に数えず次回に回す
+        deadline.drop("direct", [url])
+        print(f"締め切りのため取得を中断 ({url})")
+        return
+    status = e.response.status_code if getattr(e, "response", None) is not None else None
+    health.tracker.record_failure(url, status, str(e))
+    print(f"ページ取得エラー ({url}): {e}")
+
+
+def fetch_page(url: str) -> bytes:
+    """ページを取得し、本文のバイト列を返す（robots.txt で禁止、または回路遮断中なら取得しない）"""
+    if not _check_before_fetch(url):
+        return b""
+    start = time.perf_counter()
+    try:
+        response = http_client.get(url, headers=HEADERS, timeout=deadline.timeout(health.tracker.timeout_for(url)))
+        response.raise_for_status()
+        health.tracker.record_success(url, time.perf_counter() - start)
+        return response.content
+    except requests.exceptions.RequestException as e:
+        _record_failure(url, e)
+        return b""
+
+
+async def fetch_page_async(url: str) -> bytes:
+    """ページを取得（asyncio版）"""
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, _check_before_fetch, url):
+        return b""
+    start = time.perf_counter()
+    try:
+        response = await http_client.get_async(url, headers=HEADERS,
+                                               timeout=deadline.timeout(health.tracker.timeout_for(url)))
+        response.raise_for_status()
+        health.tracker.record_success(url, time.perf_counter() - start)
+        return response.content
+    except requests.exceptions.RequestException as e:
+        _record_failure(url, e)
+        return b""
+
+
+def _to_record(parsed: ParsedPage, page_config: Dict[str, Any]) -> Record:
+    return Record(
+        title=parsed.title,
+        url=page_config["url"],
+        prefecture=page_config.get("prefecture", ""),
+        organization=page_config.get("organization", ""),
+        snippet=parsed.snippet,
+        matched_keywords=list(parsed.matched_keywords),
+        update_date=parsed.update_date,
+        source="direct",
+        fetched_at=clock.now(),
+    )
+
+
+def _change_records(parsed: ParsedPage, page_config: Dict[str, Any], change: snapshots.Change) -> List[Record]:
+    """前回から追加された行・リンクにキーワードがあれば、ページと追加リンクのレコードにする
+
+    更新日はページの表記（なければ変更を検出した日）。追加リンクはリンク文字列にキーワードがあるものだけ。
+    ページのレコードの URL は変更ごとに別にする（ページの URL + #change-<追加内容のハッシュ>。change_id にも残す）。
+    ページの URL のままだと既出URLとして新着にならず、同じ日の2回目の変更も送信済みの記録で通知されない。
+    """
+    keywords = page_config.get("keywords", [])
+    matched = [keyword for keyword in keywords if keyword in change.added_text]
+    if not matched:
+        return []
+    update_date = parsed.update_date or clock.now().date().isoformat()
+    added = " / ".join(change.added_lines)
+    page = _to_record(parsed._replace(update_date=update_date, matched_keywords=tuple(matched)), page_config)
+    page["snippet"] = added[:200] + "..." if len(added) > 200 else added
+    page["change_id"] = hashlib.sha1(change.added_text.encode("utf-8")).hexdigest()[:12]
+    page["url"] = f"{page_config['url']}#change-{page['change_id']}"
+    records = [page]
+    for href, text in change.added_links:
+        link_keywords = [keyword for keyword in keywords if keyword in text]
+        if link_keywords and href != page_config["url"]:
+            link = _to_record(parsed._replace(title=text, update_date=update_date,
+                                              matched_keywords=tuple(link_keywords)), page_config)
+            link["url"] = href
+            link["snippet"] = f"{parsed.title} に追加されたリンク"
+            records.append(link)
+    return records
+
+
+def extract_info(html: str, page_config: Dict[str, Any]) -> Record:
+    """ページから情報を抽出"""
+    return _to_record(parsing.parse_html(html, page_config.get("keywords", [])), page_config)
+
+
+def _submit_parse(parser: Executor, page_config: Dict[str, Any], content: bytes) -> Optional[Future]:
+    """取得したバイト列の解析を依頼（取得失敗ならNone）"""
+    if not content:
+        return None
+    keywords = page_config.get("keywords", [])
+    try:
+        return parser.submit(parsing.parse_page, content, keywords)
+    except BrokenExecutor as e:  # 解析プロセスが異常終了した後は、取得スレッド内で解析する
+        print(f"解析プロセス停止のため取得スレッドで解析 ({page_config['url']}): {e}")
+        return parsing.InProcessExecutor().submit(parsing.parse_page, content, keywords)
+
+
+def _process_page(page_config: Dict[str, Any], parsed: Optional[ParsedPage]) -> List[Record]:
+    """前回のスナップショットと比べ、追加された内容がキーワードにマッチすれば結果を返す
+
+    初めて取得したページは、従来どおりページ全体がキーワードにマッチすれば結果にする。
+    """
+    url = page_config["url"]
+    print(f"直接監視: {url}")
+    if parsed is None:
+        print(f"  取得失敗")
+        return []
+    if parsed.feeds:
+        feeds.tracker.register(url, parsed.feeds)
+    change = snapshots.store.record(url, snapshots.make(parsed, url))
+    if change is None:
+        if parsed.matched_keywords:
+            print(f"  マッチ（初回）: {list(parsed.matched_keywords)}")
+            return [_to_record(parsed, page_config)]
+        print(f"  キーワードマッチなし（初回）")
+        return []
+    if not change.meaningful:
+        print(f"  変更なし" + (f"（数字だけの変更 {change.ignored_lines}行）" if change.ignored_lines else ""))
+        return []
+    records = _change_records(parsed, page_config, change)
+    summary = f"追加 {len(change.added_lines)}行・リンク{len(change.added_links)}件"
+    if records:
+        print(f"  変更あり（{summary}）、マッチ: {records[0]['matched_keywords']}")
+    else:
+        print(f"  変更あり（{summary}）、キーワードマッチなし")
+    return records
+
+
+def _parse_error(page_config: Dict[str, Any], e: Exception) -> None:
+    print(f"ページ解析エラー ({page_config['url']}): {e}")
+
+
+def page_value(page_config: Dict[str, Any], now: Optional[datetime] = None) -> float:
+    """ページの期待値（優先度の重み × 最後に内容が変わってからの日数で半減する収穫 ÷ (連続失敗回数 + 1)）"""
+    url = page_config["url"]
+    value = WORK_VALUE["page_weights"].get(page_config.get("priority"), 1)
+    entry = snapshots.store.entry(url)
+    if entry is not None:
+        days = ((now or clock.now()) - datetime.fromisoformat(entry["changed_at"])).total_seconds() / 86400
+        value *= 0.5 ** (max(0.0, days) / WORK_VALUE["change_half_life_days"])
+    return value / (health.tracker.entry(url)["consecutive_failures"] + 1)
+
+
+def _select(pages: Optional[List[Dict[str, Any]]], runs_per_day: Optional[float],
+            owns: Optional[Callable[[str], bool]] = None) -> Tuple[List[Dict[str, Any]], Optional[Tuple[int, int]]]:
+    """巡回するページ（期待値の高い順）と (シャード番号, シャード数)。pages を指定した場合はシャードに分けずに全件
+
+    owns を渡すと、そのうち owns(url) が真のページだけ（並行ワーカーの担当分）にする。
+    """
+    shard = None
+    if pages is None:
+        pages, index, shards = watchlist.select_for_run(WATCH_PAGES, runs_per_day)
+        shard = (index, shards)
+    if owns is not None:
+        pages = [page for page in pages if owns(page["url"])]
+        print(f"直接監視: 担当 {len(pages)}件")
+    now = clock.now()
+    return sorted(pages, key=lambda page: page_value(page, now), reverse=True), shard
+
+
+def _skip_unchanged(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """ホストのサイトマップ・フィードを確認し、更新の載っていないページを除く（除いたページは巡回済みとして扱う）"""
+    feeds.tracker.poll(pages, WATCH_PAGES)
+    fetched = []
+    for page in pages:
+        entry = snapshots.store.entry(page["url"])
+        if feeds.tracker.should_fetch(page["url"], entry["checked_at"] if entry else None):
+            fetched.append(page)
+    if len(fetched) < len(pages):
+        print(f"直接監視: サイトマップ・フィードに更新のない {len(pages) - len(fetched)}件は取得しません")
+    return fetched
+
+
+def _report(count: int, shard: Optional[Tuple[int, int]], rotate: bool, save_state: bool,
+            dropped: int = 0) -> None:
+    if dropped:
+        print(f"直接監視: 締め切りにより {dropped}件を打ち切り" + ("（巡回カーソルは進めません）" if shard else ""))
+    elif shard is not None and rotate:
+        watchlist.rotation.complete(*shard)
+    if save_state:
+        feeds.tracker.save()
+    health.tracker.save()
+    print(f"直接監視: {count}件の結果を取得")
+    waited = politeness.limiter.wait_report()
+    if waited:
+        slowest = sorted(waited.items(), key=lambda x: x[1], reverse=True)[:5]
+        print("  間隔待ち: " + ", ".join(f"{host} {seconds:.1f}秒" for host, seconds in slowest))
+
+
+def iter_results(pages: Optional[List[Dict[str, Any]]] = None, runs_per_day: Optional[float] = None,
+                 rotate: bool = True, owns: Optional[Callable[[str], bool]] = None,
+                 save_state: bool = True) -> Iterator[Record]:
+    """今回巡回する監視ページ（優先ページ + 1シャード。pages を指定すればその全件）を取得し、
+    前回から追加された内容がマッチしたページ（と追加リンク）から順に返す
+
+    取得の前に feeds でホストのサイトマップ・フィードを確認し、更新の載っていないページは取得しない。
+    取得はスレッドで並行（ホストごとの間隔は politeness に従う）、解析は parsing の解析プロセスで行う。
+    最後まで取得すると巡回カーソルを次のシャードへ進める（rotate=False、締め切りで打ち切ったページがあれば進めない）。
+    owns を渡すと、巡回するページのうち owns(url) が真のものだけを取得する（並行ワーカー用）。
+    今回の版は記録するだけで、結果を保存した後に呼び出し側が snapshots.store.save() で保存する。
+    save_state=False ならサイトマップ・フィードの確認状態も保存しない（ドライラン用）。
+    """
+    pages, shard = _select(pages, runs_per_day, owns)
+    pages = _skip_unchanged(pages)
+    count = dropped = 0
+    with parsing.pool_for(len(pages)) as parser, \
+            ThreadPoolExecutor(max_workers=DIRECT_FETCH_WORKERS) as pool:
+        def fetch(page_config: Dict[str, Any]) -> Optional[Future]:
+            if deadline.skip("direct", page_config["url"]):
+                return None
+            return _submit_parse(parser, page_config, fetch_page(page_config["url"]))
+
+        # 取得スレッドは取得後すぐに解析を依頼して次のページへ進む
+        # map は先頭から完了を待つので、pages の順序のまま逐次返る
+        futures = pool.map(fetch, pages)
+        for page_config, future in zip(pages, futures):
+            if deadline.is_dropped("direct", page_config["url"]):
+                dropped += 1
+                continue
+            parsed = None
+            if future is not None:
+                try:
+                    parsed = future.result()
+                except Exception as e:
+                    _parse_error(page_config, e)
+            for info in _process_page(page_config, parsed):
+                count += 1
+                yield info
+
+    _report(count, shard, rotate, save_state, dropped)
+
+
+async def aiter_results(pages: Optional[List[Dict[str, Any]]] = None, runs_per_day: Optional[float] = None,
+                        rotate: bool = True, owns: Optional[Callable[[str], bool]] = None,
+                        save_state: bool = True) -> AsyncIterator[Record]:
+    """iter_results の asyncio版（常駐モードで使用。シャード数は常駐モードの実行間隔から決める）"""
+    pages, shard = _select(pages, runs_per_day or watchlist.DAEMON_RUNS_PER_DAY, owns)
+    pages = await asyncio.get_running_loop().run_in_executor(None, _skip_unchanged, pages)
+    semaphore = asyncio.Semaphore(DIRECT_FETCH_WORKERS)
+    parser = parsing.pool_for(len(pages))
+
+    async def fetch(page_config: Dict[str, Any]) -> Optional[ParsedPage]:
+        async with semaphore:
+            if deadline.skip("direct", page_config["url"]):
+                return None
+            content = await fetch_page_async(page_config["url"])
+        future = _submit_parse(parser, page_config, content)
+        if future is None:
+            return None
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            _parse_error(page_config, e)
+            return None
+
+    tasks = [asyncio.ensure_future(fetch(page_config)) for page_config in pages]
+    count = dropped = 0
+    try:
+        for page_config, task in zip(pages, tasks):
+            parsed = await task
+            if deadline.is_dropped("direct", page_config["url"]):
+                dropped += 1
+                continue
+            for info in _process_page(page_config, parsed):
+                count += 1
+                yield info
+    finally:
+        for task in tasks:
+            task.cancel()
+        parser.shutdown(wait=False, cancel_futures=True)
+
+    _report(count, shard, rotate, save_state, dropped)
+
+
+def fetch_all(pages: Optional[List[Dict[str, Any]]] = None) -> List[Record]:
+    """監視ページを取得（pages 未指定なら今回巡回する分）し、今回の版を保存"""
+    results = list(iter_results(pages))
+    snapshots.store.save()
+    return results
+
+
+async def fetch_all_async(pages: Optional[List[Dict[str, Any]]] = None) -> List[Record]:
+    """監視ページを取得（asyncio版）"""
+    results = [info async for info in aiter_results(pages)]
+    snapshots.store.save()
+    return results
+
+
+if __name__ == "__main__":
+    results = fetch_all(WATCH_PAGES)
+    for r in results:
+        print(f"\n=== {r['title']} ===")
+        print(f"URL: {r['url']}")
+        print(f"組織: {r['organization']}")
+        print(f"マッチキーワード: {r['matched_keywords']}")
+        print(f"概要: {r['snippet'][:100]}...")
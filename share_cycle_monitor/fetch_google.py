@@ -0,0 +1,166 @@
+"""Google Custom Search APIを使用して自治体サイトからシェアサイクル関連情報を検索"""
+import re
+import requests
+from typing import Any, Dict, Iterator, List, Optional
+from .config import GOOGLE_API_KEY, GOOGLE_CSE_ID
+from . import clock
+from . import deadline
+from . import gazetteer
+from . import http_client
+from . import metrics
+from . import quota
+from .quota import SearchPlan
+from .records import Record
+
+# Custom Search JSON API のエンドポイント（負荷試験ではスタンドインに差し替える）
+CSE_URL = "https://www.googleapis.com/customsearch/v1"
+
+# 月名を数字に変換
+MONTH_MAP = {
+    'Jan': '01', 'Feb': '02', 'Mar': '03', 'Apr': '04',
+    'May': '05', 'Jun': '06', 'Jul': '07', 'Aug': '08',
+    'Sep': '09', 'Oct': '10', 'Nov': '11', 'Dec': '12'
+}
+
+
+def search_google(query: str, start: int = 1, date_restrict: str = "d30") -> List[Dict[str, Any]]:
+    """Google Custom Search APIで検索を実行（CSE の items をそのまま返す。レコードへの変換は呼び出し側）"""
+    if (not GOOGLE_API_KEY or not GOOGLE_CSE_ID) and not http_client.is_replay():
+        print("警告: GOOGLE_API_KEY または GOOGLE_CSE_ID が設定されていません")
+        return []
+
+    params = {
+        "key": GOOGLE_API_KEY,
+        "cx": GOOGLE_CSE_ID,
+        "q": query,
+        "start": start,
+        "num": 10,  # 最大10件
+        "dateRestrict": date_restrict,
+    }
+
+    metrics.count("cse_queries")
+    quota.tracker.spend(pagination=start > 1)
+    try:
+        response = http_client.get(CSE_URL, params=params, timeout=deadline.timeout(30))
+        response.raise_for_status()
+        data = response.json()
+        return data.get("items", [])
+    except requests.exceptions.RequestException as e:
+        print(f"Google検索エラー: {e}")
+        return []
+
+
+def extract_date_from_snippet(snippet: str) -> Optional[str]:
+    """snippetから更新日を抽出"""
+    # パターン1: "Dec 4, 2025" 形式（Google検索結果でよく見る）
+    match = re.match(r'^([A-Z][a-z]{2})\s+(\d{1,2}),\s+(\d{4})', snippet)
+    if match:
+        month = MONTH_MAP.get(match.group(1), '01')
+        day = match.group(2).zfill(2)
+        year = match.group(3)
+        return f"{year}-{month}-{day}"
+
+    # パターン2: "2025年12月24日" 形式
+    match = re.search(r'(\d{4})年(\d{1,2})月(\d{1,2})日', snippet)
+    if match:
+        return f"{match.group(1)}-{match.group(2).zfill(2)}-{match.group(3).zfill(2)}"
+
+    # パターン3: "2025/12/24" 形式
+    match = re.search(r'(\d{4})/(\d{1,2})/(\d{1,2})', snippet)
+    if match:
+        return f"{match.group(1)}-{match.group(2).zfill(2)}-{match.group(3).zfill(2)}"
+
+    return None
+
+
+def parse_search_result(item: Dict[str, Any]) -> Record:
+    """検索結果を解析して標準形式に変換"""
+    snippet = item.get("snippet", "")
+    update_date = extract_date_from_snippet(snippet)
+
+    return Record(
+        title=item.get("title", ""),
+        url=item.get("link", ""),
+        snippet=snippet,
+        update_date=update_date,
+        source="google",
+        fetched_at=clock.now(),
+    )
+
+
+def extract_prefecture(text: str) -> str:
+    """テキストから都道府県を抽出（市区町村名からも判定）"""
+    place = gazetteer.get().tag_text(text)
+    return place.prefecture if place is not None else ""
+
+
+def iter_search(queries: List[str], source: str = "google", seen_urls: Optional[set] = None,
+                plan: Optional[SearchPlan] = None) -> Iterator[Record]:
+    """クエリを順に実行し、結果を1件ずつ返す（同一URLは1回のみ。seen_urls を渡すと呼び出し間で共有）
+
+    plan を渡すと、クエリごとの期間指定を使い、前ページの新規URL率に応じて2ページ目以降も取得する。
+    締め切りを過ぎたら残りのクエリ（と追加ページ）は実行せず、打ち切りとして記録する。
+    """
+    seen_urls = set() if seen_urls is None else seen_urls
+    for i, query in enumerate(queries):
+        if deadline.expired():
+            deadline.drop(source, queries[i:])
+            break
+        date_restrict = plan.date_restrict(query) if plan is not None else "d30"
+        print(f"検索中: {query} ({date_restrict})")
+
+        start = 1
+        while start is not None:
+            items = search_google(query, start=start, date_restrict=date_restrict)
+            for item in items:
+                url = item.get("link", "")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    result = parse_search_result(item)
+                    if source != "google":
+                        result["source"] = source
+                    place = gazetteer.get().locate(url, result["title"], result["snippet"])
+                    if place is not None:
+                        result["prefecture"] = place.prefecture
+                        if place.municipality:
+                            result["municipality"] = place.municipality
+                    else:
+                        result["prefecture"] = ""
+                    yield result
+
+            if plan is None:
+                break
+            urls = [item.get("link", "") for item in items]
+            if deadline.expired():  # 締め切り後は追加ページを取得しない
+                plan.observe(query, urls)
+                break
+            start = plan.next_start(query, start, urls)
+            if start is not None:
+                print(f"検索中: {query} (start={start})")
+
+
+def iter_results(queries: List[str] = None, plan: Optional[SearchPlan] = None) -> Iterator[Record]:
+    """検索結果を取得した順に返す。queriesが指定されなければ何も返さない。"""
+    if not queries:
+        print("Google検索: クエリが指定されていません")
+        return
+
+    count = 0
+    for result in iter_search(queries, plan=plan):
+        count += 1
+        yield result
+    print(f"Google検索: {count}件の結果を取得")
+
+
+def fetch_all(queries: List[str] = None) -> List[Record]:
+    """検索クエリを実行して結果を収集。queriesが指定されなければ空リストを返す。"""
+    return list(iter_results(queries))
+
+
+if __name__ == "__main__":
+    results = fetch_all()
+    for r in results[:5]:
+        print(f"- {r['title']}")
+        print(f"  URL: {r['url']}")
+        print(f"  都道府県: {r['prefecture']}")
+        print()
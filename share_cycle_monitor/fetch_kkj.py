@@ -0,0 +1,124 @@
+"""官公需情報ポータルサイトAPIを使用して入札情報を取得"""
+import requests
+import xml.etree.ElementTree as ET
+from datetime import timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from .config import KANTO_LG_CODES, KKJ_QUERIES
+from . import clock
+from . import deadline
+from . import http_client
+from .query_manager import order_by_value
+from .records import Record
+
+
+# 官公需API エンドポイント
+KKJ_API_URL = "https://www.kkj.go.jp/api/v1/"
+
+
+def search_kkj(query: str, lg_codes: List[str] = None) -> List[Record]:
+    """官公需APIで検索を実行"""
+    # APIエンドポイントのURLを構築
+    # 参考: https://www.kkj.go.jp/doc/ja/api_guide.pdf
+    params = {
+        "Query": query,
+    }
+
+    # 地域コードを追加
+    if lg_codes:
+        params["LG_Code"] = ",".join(lg_codes)
+
+    # 過去30日の公告を対象
+    today = clock.now()
+    start_date = (today - timedelta(days=30)).strftime("%Y-%m-%d")
+    end_date = today.strftime("%Y-%m-%d")
+    params["CFT_Issue_Date"] = f"{start_date}/{end_date}"
+
+    try:
+        response = http_client.get(KKJ_API_URL, params=params, timeout=deadline.timeout(30))
+        response.raise_for_status()
+        return parse_xml_response(response.text)
+    except requests.exceptions.RequestException as e:
+        print(f"官公需API エラー: {e}")
+        return []
+
+
+def parse_xml_response(xml_text: str) -> List[Record]:
+    """XMLレスポンスを解析"""
+    results = []
+    try:
+        root = ET.fromstring(xml_text)
+        for result in root.findall(".//SearchResult"):
+            item = Record(
+                title=get_xml_text(result, "ProjectName"),
+                url=get_xml_text(result, "ExternalDocumentURI"),
+                organization=get_xml_text(result, "OrganizationName"),
+                prefecture=get_xml_text(result, "PrefectureName"),
+                category=get_xml_text(result, "Category"),
+                issue_date=get_xml_text(result, "CftIssueDate"),
+                deadline=get_xml_text(result, "PeriodEndTime"),
+                source="kkj",
+                fetched_at=clock.now(),
+            )
+            if item["title"] and item["url"]:
+                results.append(item)
+    except ET.ParseError as e:
+        print(f"XML解析エラー: {e}")
+    return results
+
+
+def get_xml_text(element: ET.Element, tag: str) -> str:
+    """XMLエレメントからテキストを取得"""
+    child = element.find(tag)
+    return child.text if child is not None and child.text else ""
+
+
+def state_key(query: str) -> str:
+    """検索語のクエリ状態（query_state.json）でのキー"""
+    return f"kkj:{query}"
+
+
+def iter_results(stats: Optional[Dict[str, Dict[str, Any]]] = None,
+                 known_urls: Optional[set] = None) -> Iterator[Record]:
+    """シェアサイクル関連の入札情報を取得した順に返す
+
+    検索語は期待値（重み × 前回の新規件数）の高い順に検索し、締め切りを過ぎたら残りは打ち切る。
+    stats を渡すと、検索語ごとの件数・新規件数（known_urls にないURL）を state_key をキーにして書き込む。
+    """
+    seen_urls = set()
+    weights = {q["term"]: q["weight"] for q in KKJ_QUERIES}
+    queries = order_by_value(list(weights), weight=weights.get, key=state_key)
+
+    for i, query in enumerate(queries):
+        if deadline.expired():
+            deadline.drop("kkj", queries[i:])
+            break
+        print(f"官公需API検索中: {query}")
+        items = search_kkj(query, KANTO_LG_CODES)
+        new = 0
+        for item in items:
+            url = item.get("url", "")
+            if url and url not in seen_urls:
+                seen_urls.add(url)
+                if known_urls is None or url not in known_urls:
+                    new += 1
+                yield item
+        if stats is not None:
+            stats[state_key(query)] = {
+                "last_run": clock.now().isoformat(), "pages": 1, "results": len(items), "new": new,
+            }
+
+    print(f"官公需API: {len(seen_urls)}件の結果を取得")
+
+
+def fetch_all() -> List[Record]:
+    """シェアサイクル関連の入札情報を取得"""
+    return list(iter_results())
+
+
+if __name__ == "__main__":
+    results = fetch_all()
+    for r in results[:5]:
+        print(f"- {r['title']}")
+        print(f"  発注機関: {r['organization']}")
+        print(f"  URL: {r['url']}")
+        print()
@@ -0,0 +1,31 @@
+"""NJSS（入札情報速報サービス）の案件をGoogle経由で検索"""
+from typing import Iterator, List, Optional
+from .fetch_google import iter_search
+from .quota import SearchPlan
+from .records import Record
+
+
+def iter_results(queries: List[str] = None, plan: Optional[SearchPlan] = None) -> Iterator[Record]:
+    """NJSS案件をGoogle経由で検索し、取得した順に返す。queriesはsite:njss.info付きのクエリリスト。"""
+    if not queries:
+        print("NJSS検索: クエリが指定されていません")
+        return
+
+    count = 0
+    for result in iter_search(queries, source="njss", plan=plan):
+        count += 1
+        yield result
+    print(f"NJSS検索: {count}件の結果を取得")
+
+
+def fetch_all(queries: List[str] = None) -> List[Record]:
+    """NJSS案件をGoogle経由で検索。queriesはsite:njss.info付きのクエリリスト。"""
+    return list(iter_results(queries))
+
+
+if __name__ == "__main__":
+    results = fetch_all(["site:njss.info シェアサイクル"])
+    for r in results[:5]:
+        print(f"- {r['title']}")
+        print(f"  URL: {r['url']}")
+        print()
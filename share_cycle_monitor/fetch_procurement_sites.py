@@ -0,0 +1,24 @@
+"""入札王等の入札情報サイトをGoogle経由で横断検索"""
+from typing import Dict, Iterator, List, Optional
+from .fetch_google import iter_search
+from .quota import SearchPlan
+from .records import Record
+
+
+def iter_results(site_queries: Dict[str, List[str]], plan: Optional[SearchPlan] = None) -> Iterator[Record]:
+    """入札サイトをGoogle経由で検索し、取得した順に返す（njss以外）"""
+    seen_urls = set()
+    count = 0
+    for site_name, queries in site_queries.items():
+        if site_name == "njss":
+            continue  # NJSSはfetch_njssで処理
+        for result in iter_search(queries, source=site_name, seen_urls=seen_urls, plan=plan):
+            count += 1
+            yield result
+
+    print(f"入札サイト検索: {count}件の結果を取得")
+
+
+def fetch_all(site_queries: Dict[str, List[str]]) -> List[Record]:
+    """入札サイトをGoogle経由で検索（njss以外）"""
+    return list(iter_results(site_queries))
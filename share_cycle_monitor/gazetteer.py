@@ -0,0 +1,209 @@
+"""監視対象都道府県の市区町村辞書（resources/gazetteer.tsv）による地域判定
+
+1. URLのホスト名: 自治体ドメイン（city.utsunomiya.lg.jp / city.ota.tokyo.jp / pref.tochigi.lg.jp /
+   *.metro.tokyo.lg.jp 等）から、本文を見ずに市区町村・都道府県を決める
+2. テキスト: 市区町村名・都道府県名を登録したトライを1回走査し、最初に現れた市区町村
+   （なければ都道府県）を採用する。対象外の地域にも同じ名前がある市区町村（府中市・中央区 等）は、
+   直前に都道府県名があるとき（東京都府中市）だけ採用する。対象外の都道府県名と京都市も登録しておき、
+   その中の文字列を対象の地名として拾わないようにする（一致しても地域にはしない）
+
+都道府県はダッシュボードと同じ短い表記（東京・栃木）で返す。
+
+    python -m share_cycle_monitor.gazetteer --backfill   # results.json の都道府県が空の結果を埋める
+"""
+import argparse
+import os
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import TARGET_KEYWORDS
+from .trie import Trie
+
+GAZETTEER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "gazetteer.tsv")
+
+# 市区町村名の末尾 -> ドメインの種別（東京都の特別区も city.*）
+_KIND = {"市": "city", "区": "city", "町": "town", "村": "vill"}
+
+# 対象外の地域にも同じ名前の市区町村・政令指定都市の区がある名前（辞書内で重複する名前も同じ扱い）
+SHARED_NAMES = {"中央区", "港区", "北区", "府中市", "美里町", "昭和村", "明和町", "南牧村", "高山村"}
+
+PREFECTURES = (
+    "北海道", "青森県", "岩手県", "宮城県", "秋田県", "山形県", "福島県", "茨城県", "栃木県", "群馬県",
+    "埼玉県", "千葉県", "東京都", "神奈川県", "新潟県", "富山県", "石川県", "福井県", "山梨県", "長野県",
+    "岐阜県", "静岡県", "愛知県", "三重県", "滋賀県", "京都府", "大阪府", "兵庫県", "奈良県", "和歌山県",
+    "鳥取県", "島根県", "岡山県", "広島県", "山口県", "徳島県", "香川県", "愛媛県", "高知県", "福岡県",
+    "佐賀県", "長崎県", "熊本県", "大分県", "宮崎県", "鹿児島県", "沖縄県",
+)
+# 対象外の地名（一致した範囲は地域にしない。京都市の「都」から始まる誤一致等を防ぐ）
+_OTHER_PLACES = PREFECTURES + ("京都市",)
+
+
+class Place(NamedTuple):
+    prefecture: str  # 短い表記（東京・栃木）
+    municipality: str  # 市区町村名（都道府県のみ判明した場合は空）
+
+
+def short_prefecture(name: str) -> str:
+    """東京都 -> 東京、神奈川県 -> 神奈川（北海道はそのまま）"""
+    return name[:-1] if name[-1:] in ("都", "府", "県") else name
+
+
+class Gazetteer:
+    """市区町村辞書（ホスト名の対応表とテキスト走査用のトライ）"""
+
+    def __init__(self, path: str = GAZETTEER_FILE):
+        self.places: List[Place] = []
+        self.hosts: Dict[str, Place] = {}
+        self.trie = Trie()
+        self.shared: Dict[str, Dict[str, Place]] = {}  # 同名のある市区町村名 -> 都道府県（短い表記） -> 市区町村
+        self._load(path)
+
+    def _load(self, path: str) -> None:
+        rows = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                prefecture, prefecture_romaji, municipality, romaji = line.rstrip("\n").split("\t")
+                rows.append((prefecture, prefecture_romaji, municipality, romaji))
+
+        # 同じ種別・ローマ字の自治体が複数あれば、都道府県名を含まないホストは対応付けない
+        counts: Dict[str, int] = defaultdict(int)
+        for _, _, municipality, romaji in rows:
+            counts[f"{_KIND[municipality[-1]]}.{romaji}"] += 1
+
+        names: Dict[str, int] = defaultdict(int)
+        for _, _, municipality, _ in rows:
+            names[municipality] += 1
+
+        prefectures = {}
+        for prefecture, prefecture_romaji, municipality, romaji in rows:
+            place = Place(short_prefecture(prefecture), municipality)
+            self.places.append(place)
+            prefectures[prefecture] = prefecture_romaji
+
+            label = f"{_KIND[municipality[-1]]}.{romaji}"
+            for host in (f"{label}.{prefecture_romaji}.jp", f"{label}.{prefecture_romaji}.lg.jp",
+                         f"{_KIND[municipality[-1]]}.{prefecture_romaji}-{romaji}.lg.jp"):
+                self.hosts[host] = place
+            if counts[label] == 1:
+                self.hosts[f"{label}.lg.jp"] = place
+                if municipality[-1] == "市":
+                    self.hosts[f"{label}.jp"] = place  # 政令指定都市等（city.chiba.jp）
+            self.trie.add(municipality, place)
+            if municipality in SHARED_NAMES or names[municipality] > 1:
+                self.shared.setdefault(municipality, {})[place.prefecture] = place
+
+        for prefecture, prefecture_romaji in prefectures.items():
+            place = Place(short_prefecture(prefecture), "")
+            prefix = "metro" if prefecture == "東京都" else "pref"
+            self.hosts[f"{prefix}.{prefecture_romaji}.lg.jp"] = place
+            self.hosts[f"{prefix}.{prefecture_romaji}.jp"] = place
+            self.trie.add(prefecture, place)
+            if self.trie.get(place.prefecture) is None:
+                self.trie.add(place.prefecture, place)
+
+        # 従来の地域キーワード（那覇・石垣 等）は、その名前で始まる市区町村として扱う
+        for keyword in TARGET_KEYWORDS:
+            if self.trie.get(keyword) is None:
+                for place in self.places:
+                    if place.municipality.startswith(keyword):
+                        self.trie.add(keyword, place)
+                        break
+
+        for name in _OTHER_PLACES:
+            if self.trie.get(name) is None:
+                self.trie.add(name, None)
+
+    def lookup_host(self, url: str) -> Optional[Place]:
+        """URL（またはホスト名）から自治体を判定（www. や部局のサブドメインは無視）"""
+        host = urlsplit(url).hostname if "/" in url else url.lower()
+        if not host:
+            return None
+        labels = host.split(".")
+        for i in range(len(labels) - 2):
+            place = self.hosts.get(".".join(labels[i:]))
+            if place is not None:
+                return place
+        return None
+
+    def tag_text(self, text: str) -> Optional[Place]:
+        """テキスト中で最初に現れた市区町村（なければ都道府県）"""
+        first_prefecture = None
+        previous: Tuple[int, Optional[Place]] = (-1, None)  # 直前の一致の (終了位置, 地域)
+        for start, end, place in self.trie.scan(text):
+            prefix = previous[1] if previous[0] == start else None
+            previous = (end, place)
+            if place is None:
+                continue
+            if place.municipality:
+                candidates = self.shared.get(text[start:end])
+                if candidates is None:
+                    return place
+                # 同名のある市区町村は「東京都府中市」のように直前に都道府県名があるときだけ
+                if prefix is not None and not prefix.municipality and prefix.prefecture in candidates:
+                    return candidates[prefix.prefecture]
+                continue
+            if first_prefecture is None:
+                first_prefecture = place
+        return first_prefecture
+
+    def locate(self, url: str, *texts: str) -> Optional[Place]:
+        """ホスト名 -> テキストの順で判定"""
+        return self.lookup_host(url) or self.tag_text(" ".join(t for t in texts if t))
+
+
+_gazetteer: Optional[Gazetteer] = None
+
+
+def get() -> Gazetteer:
+    """辞書（初回呼び出し時に読み込み）"""
+    global _gazetteer
+    if _gazetteer is None:
+        _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+def backfill(records: List, overwrite: bool = False) -> int:
+    """都道府県が空（overwrite なら全件）の結果に地域を付与し、付与した件数を返す"""
+    gazetteer = get()
+    filled = 0
+    for record in records:
+        if record.get("prefecture") and not overwrite:
+            continue
+        place = gazetteer.locate(record.get("url", ""), record.get("title"), record.get("snippet"),
+                                 record.get("organization"))
+        if place is None:
+            continue
+        record["prefecture"] = place.prefecture
+        if place.municipality and not record.get("municipality"):
+            record["municipality"] = place.municipality
+        filled += 1
+    return filled
+
+
+if __name__ == "__main__":
+    from .config import RESULTS_FILE
+    from .main import load_results, save_json
+    from . import changelog
+    from . import stats
+
+    parser = argparse.ArgumentParser(description="市区町村辞書による地域判定")
+    parser.add_argument("--backfill", action="store_true", help="results.json の都道府県が空の結果を埋めて保存")
+    parser.add_argument("--overwrite", action="store_true", help="--backfill で設定済みの結果も判定し直す")
+    args = parser.parse_args()
+
+    gazetteer = get()
+    print(f"市区町村: {len(gazetteer.places)}件 / ホスト名: {len(gazetteer.hosts)}件 / トライ: {len(gazetteer.trie)}語")
+    if args.backfill:
+        results = load_results()
+        places = [(r.get("prefecture"), r.get("municipality")) for r in results]
+        before = sum(1 for r in results if not r.get("prefecture"))
+        filled = backfill(results, overwrite=args.overwrite)
+        after = sum(1 for r in results if not r.get("prefecture"))
+        save_json(RESULTS_FILE, results)
+        stats.rebuild()
+        changelog.record_updated([r for r, place in zip(results, places)
+                                  if (r.get("prefecture"), r.get("municipality")) != place])
+        print(f"地域を付与: {filled}件（都道府県が空: {before}件 -> {after}件）")
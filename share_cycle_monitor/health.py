@@ -0,0 +1,159 @@
+"""直接監視ページのヘルス管理とサーキットブレーカー
+
+URLごとに連続失敗回数・最終成功日時・平均応答時間を data/page_health.json に保存する。
+連続失敗が閾値を超えたページは指数バックオフで再試行間隔を空け、再試行時のタイムアウトも短くする。
+
+    python -m share_cycle_monitor.health --dead-days 7   # 7日以上失敗し続けているページ
+"""
+import argparse
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from .config import HEALTH, PAGE_HEALTH_FILE
+from . import clock
+from . import serialization
+from . import storage
+
+
+def _new_entry() -> Dict[str, Any]:
+    return {
+        "consecutive_failures": 0,
+        "first_failure": None,
+        "last_failure": None,
+        "last_success": None,
+        "last_status": None,
+        "last_error": "",
+        "avg_latency": None,
+        "next_probe": None,
+    }
+
+
+class HealthTracker:
+    """URLごとのヘルス状態（スレッドセーフ）"""
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        self.path = path
+        self.settings = settings
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self.touched = set()  # 保存前に更新したURL
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        return serialization.load_file(self.path) if os.path.exists(self.path) else {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def entry(self, url: str) -> Dict[str, Any]:
+        """URLの状態（未記録なら初期状態）"""
+        with self._lock:
+            return dict(self._load().get(url) or _new_entry())
+
+    def should_fetch(self, url: str) -> bool:
+        """取得してよいか（回路が開いていて再試行時刻前ならFalse）"""
+        next_probe = self.entry(url)["next_probe"]
+        return not next_probe or clock.now() >= datetime.fromisoformat(next_probe)
+
+    def timeout_for(self, url: str) -> float:
+        """タイムアウト秒数（閾値を超えて失敗しているページほど短く）"""
+        failures = self.entry(url)["consecutive_failures"]
+        over = failures - self.settings["failure_threshold"] + 1
+        if over <= 0:
+            return self.settings["timeout"]
+        return max(self.settings["min_timeout"], self.settings["timeout"] / (2 ** over))
+
+    def record_success(self, url: str, latency: float) -> None:
+        """取得成功を記録（回路を閉じる）"""
+        with self._lock:
+            entry = self._load().setdefault(url, _new_entry())
+            alpha = self.settings["latency_smoothing"]
+            previous = entry["avg_latency"]
+            entry["avg_latency"] = round(latency if previous is None else previous + alpha * (latency - previous), 3)
+            entry.update({
+                "consecutive_failures": 0,
+                "first_failure": None,
+                "last_success": clock.now().isoformat(),
+                "last_status": 200,
+                "last_error": "",
+                "next_probe": None,
+            })
+            self.touched.add(url)
+
+    def record_failure(self, url: str, status: Optional[int], error: str) -> None:
+        """取得失敗を記録し、閾値を超えていれば次回の再試行時刻を設定"""
+        now = clock.now()
+        with self._lock:
+            entry = self._load().setdefault(url, _new_entry())
+            entry["consecutive_failures"] += 1
+            entry["first_failure"] = entry["first_failure"] or now.isoformat()
+            entry["last_failure"] = now.isoformat()
+            entry["last_status"] = status
+            entry["last_error"] = error[:200]
+
+            over = entry["consecutive_failures"] - self.settings["failure_threshold"]
+            if over >= 0:
+                hours = min(self.settings["base_backoff_hours"] * (2 ** over), self.settings["max_backoff_hours"])
+                entry["next_probe"] = (now + timedelta(hours=hours)).isoformat()
+            self.touched.add(url)
+
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        """保存前に更新したURLの状態（並行ワーカーの部分結果に含める）"""
+        with self._lock:
+            entries = self._load()
+            return {url: dict(entries[url]) for url in sorted(self.touched)}
+
+    def absorb(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """他のワーカーが更新した状態を取り込む（次の save で保存）"""
+        with self._lock:
+            self._load().update(entries)
+            self.touched.update(entries)
+
+    def save(self) -> None:
+        """変更があれば保存（ファイルを読み直し、このプロセスで更新したURLだけを書き込む）"""
+        with self._lock:
+            if not self.touched:
+                return
+            with storage.locked(self.path):
+                entries = self._read()
+                for url in self.touched:
+                    entries[url] = self._entries[url]
+                serialization.dump_file(self.path, entries)
+            self._entries = entries
+            self.touched = set()
+
+    def dead_pages(self, days: float) -> List[Dict[str, Any]]:
+        """days 日以上失敗し続けているページ（失敗期間の長い順）"""
+        cutoff = clock.now() - timedelta(days=days)
+        with self._lock:
+            entries = dict(self._load())
+        dead = []
+        for url, entry in entries.items():
+            first_failure = entry.get("first_failure")
+            if entry["consecutive_failures"] and first_failure and datetime.fromisoformat(first_failure) <= cutoff:
+                dead.append({"url": url, **entry})
+        dead.sort(key=lambda e: e["first_failure"])
+        return dead
+
+
+tracker = HealthTracker(PAGE_HEALTH_FILE, HEALTH)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="直接監視ページのヘルス状態")
+    parser.add_argument("--dead-days", type=float, default=7, help="この日数以上失敗し続けているページを表示")
+    args = parser.parse_args()
+
+    dead = tracker.dead_pages(args.dead_days)
+    print(f"{args.dead_days:g}日以上取得できていないページ: {len(dead)}件")
+    now = clock.now()
+    for entry in dead:
+        days = (now - datetime.fromisoformat(entry["first_failure"])).days
+        print(f"\n- {entry['url']}")
+        print(f"  失敗 {entry['consecutive_failures']}回連続 / {days}日間 / 最終ステータス: {entry['last_status'] or '通信エラー'}")
+        print(f"  最終成功: {entry['last_success'] or 'なし'} / 次回再試行: {entry['next_probe'] or '-'}")
+        if entry["last_error"]:
+            print(f"  エラー: {entry['last_error']}")
@@ -0,0 +1,184 @@
+"""HTTP通信の共通窓口（セッション共有・カセットへの記録/再生）
+
+モード:
+    live   : 通常の通信
+    record : 通常通り通信し、やり取りをカセットディレクトリに保存
+    replay : 通信せず、カセットから応答を返す（未記録のリクエストは接続エラー扱い）
+
+環境変数 SCM_HTTP_MODE / SCM_CASSETTE_DIR、または configure() で切り替える。
+"""
+import os
+import asyncio
+import base64
+import hashlib
+import io
+import json
+from typing import IO, Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from . import metrics
+from . import politeness
+
+# カセットに保存しないクエリパラメータ（APIキー等）
+SECRET_PARAMS = {"key", "cx"}
+
+# カセットに残すレスポンスヘッダ
+RECORDED_HEADERS = {"content-type", "content-length", "etag", "last-modified", "location"}
+
+_mode = os.environ.get("SCM_HTTP_MODE", "live")
+_cassette_dir = os.environ.get("SCM_CASSETTE_DIR", "")
+_session: Optional[requests.Session] = None
+
+
+def configure(mode: str, cassette_dir: str = "") -> None:
+    """通信モードを設定"""
+    global _mode, _cassette_dir
+    if mode not in ("live", "record", "replay"):
+        raise ValueError(f"不明なHTTPモード: {mode}")
+    if mode != "live" and not cassette_dir:
+        raise ValueError(f"{mode}モードにはカセットディレクトリが必要です")
+    _mode = mode
+    _cassette_dir = cassette_dir
+
+
+def is_replay() -> bool:
+    """再生モードかどうか"""
+    return _mode == "replay"
+
+
+def get_session() -> requests.Session:
+    """共有セッションを取得（接続を使い回す）"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+    return _session
+
+
+def _public_params(params: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """秘匿パラメータを除いたクエリパラメータ"""
+    return {k: str(v) for k, v in sorted((params or {}).items()) if k not in SECRET_PARAMS}
+
+
+def _cassette_path(method: str, url: str, params: Optional[Dict[str, Any]]) -> str:
+    """リクエストに対応するカセットファイルのパス"""
+    public = _public_params(params)
+    key = f"{method} {url}?{urlencode(public)}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+    return os.path.join(_cassette_dir, "http", f"{digest}.json")
+
+
+def _display_url(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """秘匿パラメータを除いたURL（記録・再生時の response.url）"""
+    public = _public_params(params)
+    return f"{url}?{urlencode(public)}" if public else url
+
+
+def _record(method: str, url: str, params: Optional[Dict[str, Any]],
+            response: Optional[requests.Response], error: Optional[Exception]) -> None:
+    """やり取りをカセットに保存"""
+    entry: Dict[str, Any] = {
+        "request": {"method": method, "url": url, "params": _public_params(params)},
+    }
+    if error is not None:
+        entry["error"] = {"type": type(error).__name__, "message": str(error)}
+    else:
+        entry["response"] = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS},
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        if response.history:
+            # 転送された場合だけ最終URLを残す（API のURLには秘匿パラメータが含まれるため）
+            entry["response"]["url"] = response.url
+    path = _cassette_path(method, url, params)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, ensure_ascii=False, indent=2)
+
+
+def _replay(method: str, url: str, params: Optional[Dict[str, Any]]) -> requests.Response:
+    """カセットから応答を復元"""
+    path = _cassette_path(method, url, params)
+    if not os.path.exists(path):
+        raise requests.exceptions.ConnectionError(f"カセットに未記録のリクエスト: {_display_url(url, params)}")
+    with open(path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+
+    if "error" in entry:
+        error_cls = getattr(requests.exceptions, entry["error"]["type"], requests.exceptions.RequestException)
+        raise error_cls(entry["error"]["message"])
+
+    recorded = entry["response"]
+    response = requests.Response()
+    response.status_code = recorded["status"]
+    response.reason = recorded.get("reason", "")
+    response.headers = CaseInsensitiveDict(recorded["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = recorded.get("url") or _display_url(url, params)
+    response._content = base64.b64decode(recorded["body"])
+    return response
+
+
+def _send(url: str, params: Optional[Dict[str, Any]], headers: Optional[Dict[str, str]],
+          timeout: float, waited: float, method: str = "GET", stream: bool = False) -> requests.Response:
+    """リクエストを送信（記録/再生・計測込み。転送は追跡する）"""
+    with metrics.span("http", host=urlsplit(url).hostname or "", wait=waited) as s:
+        if _mode == "replay":
+            response = _replay(method, url, params)
+            s.set(status=response.status_code, bytes=len(response.content), cache_hit=True)
+            return response
+
+        try:
+            response = get_session().request(method, url, params=params, headers=headers, timeout=timeout,
+                                             allow_redirects=True, stream=stream)
+        except requests.exceptions.RequestException as e:
+            if _mode == "record":
+                _record(method, url, params, None, e)
+            raise
+        if _mode == "record":
+            _record(method, url, params, response, None)
+        if stream and _mode == "live":  # 本文は読み出す側で受信する（サイズはヘッダの値）
+            s.set(status=response.status_code, bytes=int(response.headers.get("content-length") or 0))
+        else:
+            s.set(status=response.status_code, bytes=len(response.content))
+        return response
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None, timeout: float = 30, stream: bool = False) -> requests.Response:
+    """GETリクエスト（例外は requests.exceptions.RequestException 系）
+
+    同一ホストへの間隔は politeness.limiter に従う（再生時は待たない）。
+    stream=True なら本文を受信せずに返すので、open_body で読み出し、読み終えたら response.close() する。
+    """
+    waited = 0.0 if _mode == "replay" else politeness.limiter.acquire(urlsplit(url).hostname or "")
+    return _send(url, params, headers, timeout, waited, stream=stream)
+
+
+def open_body(response: requests.Response) -> IO[bytes]:
+    """本文を読み出すファイル（stream=True で受信前なら受信しながら読む。記録・再生時は受信済みの本文）"""
+    if response.raw is not None and not response._content_consumed:
+        response.raw.decode_content = True  # Content-Encoding（gzip 等）は展開して読む
+        return response.raw
+    return io.BytesIO(response.content)
+
+
+async def get_async(url: str, params: Optional[Dict[str, Any]] = None,
+                    headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> requests.Response:
+    """GETリクエスト（asyncio版）。間隔待ちはイベントループ上で行い、送信はスレッドで実行"""
+    waited = 0.0
+    if _mode != "replay":
+        waited = await politeness.limiter.acquire_async(urlsplit(url).hostname or "")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _send, url, params, headers, timeout, waited)
+
+
+def head(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 30) -> requests.Response:
+    """HEADリクエスト（転送を追跡し、response.url が最終URL・response.history が転送の履歴）"""
+    waited = 0.0 if _mode == "replay" else politeness.limiter.acquire(urlsplit(url).hostname or "")
+    return _send(url, None, headers, timeout, waited, method="HEAD")
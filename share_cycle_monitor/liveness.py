@@ -0,0 +1,166 @@
+"""蓄積結果のリンク確認
+
+results.json のURLに HEAD を送り（HEAD を受け付けないサーバーには Range 付きの GET）、
+各結果に status（最終的なHTTPステータス。接続できなければ 0）・final_url（転送後のURL）・
+checked_at を記録する。1回の確認で送るリクエスト数は LIVENESS["budget"] まで。
+未確認の結果、次に取得日時の新しい結果から確認し、確認済みの結果は recheck_days ごとに確認し直す。
+
+恒久的な転送（301/308）で別のページに移っていれば canonical に転送元 -> 転送先を登録し、
+転送先のURLも既出URLに加える（以後の検索で転送先が出ても新着扱いしない）。
+サイトのトップページへの転送はページの削除とみなし、登録しない。
+
+    python -m share_cycle_monitor --check-links [--dry-run]
+    python -m share_cycle_monitor.liveness --budget 20 --dry-run
+"""
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from .config import LIVENESS, RESULTS_FILE
+from . import canonical
+from . import changelog
+from . import clock
+from . import http_client
+from . import politeness
+from . import storage
+from .records import Record
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; ShareCycleMonitor/1.0)"
+}
+# HEAD をこのステータスで断るサーバーには Range 付きの GET で確認し直す
+HEAD_REJECTED = {400, 403, 405, 406, 501}
+PERMANENT_REDIRECTS = {301, 308}
+
+
+class Budget:
+    """1回の確認で送れるリクエスト数（スレッドセーフ）"""
+
+    def __init__(self, requests: int):
+        self.remaining = requests
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """1リクエスト分を使う（残っていなければFalse）"""
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def is_due(record: Dict[str, Any], now: datetime, recheck_days: float) -> bool:
+    """確認の対象か（未確認、または前回の確認から recheck_days 以上経過）"""
+    checked_at = record.get("checked_at")
+    return not checked_at or datetime.fromisoformat(checked_at) <= now - timedelta(days=recheck_days)
+
+
+def select(records: List[Record], limit: int, now: Optional[datetime] = None) -> List[Record]:
+    """今回確認する結果（未確認 -> 取得日時の新しい順 -> 前回の確認が古い順に、最大 limit 件）"""
+    now = now or clock.now()
+    due = [record for record in records if record.get("url") and is_due(record, now, LIVENESS["recheck_days"])]
+    # 取得日時の新しい順に並べてから、未確認を先頭・確認済みを前回の確認が古い順に（安定ソート）
+    due.sort(key=lambda record: record.get("fetched_at") or "", reverse=True)
+    due.sort(key=lambda record: record.get("checked_at") or "")
+    return due[:limit]
+
+
+def _moved_permanently(url: str, response: requests.Response) -> bool:
+    """別のページへの恒久的な転送か（トップページへの転送は削除とみなして除く）"""
+    if not response.history or response.status_code >= 400 or response.url == url:
+        return False
+    if any(r.status_code not in PERMANENT_REDIRECTS for r in response.history):
+        return False
+    return urlsplit(response.url).path not in ("", "/")
+
+
+def probe(url: str, budget: Budget) -> Optional[Dict[str, Any]]:
+    """URLを確認（robots.txt で禁止・予算切れなら None）"""
+    if not politeness.check_robots(url) or not budget.take():
+        return None
+    timeout = LIVENESS["timeout"]
+    result: Dict[str, Any] = {"status": 0, "final_url": None, "moved": False}
+    try:
+        response = http_client.head(url, headers=HEADERS, timeout=timeout)
+        if response.status_code in HEAD_REJECTED and budget.take():
+            response = http_client.get(url, headers={**HEADERS, "Range": "bytes=0-0"}, timeout=timeout)
+        # Range 付き GET の 206・416（空のファイル）は存在するページとして扱う
+        status = 200 if response.status_code in (206, 416) else response.status_code
+        result.update(status=status, final_url=response.url, moved=_moved_permanently(url, response))
+    except requests.exceptions.RequestException as e:
+        print(f"  接続エラー ({url}): {e}")
+    result["checked_at"] = clock.now().isoformat()
+    return result
+
+
+def check(records: List[Record], budget: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """結果のURLを並行に確認し、URL -> 確認結果 を返す"""
+    budget = Budget(budget if budget is not None else LIVENESS["budget"])
+    urls = list(dict.fromkeys(record["url"] for record in select(records, budget.remaining)))
+    print(f"リンク確認: {len(urls)}件（予算 {budget.remaining}リクエスト）")
+    with ThreadPoolExecutor(max_workers=LIVENESS["workers"]) as pool:
+        results = pool.map(lambda url: probe(url, budget), urls)
+        return {url: result for url, result in zip(urls, results) if result is not None}
+
+
+def apply(results: Dict[str, Dict[str, Any]]) -> int:
+    """確認結果を results.json の各結果に書き込み（確認中に他の実行が追加した結果もそのまま残す）
+
+    ステータスか転送先が変わった結果は変更ログにも追記する。
+    """
+    from .main import load_results, save_json
+
+    with storage.locked(RESULTS_FILE):
+        records = load_results()
+        updated = 0
+        changed = []
+        for record in records:
+            result = results.get(record["url"])
+            if result is not None:
+                if (record.get("status"), record.get("final_url")) != (result["status"], result["final_url"]):
+                    changed.append(record)
+                record["status"] = result["status"]
+                record["final_url"] = result["final_url"]
+                record["checked_at"] = result["checked_at"]
+                updated += 1
+        save_json(RESULTS_FILE, records)
+    changelog.record_updated(changed)
+    return updated
+
+
+def run(budget: Optional[int] = None, dry_run: bool = False) -> Dict[str, Dict[str, Any]]:
+    """蓄積結果のリンクを確認し、結果・転送・既出URLを保存（dry_run なら表示のみ）"""
+    from .main import load_results, save_seen_urls
+
+    print(f"=== リンク確認 開始: {clock.now().isoformat()} ===")
+    results = check(load_results(), budget)
+    dead = {url: r for url, r in results.items() if r["status"] == 0 or r["status"] >= 400}
+    moved = {url: r["final_url"] for url, r in results.items() if r["moved"]}
+    print(f"確認: {len(results)}件 / リンク切れ: {len(dead)}件 / 恒久的な転送: {len(moved)}件")
+    for url, result in sorted(dead.items()):
+        print(f"  {result['status'] or '接続エラー'} {url}")
+    for url, target in sorted(moved.items()):
+        print(f"  転送 {url} -> {target}")
+
+    if dry_run:
+        print("（ドライラン: 保存しません）")
+    elif results:
+        print(f"結果に記録: {apply(results)}件")
+        if moved:
+            canonical.aliases.add(moved)
+            save_seen_urls(set(moved.values()))
+    print(f"=== リンク確認 完了: {clock.now().isoformat()} ===")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="蓄積結果のリンク確認")
+    parser.add_argument("--budget", type=int, default=None, help=f"リクエスト数の上限（既定: {LIVENESS['budget']}）")
+    parser.add_argument("--dry-run", action="store_true", help="確認結果を表示するだけで保存しない")
+    args = parser.parse_args()
+    run(args.budget, args.dry_run)
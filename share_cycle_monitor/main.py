@@ -0,0 +1,355 @@
+"""統合スクリプト: 全てのAPIからデータを取得し、結果を保存・通知"""
+import os
+import asyncio
+import importlib
+import itertools
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import DATA_DIR, QUOTA, RESULTS_FILE, RUN_DEADLINE_MINUTES, SEEN_URLS_FILE
+from . import changelog
+from . import clock
+from . import deadline
+from . import metrics
+from . import pipeline
+from . import quota
+from . import serialization
+from . import stats
+from . import storage
+from .records import Record, from_dicts
+from .workers import Worker
+
+# 取得ソース: 名前 -> (モジュール, 見出し)
+# requests / BeautifulSoup 等を読み込むため、モジュールは選択されたものだけ実行時にimportする
+SOURCES = {
+    "google": ("fetch_google", "Google Custom Search API"),
+    "kkj": ("fetch_kkj", "官公需情報ポータルAPI"),
+    "njss": ("fetch_njss", "NJSS（Google経由）"),
+    "procurement": ("fetch_procurement_sites", "入札サイト横断検索"),
+    "direct": ("fetch_direct", "直接監視"),
+}
+
+# Google CSE のクォータを消費するソース（クエリ選択が必要）
+CSE_SOURCES = {"google", "njss", "procurement"}
+# 並行ワーカーでクエリ・ページ単位に分担できるソース（それ以外はソースごと1つのワーカーが担当）
+PARTITIONED_SOURCES = CSE_SOURCES | {"direct"}
+
+
+def load_json(filepath: str) -> Any:
+    """JSONファイルを読み込み"""
+    if os.path.exists(filepath):
+        return serialization.load_file(filepath)
+    return []
+
+
+def save_json(filepath: str, data: Any) -> None:
+    """JSONファイルに保存（Record はそのまま渡せる）"""
+    serialization.dump_file(filepath, data)
+
+
+def load_results() -> List[Record]:
+    """蓄積済みの結果を読み込み、レコードに変換"""
+    data = load_json(RESULTS_FILE)
+    return from_dicts(data) if isinstance(data, list) else []
+
+
+def load_seen_urls() -> set:
+    """既出URLを読み込み"""
+    data = load_json(SEEN_URLS_FILE)
+    if isinstance(data, list):
+        return set(data)
+    return set()
+
+
+def save_seen_urls(urls: set) -> None:
+    """既出URLを保存（読み込んだ後に他のプロセスが保存した分との和集合をURL順で）"""
+    storage.update_json(SEEN_URLS_FILE, lambda current: sorted(urls.union(current)), [])
+
+
+def deduplicate_by_url(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """URLで重複を排除（最新のものを保持）"""
+    seen = {}
+    for item in items:
+        url = item.get("url", "")
+        if url and url not in seen:
+            seen[url] = item
+    return list(seen.values())
+
+
+def merge_results(
+    google_results: List[Dict[str, Any]],
+    kkj_results: List[Dict[str, Any]],
+    seen_urls: set
+) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """結果を統合し、新規のみを抽出"""
+    all_results = []
+    new_results = []
+    new_urls = set()
+
+    # Google結果を追加
+    for item in google_results:
+        url = item.get("url", "")
+        if url:
+            all_results.append(item)
+            if url not in seen_urls:
+                new_results.append(item)
+                new_urls.add(url)
+
+    # 官公需API結果を追加（重複チェック）
+    for item in kkj_results:
+        url = item.get("url", "")
+        if url and url not in new_urls:
+            all_results.append(item)
+            if url not in seen_urls:
+                new_results.append(item)
+                new_urls.add(url)
+
+    return all_results, new_results
+
+
+def _load_source(name: str):
+    """ソースのモジュールを遅延import"""
+    module_name, _ = SOURCES[name]
+    return importlib.import_module(f".{module_name}", __package__)
+
+
+def _iter_source(name: str, records: Iterable[Record]) -> Iterator[Record]:
+    """ソースのレコードをそのまま流し、所要時間と件数を計測"""
+    print(f"\n--- {SOURCES[name][1]} ---")
+    with metrics.span("fetch", source=name) as s:
+        count = 0
+        for record in records:
+            count += 1
+            yield record
+        s.set(records_out=count)
+
+
+def _select_queries(sources: List[str], dry_run: bool, worker: Optional[Worker] = None,
+                    now: Optional[datetime] = None) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """CSE系ソースが含まれていればクエリと期間指定を選択（ローテーション）
+
+    並行ワーカーは状態を保存せずに全体の選択を再現し、その担当分だけを返す。
+    now は選択時刻（締め切りで打ち切ったクエリの last_run を戻す際の照合に使う）。
+    """
+    if not CSE_SOURCES.intersection(sources):
+        return {}, {}
+    from .query_manager import plan_queries_for_run
+    print("\n--- クエリ選択 ---")
+    if worker is not None:
+        selected, windows = plan_queries_for_run(save=False, now=worker.planned_at)
+        return worker.assign_queries(selected), windows
+    return plan_queries_for_run(save=not dry_run, now=now)
+
+
+def _fetch_args(selected: Dict[str, List[str]], plan: Optional[quota.SearchPlan] = None,
+                dry_run: bool = False, worker: Optional[Worker] = None,
+                kkj_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+                seen_urls: Optional[set] = None) -> Dict[str, Dict[str, Any]]:
+    """ソースごとの iter_results のキーワード引数
+
+    官公需API: 検索語ごとの件数を kkj_stats に書き込み、seen_urls にないURLを新規として数える。
+    直接監視: dry_run・並行ワーカーなら巡回カーソルを進めず、dry_run ならサイトマップ・フィードの確認状態も保存しない
+    （スナップショットは結果を保存した後に main・daemon・workers.merge が保存する）。
+    """
+    # 入札サイト検索には google / njss 以外のサイトのクエリだけを渡す
+    sites = {name: queries for name, queries in selected.items() if name not in ("google", "njss")}
+    return {
+        "google": {"queries": selected.get("google", []), "plan": plan},
+        "kkj": {"stats": kkj_stats, "known_urls": seen_urls},
+        "njss": {"queries": selected.get("njss", []), "plan": plan},
+        "procurement": {"site_queries": sites, "plan": plan},
+        "direct": {"rotate": not dry_run and worker is None, "owns": worker.owns if worker else None,
+                   "save_state": not dry_run},
+    }
+
+
+def _finish_queries(plan: Optional[quota.SearchPlan], dry_run: bool, worker: Optional[Worker] = None,
+                    kkj_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+                    planned_at: Optional[datetime] = None) -> None:
+    """クエリ別の結果を表示・記録し、CSEの使用回数を保存（並行ワーカーは部分結果に回す）
+
+    締め切りで実行しなかった CSE のクエリは、選択時に記録した実行日時を戻す（次回も選ばれるように）。
+    """
+    stats = {**(plan.stats if plan is not None else {}), **(kkj_stats or {})}
+    dropped = []
+    if plan is not None:
+        plan.report()
+        dropped = [q for items in deadline.current.dropped.values() for q in items if q in plan.windows]
+    if worker is not None:
+        worker.record_query_stats(stats)
+        worker.release_queries(dropped)
+        return
+    # ドライランでもAPIは呼んでいるので使用回数は保存する
+    if plan is not None:
+        quota.tracker.save()
+    if not dry_run:
+        from .query_manager import record_query_stats, release_queries
+        record_query_stats(stats)
+        if planned_at is not None:
+            release_queries(dropped, planned_at)
+
+
+def _run_pipeline(records: Iterable[Record], seen_urls: set,
+                  keep_recent: Optional[Callable[[Any], bool]] = None) -> pipeline.Sink:
+    """レコードの流れをパイプラインに通して統合"""
+    with metrics.span("pipeline") as s:
+        sink = pipeline.run(records, seen_urls, keep_recent)
+        s.set(records_in=sink.counts["received"], records_out=len(sink.new))
+    print("\n--- 結果統合 ---")
+    print(f"全結果: {len(sink.urls)}件")
+    print(f"新着: {len(sink.new)}件")
+    return sink
+
+
+def collect(sources: List[str], seen_urls: set, dry_run: bool = False,
+            keep_recent: Optional[Callable[[Any], bool]] = None, worker: Optional[Worker] = None) -> pipeline.Sink:
+    """選択したソースから順に取得し、届いたレコードからパイプラインに流す
+
+    worker を渡すと、その担当分（クエリ・ページ、分割できないソースは担当ワーカーのみ）だけを取得する。
+    締め切り（deadline）が設定されていれば、遅いソースが他のソースの時間を使い切らないようにソースを並行に取得する。
+    """
+    if worker is not None:
+        sources = [name for name in sources if name in PARTITIONED_SOURCES or worker.owns(name)]
+    planned_at = worker.planned_at if worker is not None else clock.now()
+    selected, windows = _select_queries(sources, dry_run, worker, planned_at)
+    budget = worker.share(QUOTA["allocation"].get("pagination", 0)) if worker is not None else None
+    plan = quota.plan_for_run(seen_urls, windows, budget) if selected else None
+    kkj_stats: Dict[str, Dict[str, Any]] = {}
+    args = _fetch_args(selected, plan, dry_run, worker, kkj_stats, seen_urls)
+    streams = [
+        _iter_source(name, _load_source(name).iter_results(**args[name]))
+        for name in SOURCES if name in sources
+    ]
+    if deadline.current.seconds is not None:
+        records = pipeline.merge_streams(streams)
+    else:
+        records = itertools.chain.from_iterable(streams)
+    sink = _run_pipeline(records, seen_urls, keep_recent)
+    _finish_queries(plan, dry_run, worker, kkj_stats, planned_at)
+    deadline.current.report()
+    return sink
+
+
+async def collect_async(sources: List[str], seen_urls: set,
+                        keep_recent: Optional[Callable[[Any], bool]] = None) -> pipeline.Sink:
+    """collect の asyncio版（ソースを並行取得。aiter_results を持つソースはイベントループ上で実行）"""
+    loop = asyncio.get_running_loop()
+    planned_at = clock.now()
+    selected, windows = await loop.run_in_executor(None, _select_queries, sources, False, None, planned_at)
+    plan = quota.plan_for_run(seen_urls, windows) if selected else None
+    kkj_stats: Dict[str, Dict[str, Any]] = {}
+    args = _fetch_args(selected, plan, kkj_stats=kkj_stats, seen_urls=seen_urls)
+
+    streams = []
+    for name in SOURCES:
+        if name not in sources:
+            continue
+        module = _load_source(name)
+        if hasattr(module, "aiter_results"):
+            records = pipeline.from_async(module.aiter_results(**args[name]), loop)
+        else:
+            records = module.iter_results(**args[name])
+        streams.append(_iter_source(name, records))
+    sink = await loop.run_in_executor(None, _run_pipeline, pipeline.merge_streams(streams), seen_urls, keep_recent)
+    await loop.run_in_executor(None, _finish_queries, plan, False, None, kkj_stats, planned_at)
+    return sink
+
+
+def append_results(new_results: List[Record]) -> None:
+    """新着を results.json の先頭に追加（既存分は読み込まずにそのまま後ろにつなぐ）し、集計と変更ログに反映"""
+    if serialization.prepend_to_array_file(RESULTS_FILE, new_results):
+        stats.record_added(new_results)
+    else:
+        # 想定外の形式なら従来どおり全件を読み込んで統合（重複排除で件数が変わるので集計も作り直す）
+        save_json(RESULTS_FILE, merge_into_history(new_results, load_results()))
+        stats.rebuild()
+    changelog.record_added(new_results)
+
+
+def merge_into_history(new_results: List[Dict[str, Any]], existing_results: Any) -> List[Dict[str, Any]]:
+    """新着を蓄積済みの結果の先頭に追加し、URLで重複を排除"""
+    if isinstance(existing_results, list):
+        combined_results = new_results + existing_results
+    else:
+        combined_results = new_results
+
+    with metrics.span("dedupe", records_in=len(combined_results)) as s:
+        combined_results = deduplicate_by_url(combined_results)
+        s.set(records_out=len(combined_results))
+    return combined_results
+
+
+def notify_results(recent_results: List[Dict[str, Any]]) -> None:
+    """今回取得した過去24時間以内の更新を通知の候補に加え、未送信の分を購読プロファイルごとに通知
+
+    新着/更新の区別と再送の抑止は notifier（送信済みの記録）が行う。前回までに送れなかった候補も送る。
+    """
+    from .notifier import notify_profiles
+    print("\n--- メール通知 ---")
+    with metrics.span("notify", records_in=len(recent_results)):
+        notify_profiles(recent_results)
+
+
+def main(sources: Optional[List[str]] = None, dry_run: bool = False, notify: bool = True,
+         worker: Optional[Worker] = None, deadline_minutes: Optional[float] = None) -> None:
+    """メイン処理
+
+    sources: 実行するソース名（省略時は全ソース）
+    dry_run: 取得・統合のみ行い、data/ への保存と通知を行わない
+    notify:  Falseならメール通知を行わない
+    worker:  並行ワーカーとして担当分だけを取得し、部分結果を保存する（統合・通知は workers.merge）
+    deadline_minutes: 取得の制限時間（分。省略時は RUN_DEADLINE_MINUTES、0 なら無制限）。
+                      過ぎたら残りのクエリ・ページを打ち切り、取得済みの分だけを保存・通知する
+    """
+    sources = list(sources or SOURCES)
+    if not dry_run:
+        metrics.start_run()
+    print(f"=== シェアサイクル監視 実行開始: {clock.now().isoformat()} ===")
+    if dry_run:
+        print("（ドライラン: 保存・通知は行いません）")
+    if worker is not None:
+        print(f"（並行ワーカー {worker.label}、実行ID {worker.run_id}）")
+    deadline.start(RUN_DEADLINE_MINUTES if deadline_minutes is None else deadline_minutes)
+
+    # 既出URLを読み込み
+    with metrics.span("load_state"):
+        seen_urls = load_seen_urls()
+    print(f"既出URL数: {len(seen_urls)}")
+
+    keep_recent = None
+    if (notify or worker is not None) and not dry_run:
+        from .digests import recent_filter
+        keep_recent = recent_filter()
+    sink = collect(sources, seen_urls, dry_run, keep_recent, worker)
+
+    if dry_run:
+        print(f"\n=== ドライラン完了: {clock.now().isoformat()} ===")
+        return
+
+    if worker is not None:
+        worker.write_partial(sink, sources)
+        print(f"\n=== ワーカー {worker.label} 完了: {clock.now().isoformat()} ===")
+        metrics.finish_run()
+        return
+
+    # 新着を既存の結果の先頭に追加して保存（既出URLとの照合済みなので履歴全体の重複排除は不要）
+    with metrics.span("save_results", records_in=len(sink.new)):
+        append_results(sink.new)
+    print(f"結果に追加: {len(sink.new)}件 ({RESULTS_FILE})")
+
+    # 既出URLを更新
+    seen_urls |= sink.urls
+    with metrics.span("save_state"):
+        save_seen_urls(seen_urls)
+    print(f"既出URL更新: {len(seen_urls)}件")
+
+    if notify:
+        notify_results(sink.recent)
+
+    # 直接監視の今回の版は、検出した変更を保存・通知した後に保存（途中で止まれば次回また検出する）
+    if "direct" in sources:
+        from . import snapshots
+        snapshots.store.save()
+
+    print(f"\n=== 処理完了: {clock.now().isoformat()} ===")
+    metrics.finish_run()
@@ -0,0 +1,205 @@
+"""実行ごとの計測（ステージ・ホスト単位のスパン、カウンタ）
+
+start_run() から finish_run() までの間だけ記録する。
+無効時の span() は共有のダミーを返すだけなので、呼び出し側のコストはほぼゼロ。
+
+    with metrics.span("fetch", source="kkj") as s:
+        items = fetch()
+        s.set(records_out=len(items))
+"""
+import os
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from .config import DATA_DIR
+from . import clock
+
+RUN_METRICS_FILE = os.path.join(DATA_DIR, "run_metrics.jsonl")
+
+
+class _NullSpan:
+    """計測無効時のスパン（何もしない）"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """1区間の計測（所要時間と任意の属性）"""
+    __slots__ = ("stage", "attrs", "start", "duration")
+
+    def __init__(self, stage: str, attrs: Dict[str, Any]):
+        self.stage = stage
+        self.attrs = attrs
+        self.start = 0.0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        if _run is not None:
+            _run.spans.append(self)
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+
+class RunMetrics:
+    """1回の実行分の計測データ"""
+
+    def __init__(self):
+        self.started_at = clock.now()
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.counters: Counter = Counter()
+
+
+_run: Optional[RunMetrics] = None
+
+
+def enabled() -> bool:
+    """計測中かどうか"""
+    return _run is not None
+
+
+def span(stage: str, **attrs: Any):
+    """計測区間を開始（with文で使用）"""
+    if _run is None:
+        return _NULL_SPAN
+    return Span(stage, attrs)
+
+
+def count(name: str, n: int = 1) -> None:
+    """カウンタを加算"""
+    if _run is not None:
+        _run.counters[name] += n
+
+
+def start_run() -> None:
+    """計測を開始"""
+    global _run
+    _run = RunMetrics()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """パーセンタイル（最近傍法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(run: RunMetrics) -> Dict[str, Any]:
+    """スパンをステージ別・ホスト別に集計"""
+    stages: Dict[str, Dict[str, Any]] = {}
+    hosts: Dict[str, Dict[str, Any]] = {}
+    host_latencies: Dict[str, List[float]] = defaultdict(list)
+
+    for s in run.spans:
+        key = s.stage
+        if "source" in s.attrs:
+            key = f"{s.stage}:{s.attrs['source']}"
+        stage = stages.setdefault(key, {"count": 0, "seconds": 0.0, "records_in": 0, "records_out": 0, "errors": 0})
+        stage["count"] += 1
+        stage["seconds"] += s.duration
+        stage["records_in"] += s.attrs.get("records_in", 0)
+        stage["records_out"] += s.attrs.get("records_out", 0)
+        stage["errors"] += 1 if "error" in s.attrs else 0
+
+        host = s.attrs.get("host")
+        if s.stage == "http" and host:
+            h = hosts.setdefault(host, {"requests": 0, "seconds": 0.0, "wait_seconds": 0.0, "bytes": 0,
+                                        "errors": 0, "cache_hits": 0, "status": {}})
+            h["requests"] += 1
+            h["seconds"] += s.duration
+            h["wait_seconds"] += s.attrs.get("wait", 0.0)
+            h["bytes"] += s.attrs.get("bytes", 0)
+            h["errors"] += 1 if "error" in s.attrs else 0
+            h["cache_hits"] += 1 if s.attrs.get("cache_hit") else 0
+            status = str(s.attrs.get("status", "error"))
+            h["status"][status] = h["status"].get(status, 0) + 1
+            host_latencies[host].append(s.duration)
+
+    for host, latencies in host_latencies.items():
+        hosts[host]["p50"] = round(_percentile(latencies, 0.5), 4)
+        hosts[host]["p95"] = round(_percentile(latencies, 0.95), 4)
+    for entry in list(stages.values()) + list(hosts.values()):
+        entry["seconds"] = round(entry["seconds"], 4)
+    for entry in hosts.values():
+        entry["wait_seconds"] = round(entry["wait_seconds"], 4)
+
+    return {
+        "started_at": run.started_at.isoformat(),
+        "duration": round(time.perf_counter() - run.start, 4),
+        "stages": stages,
+        "hosts": hosts,
+        "counters": dict(run.counters),
+    }
+
+
+def finish_run(path: str = RUN_METRICS_FILE) -> Optional[Dict[str, Any]]:
+    """計測を終了し、集計結果をJSON Linesで追記"""
+    global _run
+    if _run is None:
+        return None
+    run, _run = _run, None
+    report = summarize(run)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(report, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    slowest = sorted(report["hosts"].items(), key=lambda x: x[1]["seconds"], reverse=True)[:5]
+    total_bytes = sum(h["bytes"] for h in report["hosts"].values())
+    print(f"計測: {report['duration']:.1f}秒 / {total_bytes:,}バイト / "
+          f"CSEクエリ {report['counters'].get('cse_queries', 0)}件")
+    for host, h in slowest:
+        print(f"  {host}: {h['requests']}件 {h['seconds']:.2f}秒 (間隔待ち {h['wait_seconds']:.2f}秒)")
+    return report
+
+
+@contextmanager
+def profile(output_dir: str):
+    """cProfile と tracemalloc のスナップショットを出力（--profile 指定時のみ使用）"""
+    import cProfile
+    import tracemalloc
+
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = os.path.join(output_dir, "run-" + clock.now().strftime("%Y%m%d-%H%M%S"))
+    profiler = cProfile.Profile()
+    tracemalloc.start(25)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        profiler.dump_stats(prefix + ".prof")
+        snapshot.dump(prefix + ".tracemalloc")
+        with open(prefix + "-memory.txt", "w", encoding="utf-8") as f:
+            f.write(f"peak: {peak:,} bytes\n\n")
+            for stat in snapshot.statistics("lineno")[:30]:
+                f.write(f"{stat}\n")
+        print(f"プロファイル出力: {prefix}.prof / {prefix}.tracemalloc (ピーク {peak / 1024 / 1024:.1f} MiB)")
@@ -0,0 +1,203 @@
+"""メール通知機能
+
+本文はプレーンテキストと HTML の2つを、読み込み時に用意したテンプレートから組み立てる。
+"""
+import html
+import smtplib
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from datetime import datetime
+from typing import List, Dict, Any, NamedTuple, Optional
+from .config import GMAIL_ADDRESS, GMAIL_APP_PASSWORD, NOTIFY, NOTIFY_EMAIL
+from . import clock
+from . import digests
+from . import profiles
+from .profiles import Profile
+
+# 案件ごとに、値があれば表示する項目（項目名, 見出し）
+DETAIL_FIELDS = (
+    ("organization", "発注機関"),
+    ("prefecture", "都道府県"),
+    ("update_date", "記事更新日"),
+    ("deadline", "締切日"),
+)
+
+# 本文のテンプレート（format を読み込み時に取り出しておき、案件ごとには呼ぶだけにする）
+_TEXT_HEADER = ("過去{hours:g}時間以内に更新された{description}です。\n\n" + "=" * 50).format
+_TEXT_ITEM = ("\n{status} 案件{index}\nタイトル: {title}\n{details}URL: {url}\n" + "-" * 30).format
+_TEXT_DETAILS = tuple((field, f"{label}: {{}}\n".format) for field, label in DETAIL_FIELDS)
+_TEXT_FOOTER = f"\n詳細はダッシュボードをご確認ください。\n{NOTIFY['dashboard_url']}"
+
+_HTML_HEADER = (
+    '<html><body style="font-family:sans-serif">\n'
+    "<p>過去{hours:g}時間以内に更新された{description}です。</p>\n"
+).format
+_HTML_ITEM = (
+    '<div style="margin:12px 0;padding-bottom:8px;border-bottom:1px solid #ccc">\n'
+    "<div><strong>{status}</strong> 案件{index}</div>\n"
+    '<div><a href="{url}">{title}</a></div>\n'
+    "{details}</div>\n"
+).format
+_HTML_DETAILS = tuple((field, f'<div style="color:#555">{html.escape(label)}: {{}}</div>\n'.format)
+                      for field, label in DETAIL_FIELDS)
+_HTML_FOOTER = (f'<p>詳細は<a href="{html.escape(NOTIFY["dashboard_url"])}">ダッシュボード</a>'
+                "をご確認ください。</p>\n</body></html>\n")
+
+NEW_MARK = "★新着★"
+UPDATED_MARK = "【更新】"
+
+
+class Digest(NamedTuple):
+    """通知メール1通分"""
+    subject: str
+    text: str
+    html: str
+
+
+def is_within_24h(date_str: str) -> bool:
+    """更新日が過去24時間以内かチェック（多数の結果を判定するときは digests.recent_filter を使う）"""
+    return digests.recent_filter(hours=24)(date_str)
+
+
+def send_email(subject: str, body: str, to: Optional[str] = None, html_body: Optional[str] = None) -> bool:
+    """メールを送信（to: 宛先。カンマ区切りで複数可、省略時は NOTIFY_EMAIL。html_body があれば HTML 版も付ける）"""
+    to = NOTIFY_EMAIL if to is None else to
+    if not GMAIL_ADDRESS or not GMAIL_APP_PASSWORD or not to:
+        print("警告: メール設定が不完全です。通知をスキップします。")
+        return False
+
+    try:
+        msg = MIMEMultipart("alternative" if html_body else "mixed")
+        msg["From"] = GMAIL_ADDRESS
+        msg["To"] = to
+        msg["Subject"] = subject
+
+        msg.attach(MIMEText(body, "plain", "utf-8"))
+        if html_body:
+            msg.attach(MIMEText(html_body, "html", "utf-8"))
+
+        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+            server.login(GMAIL_ADDRESS, GMAIL_APP_PASSWORD)
+            server.send_message(msg)
+
+        print(f"メール送信成功: {to}")
+        return True
+    except Exception as e:
+        print(f"メール送信エラー: {e}")
+        return False
+
+
+def sort_by_date(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """更新日が新しい順にソート（日付なしは最後）"""
+    return sorted(items, key=lambda item: digests.day_of(item.get("update_date")) or "", reverse=True)
+
+
+def render(items: List[Dict[str, Any]], reported: set, profile: Optional[Profile] = None) -> Digest:
+    """案件（並べる順のまま）から通知メールを組み立てる。reported にある URL は更新、それ以外は新着として表示"""
+    label = profile.label if profile is not None else "シェアサイクル監視"
+    description = profile.description if profile is not None else "シェアサイクル関連案件"
+    hours = NOTIFY["window_hours"]
+
+    text = [_TEXT_HEADER(hours=hours, description=description)]
+    markup = [_HTML_HEADER(hours=hours, description=html.escape(description))]
+    new_count = 0
+    for i, item in enumerate(items, 1):
+        url = item.get("url", "")
+        is_new = url not in reported
+        new_count += is_new
+        status = NEW_MARK if is_new else UPDATED_MARK
+        title = item.get("title") or "不明"
+        text.append(_TEXT_ITEM(status=status, index=i, title=title, url=url,
+                               details="".join(line(item[field]) for field, line in _TEXT_DETAILS if item.get(field))))
+        markup.append(_HTML_ITEM(status=status, index=i, title=html.escape(title), url=html.escape(url),
+                                 details="".join(line(html.escape(str(item[field])))
+                                                 for field, line in _HTML_DETAILS if item.get(field))))
+    text.append(_TEXT_FOOTER)
+    markup.append(_HTML_FOOTER)
+
+    subject = f"[{label}] 更新案件: {len(items)}件（新着{new_count}/更新{len(items) - new_count}）"
+    return Digest(subject, "\n".join(text), "".join(markup))
+
+
+def build_notification(items: List[Dict[str, Any]], seen_urls: set = None,
+                       profile: Optional[Profile] = None, now: Optional[datetime] = None) -> Optional[Digest]:
+    """通知メールを組み立てる（期間内の更新がなければNone）
+
+    期間内（NOTIFY["window_hours"]）の更新だけを URL で重複を除いて更新日の新しい順に並べ、
+    seen_urls にない URL を新着、ある URL を更新として表示する。
+    profile を渡すと、件名・本文の見出しをそのプロファイルのものにする。
+    """
+    is_recent = digests.recent_filter(now)
+    recent_items, urls = [], set()
+    for item in items:
+        url = item.get("url")
+        if url not in urls and is_recent(item.get("update_date")):
+            urls.add(url)
+            recent_items.append(item)
+    if not recent_items:
+        return None
+    return render(sort_by_date(recent_items), seen_urls or set(), profile)
+
+
+def notify_new_items(items: List[Dict[str, Any]], seen_urls: set = None) -> bool:
+    """新着案件を通知（過去24時間以内の更新のみ。送信済みの記録は使わない）"""
+    if not items:
+        print("新着案件なし。通知をスキップします。")
+        return False
+
+    digest = build_notification(items, seen_urls)
+    if digest is None:
+        print("過去24時間以内の更新案件なし。通知をスキップします。")
+        return False
+
+    return send_email(digest.subject, digest.text, html_body=digest.html)
+
+
+def notify_profiles(items: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, bool]:
+    """期間内の更新を購読プロファイルごとに振り分け、まだ送っていない分をプロファイルごとのダイジェストで送る
+
+    items（今回取得した期間内の更新）は候補の索引に加え、索引のうち期間内の日の分を通知の候補にする
+    （送れなかった前回までの分も含む）。送信済みの記録にある同じ内容の結果は除き、送ったことのある URL は
+    更新として表示する。戻り値はプロファイル名 -> 送信したか（該当なし・通知先未設定のプロファイルは False）。
+    """
+    now = now or clock.now()
+    digests.candidates.add(items)
+    digests.candidates.prune(now)
+    recent_items = digests.candidates.recent(digests.first_day(now))
+    matcher = profiles.get()
+    routed = matcher.route(recent_items)
+    sent = {}
+    for profile in matcher.profiles:
+        matched = routed[profile.name]
+        sent[profile.name] = False
+        if not profile.recipients:
+            if matched:
+                print(f"[{profile.name}] 該当 {len(matched)}件（通知先が未設定のため送信しません）")
+            continue
+        unsent = digests.ledger.unsent(profile.name, matched)
+        if not unsent:
+            print(f"[{profile.name}] 未送信の更新案件なし（期間内 {len(matched)}件は送信済み）。通知をスキップします。")
+            continue
+        digest = render(unsent, digests.ledger.reported(profile.name), profile)
+        print(f"[{profile.name}] 該当 {len(matched)}件（未送信 {len(unsent)}件）")
+        sent[profile.name] = send_email(digest.subject, digest.text, profile.recipients, digest.html)
+        if sent[profile.name]:
+            digests.ledger.mark(profile.name, unsent, now)
+    digests.ledger.prune(now)
+    digests.ledger.save()
+    digests.candidates.save()
+    return sent
+
+
+if __name__ == "__main__":
+    # テスト用
+    test_items = [
+        {
+            "title": "テスト案件",
+            "url": "https://example.com",
+            "organization": "テスト自治体",
+            "prefecture": "東京",
+            "deadline": "2025-02-01",
+        }
+    ]
+    notify_new_items(test_items)
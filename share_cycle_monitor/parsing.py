@@ -0,0 +1,148 @@
+"""直接監視ページの解析（CPU処理）をプロセスプールで行う
+
+取得スレッドは生のバイト列を受け取るだけにし、文字コード判定・BeautifulSoup による解析・
+更新日とキーワードの抽出は解析プロセスで行う（スレッドのままだとGILで1コアに直列化される）。
+解析プロセスからはタイトル・概要・更新日・マッチしたキーワードと、スナップショット用に正規化した
+本文の行・リンクだけのタプル（ParsedPage）を返す。
+
+ページ数が少ない、または使えるCPUが1つの場合はプロセスを起動せず、呼び出したスレッド内で解析する。
+
+    with parsing.pool_for(len(pages)) as parser:
+        future = parser.submit(parsing.parse_page, content, keywords)
+"""
+import multiprocessing
+import os
+import re
+import unicodedata
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Tuple
+
+from bs4 import BeautifulSoup
+from requests.compat import chardet
+
+from .config import PARSING
+
+# <link rel="alternate"> のうちフィードとして扱う type
+FEED_TYPES = ("application/rss+xml", "application/atom+xml", "application/rdf+xml")
+
+# 更新日の表記（上から順に試す）
+UPDATE_DATE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'更新日[：:]\s*(\d{4}年\d{1,2}月\d{1,2}日)',
+    r'最終更新[：:]\s*(\d{4}年\d{1,2}月\d{1,2}日)',
+    r'更新日[：:]\s*(\d{4}/\d{1,2}/\d{1,2})',
+    r'(\d{4}年\d{1,2}月\d{1,2}日)\s*更新',
+    r'(\d{4}-\d{2}-\d{2})',
+)]
+
+
+class ParsedPage(NamedTuple):
+    """解析結果（プロセス間で受け渡す最小限の項目）"""
+    title: str
+    snippet: str
+    update_date: Optional[str]
+    matched_keywords: Tuple[str, ...]
+    lines: Tuple[str, ...] = ()  # 正規化した本文の行（snapshots で前回との差分を取る）
+    links: Tuple[Tuple[str, str], ...] = ()  # 本文中のリンク (href, リンク文字列)。href は相対のまま
+    feeds: Tuple[str, ...] = ()  # <link rel="alternate"> の RSS/Atom フィード（href は相対のまま）
+
+
+def decode(content: bytes, encoding: Optional[str] = None) -> str:
+    """バイト列を文字列に（encoding 未指定なら内容から判定。response.apparent_encoding と同じ判定）"""
+    if encoding is None:
+        encoding = chardet.detect(content)["encoding"] or "utf-8"
+    try:
+        return str(content, encoding, errors="replace")
+    except LookupError:
+        return str(content, "utf-8", errors="replace")
+
+
+def extract_update_date(soup: BeautifulSoup, text: str) -> Optional[str]:
+    """ページから更新日を抽出"""
+    for pattern in UPDATE_DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            date_str = match.group(1)
+            # 日付を統一形式に変換
+            if '年' in date_str:
+                return date_str.replace('年', '-').replace('月', '-').replace('日', '')
+            return date_str.replace('/', '-')
+
+    # metaタグから取得を試みる
+    meta_modified = soup.find("meta", {"name": "lastmod"}) or soup.find("meta", {"property": "article:modified_time"})
+    if meta_modified and meta_modified.get("content"):
+        return meta_modified["content"][:10]
+
+    return None
+
+
+def normalise_line(text: str) -> str:
+    """全角英数字・空白の揺れをそろえる（NFKC + 連続する空白を1つに）"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def parse_html(html: str, keywords: Sequence[str]) -> ParsedPage:
+    """HTMLからタイトル・概要・更新日・マッチしたキーワードを抽出"""
+    soup = BeautifulSoup(html, "html.parser")
+
+    title_tag = soup.find("title")
+    title = title_tag.get_text(strip=True) if title_tag else ""
+
+    # メインコンテンツからテキスト抽出
+    main = soup.find("main") or soup.find("div", {"id": "content"}) or soup.find("body")
+    text = main.get_text(" ", strip=True) if main else ""
+    lines = [normalise_line(line) for line in main.get_text("\n").splitlines()] if main else []
+    links = [(a["href"].strip(), normalise_line(a.get_text(" "))) for a in main.find_all("a", href=True)] if main else []
+
+    return ParsedPage(
+        title=title,
+        snippet=text[:200] + "..." if len(text) > 200 else text,
+        update_date=extract_update_date(soup, text),
+        matched_keywords=tuple(keyword for keyword in keywords if keyword in text),
+        lines=tuple(line for line in lines if line),
+        links=tuple(link for link in links if link[0] and not link[0].startswith(("#", "javascript:", "mailto:"))),
+        feeds=tuple(link["href"].strip() for link in soup.find_all("link", href=True)
+                    if "alternate" in (link.get("rel") or []) and (link.get("type") or "").lower() in FEED_TYPES),
+    )
+
+
+def parse_page(content: bytes, keywords: Sequence[str], encoding: Optional[str] = None) -> ParsedPage:
+    """取得したバイト列を解析（解析プロセスで実行）"""
+    return parse_html(decode(content, encoding), keywords)
+
+
+def available_cpus() -> int:
+    """このプロセスが使えるCPU数"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class InProcessExecutor(Executor):
+    """submit した時点で呼び出し元のスレッドで実行する Executor（少量のとき用）"""
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def mp_context():
+    """解析プロセスの起動方法（取得スレッドの動作中に起動するので、fork ではなく forkserver）"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+
+
+def pool_for(pages: int, workers: Optional[int] = None) -> Executor:
+    """ページ数に応じた解析用の Executor（workers 未指定なら設定値、0 なら利用可能なCPU数）"""
+    workers = min(workers or PARSING["workers"] or available_cpus(), pages)
+    if workers <= 1 or pages < PARSING["pool_min_pages"]:
+        return InProcessExecutor()
+    try:
+        return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context())
+    except (OSError, NotImplementedError) as e:  # セマフォが使えない環境等
+        print(f"解析プロセスを起動できないため、同じプロセスで解析します: {e}")
+        return InProcessExecutor()
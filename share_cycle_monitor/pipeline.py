@@ -0,0 +1,179 @@
+"""取得から保存・通知までのストリーミングパイプライン
+
+各ソースの iter_results() が返すレコードを1件ずつ次の段に流す:
+
+    normalise -> dedupe（今回の実行内の重複・既出URL）-> enrich（都道府県・市区町村の分類）-> Sink
+
+各段はジェネレータなので、メモリに残るのは処理中のレコードと Sink が保持する
+新着・通知候補・今回のURLだけ。新着は確定した時点で Sink が表示する。
+複数ソースを並行に取得する場合は merge_streams で1本の流れにまとめる（キューは有界）。
+"""
+import asyncio
+import queue
+import threading
+from collections import Counter
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional
+
+from . import canonical
+from . import gazetteer
+from .records import Record
+
+_DONE = object()
+
+
+class _Failed:
+    """例外で終わった流れの終端（merge_streams のキューで受け渡す）"""
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class Sink:
+    """パイプラインの終端: 新着・通知候補・今回のURLを保持"""
+
+    def __init__(self, seen_urls: set, keep_recent: Optional[Callable[[Any], bool]] = None):
+        self.seen_urls = seen_urls  # 参照のみ（更新は呼び出し側で urls を反映）
+        self.keep_recent = keep_recent
+        self.urls = set()
+        self.new: List[Record] = []
+        self.recent: List[Record] = []
+        self.counts: Counter = Counter()
+
+    def known(self, record: Record) -> None:
+        """既出のレコード（通知の「既報」候補としてだけ残す）"""
+        self.counts["known"] += 1
+        if self.keep_recent is not None and self.keep_recent(record.get("update_date")):
+            self.recent.append(record)
+
+    def add(self, record: Record) -> None:
+        """新着レコード"""
+        self.new.append(record)
+        if self.keep_recent is not None and self.keep_recent(record.get("update_date")):
+            self.recent.append(record)
+        print(f"  新着: [{record.get('source', '')}] {record.get('title', '')} {record.get('url', '')}")
+
+
+def normalise(records: Iterable[Record], sink: Sink) -> Iterator[Record]:
+    """URL・タイトルの前後の空白を除き、URLのないレコードを捨てる（恒久的に転送されたURLは転送先に置き換える）"""
+    for record in records:
+        sink.counts["received"] += 1
+        url = (record.get("url") or "").strip()
+        if not url:
+            sink.counts["no_url"] += 1
+            continue
+        canonical_url = canonical.resolve(url)
+        if canonical_url != url:
+            sink.counts["aliased"] += 1
+        record["url"] = canonical_url
+        title = record.get("title")
+        if title:
+            record["title"] = title.strip()
+        yield record
+
+
+def dedupe(records: Iterable[Record], sink: Sink) -> Iterator[Record]:
+    """今回の実行内で2回目以降のURLを捨て、既出URLは Sink.known に回す（新着だけを次へ）"""
+    for record in records:
+        url = record["url"]
+        if url in sink.urls:
+            sink.counts["duplicate"] += 1
+            continue
+        sink.urls.add(url)
+        if url in sink.seen_urls:
+            sink.known(record)
+            continue
+        yield record
+
+
+def classify_prefecture(record: Record) -> str:
+    """都道府県を短い表記（東京・神奈川）にそろえる（未設定ならURL・本文から推定し、市区町村も付与）"""
+    prefecture = record.get("prefecture") or ""
+    if prefecture:
+        return gazetteer.short_prefecture(prefecture)
+    place = gazetteer.get().locate(
+        record["url"], record.get("title"), record.get("snippet"), record.get("organization"),
+    )
+    if place is None:
+        return ""
+    if place.municipality and not record.get("municipality"):
+        record["municipality"] = place.municipality
+    return place.prefecture
+
+
+def enrich(records: Iterable[Record]) -> Iterator[Record]:
+    """分類情報を付与"""
+    for record in records:
+        record["prefecture"] = classify_prefecture(record)
+        yield record
+
+
+def run(records: Iterable[Record], seen_urls: set, keep_recent: Optional[Callable[[Any], bool]] = None) -> Sink:
+    """レコードの流れを全段に通し、結果を保持した Sink を返す"""
+    sink = Sink(seen_urls, keep_recent)
+    for record in enrich(dedupe(normalise(records, sink), sink)):
+        sink.add(record)
+    return sink
+
+
+def merge_streams(streams: List[Iterable[Record]], maxsize: int = 64) -> Iterator[Record]:
+    """複数の流れをスレッドで並行に消費し、届いた順に1本にまとめる
+
+    取得中に例外を出した流れがあれば、他の流れを最後まで流した後に最初の例外を送出する
+    （1本ずつ順に流す場合と同じく実行を失敗させる）。
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()  # 受け取り側が途中でやめたら、取得スレッドもキューを待たずに終える
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def drain(stream: Iterable[Record]) -> None:
+        done: Any = _DONE
+        try:
+            for record in stream:
+                if not put(record):
+                    break
+        except Exception as e:
+            print(f"ソース取得エラー: {e}")
+            done = _Failed(e)
+        finally:
+            if stop.is_set() and hasattr(stream, "close"):
+                stream.close()  # 取得中のジェネレータの後始末（スレッドプール等の終了）
+            put(done)
+
+    threads = [threading.Thread(target=drain, args=(stream,), daemon=True) for stream in streams]
+    for thread in threads:
+        thread.start()
+    remaining = len(threads)
+    errors = []
+    try:
+        while remaining:
+            record = buffer.get()
+            if record is _DONE:
+                remaining -= 1
+            elif isinstance(record, _Failed):
+                remaining -= 1
+                errors.append(record.error)
+            else:
+                yield record
+    finally:
+        stop.set()
+    if errors:
+        raise errors[0]
+
+
+def from_async(records: AsyncIterator[Record], loop: asyncio.AbstractEventLoop) -> Iterator[Record]:
+    """イベントループ上の非同期イテレータを、別スレッドから普通のイテレータとして読む"""
+    while True:
+        future = asyncio.run_coroutine_threadsafe(records.__anext__(), loop)
+        try:
+            yield future.result()
+        except StopAsyncIteration:
+            return
@@ -0,0 +1,208 @@
+"""アクセスマナー層: ホスト単位のトークンバケットと robots.txt キャッシュ
+
+スレッド（acquire）と asyncio（acquire_async）の両方から同じバケットを共有する。
+待ち時間は予約方式で決めるため、並行して呼ばれても同一ホストへの間隔が守られる。
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from .config import POLITENESS, ROBOTS_CACHE_FILE
+from . import clock
+from . import serialization
+from . import storage
+
+
+class TokenBucket:
+    """1ホスト分のトークンバケット（tokens が負なら予約済みの待ち）"""
+    __slots__ = ("interval", "capacity", "tokens", "updated")
+
+    def __init__(self, interval: float, capacity: int):
+        self.interval = interval
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """トークンを1つ予約し、送信まで待つべき秒数を返す"""
+        now = time.monotonic()
+        if self.interval <= 0:
+            return 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens * self.interval
+
+
+class HostLimiter:
+    """ホスト単位のリクエスト間隔制御"""
+
+    def __init__(self, crawl_delay: float, burst: int = 1, host_delays: Optional[Dict[str, float]] = None):
+        self.crawl_delay = crawl_delay
+        self.burst = burst
+        self.host_delays = dict(host_delays or {})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.waited: Dict[str, float] = defaultdict(float)
+
+    def delay_for(self, host: str) -> float:
+        """ホストのリクエスト間隔（秒）"""
+        return self.host_delays.get(host, self.crawl_delay)
+
+    def set_delay(self, host: str, delay: float) -> None:
+        """ホストの間隔を変更（robots.txt の Crawl-delay 反映等）"""
+        with self._lock:
+            self.host_delays[host] = delay
+            bucket = self._buckets.get(host)
+            if bucket is not None:
+                bucket.interval = delay
+
+    def _reserve(self, host: str) -> float:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.delay_for(host), self.burst)
+            wait = bucket.reserve()
+            self.waited[host] += wait
+            return wait
+
+    def acquire(self, host: str) -> float:
+        """送信可能になるまでブロックし、待った秒数を返す"""
+        wait = self._reserve(host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, host: str) -> float:
+        """送信可能になるまで待機（asyncio版）"""
+        wait = self._reserve(host)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def wait_report(self) -> Dict[str, float]:
+        """ホストごとの累積待ち時間（秒）"""
+        with self._lock:
+            return {host: round(seconds, 3) for host, seconds in self.waited.items() if seconds > 0}
+
+
+def _unreachable(status: int) -> bool:
+    """robots.txt が取得できなかったか（通信エラーは 0、サーバエラーは 5xx）"""
+    return status == 0 or status >= 500
+
+
+class RobotsCache:
+    """robots.txt をホストごとに1回取得し、ディスクにTTL付きでキャッシュ"""
+
+    def __init__(self, path: str, ttl_hours: float, user_agent: str, retry_minutes: float = 30):
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.retry = timedelta(minutes=retry_minutes)
+        self.user_agent = user_agent
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._parsers: Dict[str, RobotFileParser] = {}
+        self._lock = threading.Lock()
+        self._host_locks: Dict[str, threading.Lock] = {}
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                self._entries = serialization.load_file(self.path)
+        return self._entries
+
+    def _save(self, host: str) -> None:
+        # 他のプロセスが保存した他ホスト分は残し、このホストの分だけ書き込む
+        entry = self._entries[host]
+        self._entries = storage.update_json(self.path, lambda entries: {**entries, host: entry}, {})
+
+    def _fetch(self, scheme: str, host: str) -> Dict:
+        """robots.txt を取得（通信エラーは status 0）"""
+        from . import http_client
+
+        entry = {"fetched_at": clock.now().isoformat(), "status": 0, "body": ""}
+        try:
+            response = http_client.get(f"{scheme}://{host}/robots.txt", timeout=10)
+            entry["status"] = response.status_code
+            if response.status_code == 200:
+                entry["body"] = response.text
+        except Exception as e:
+            print(f"robots.txt 取得エラー ({host}): {e}")
+        return entry
+
+    def _parser(self, scheme: str, host: str) -> RobotFileParser:
+        """ホストの robots.txt パーサ（期限切れなら再取得）"""
+        with self._lock:
+            host_lock = self._host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            with self._lock:
+                entry = self._load().get(host)
+                parser = self._parsers.get(host)
+            fresh = entry and clock.now() - datetime.fromisoformat(entry["fetched_at"]) < (
+                self.retry if _unreachable(entry["status"]) else self.ttl)
+            if fresh and parser is not None:
+                return parser
+
+            if not fresh:
+                entry = self._fetch(scheme, host)
+                with self._lock:
+                    self._load()[host] = entry
+                    self._save(host)
+
+            parser = RobotFileParser()
+            if entry["status"] in (401, 403) or _unreachable(entry["status"]):
+                # 取得できなかったときは全体を禁止（RFC 9309）。retry_minutes 後に取得し直す
+                parser.disallow_all = True
+            else:
+                # 404 等の 4xx は制限なし
+                parser.parse(entry["body"].splitlines())
+            parser.modified()
+            with self._lock:
+                self._parsers[host] = parser
+            return parser
+
+    def allowed(self, url: str) -> bool:
+        """URL の取得が robots.txt で許可されているか"""
+        parts = urlsplit(url)
+        if not parts.hostname:
+            return True
+        return self._parser(parts.scheme or "https", parts.netloc).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        """robots.txt の Crawl-delay（指定なしはNone）"""
+        parts = urlsplit(url)
+        delay = self._parser(parts.scheme or "https", parts.netloc).crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    def sitemaps(self, url: str) -> List[str]:
+        """robots.txt の Sitemap 行のURL"""
+        parts = urlsplit(url)
+        return list(self._parser(parts.scheme or "https", parts.netloc).site_maps() or [])
+
+
+limiter = HostLimiter(
+    POLITENESS["crawl_delay"], POLITENESS.get("burst", 1), POLITENESS.get("host_delays"),
+)
+robots = RobotsCache(
+    ROBOTS_CACHE_FILE, POLITENESS.get("robots_ttl_hours", 24), POLITENESS.get("robots_user_agent", "*"),
+    POLITENESS.get("robots_retry_minutes", 30),
+)
+
+
+def check_robots(url: str) -> bool:
+    """robots.txt を確認し、Crawl-delay をリミッタに反映。取得可否を返す"""
+    if not robots.allowed(url):
+        return False
+    delay = robots.crawl_delay(url)
+    host = urlsplit(url).hostname or ""
+    if delay is not None and delay > limiter.delay_for(host):
+        limiter.set_delay(host, delay)
+    return True
@@ -0,0 +1,157 @@
+"""購読プロファイル（キーワード・地域・通知先）への振り分け
+
+1回の取得結果を config.PROFILES の各プロファイルに振り分ける。全プロファイルのキーワード（含める語・
+除く語）を1つの正規表現にまとめ、プロファイルはビット位置で表すので、レコードごとにテキストを1回走査し、
+ビット演算だけで該当する全プロファイルが決まる（プロファイル数が増えても走査は1回）。
+
+正規表現は各位置で最も長い語だけを拾う（先読みなので位置ごとに1つ、重なりは拾える）。同じ位置から始まる
+短い語はその長い語に含まれるので、語ごとのビット集合には、その語に含まれる他の語の分もあらかじめ合わせておく。
+英数字は全角・半角、大文字・小文字のどれにも一致するパターンにするので、本文を正規化せずにそのまま走査できる。
+
+    python -m share_cycle_monitor.profiles            # 各プロファイルの条件と、蓄積結果のうち該当する件数
+"""
+import argparse
+import re
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Tuple
+
+from .config import PROFILES
+
+# 照合するレコードの項目
+MATCH_FIELDS = ("title", "snippet", "organization")
+# 全角の英数字・記号と全角スペース -> 半角
+_HALF_WIDTH = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+_HALF_WIDTH[0x3000] = 0x20
+
+
+class Profile(NamedTuple):
+    """購読プロファイル"""
+    name: str
+    keywords: Tuple[str, ...]
+    exclude: Tuple[str, ...]
+    prefectures: Tuple[str, ...]
+    recipients: str
+    label: str
+    description: str
+
+
+def normalise(text: str) -> str:
+    """照合用の正規化（全角英数記号を半角に、英字を小文字に）"""
+    return text.translate(_HALF_WIDTH).lower()
+
+
+def _pattern(keyword: str) -> str:
+    """正規化した語の正規表現（英数字・記号は全角・半角、大文字・小文字を問わない）"""
+    parts = []
+    for ch in keyword:
+        if "!" <= ch <= "~":
+            variants = {ch, ch.upper(), chr(ord(ch) + 0xFEE0), chr(ord(ch.upper()) + 0xFEE0)}
+            parts.append("[" + "".join(re.escape(v) for v in sorted(variants)) + "]")
+        else:
+            parts.append(re.escape(ch))
+    return "".join(parts)
+
+
+def load(settings: Mapping[str, Mapping[str, Any]] = PROFILES) -> List[Profile]:
+    """設定からプロファイルを作る"""
+    return [
+        Profile(
+            name=name,
+            keywords=tuple(profile.get("keywords", ())),
+            exclude=tuple(profile.get("exclude", ())),
+            prefectures=tuple(profile.get("prefectures", ())),
+            recipients=profile.get("recipients", ""),
+            label=profile.get("label", name),
+            description=profile.get("description", name),
+        )
+        for name, profile in settings.items()
+    ]
+
+
+class Matcher:
+    """全プロファイルの条件をまとめた照合器"""
+
+    def __init__(self, profiles: List[Profile]):
+        self.profiles = profiles
+        masks: Dict[str, List[int]] = {}  # 正規化した語 -> [含めるプロファイル, 除くプロファイル]
+        self.any_keyword = 0  # キーワードの指定がないプロファイル
+        self.any_region = 0  # 地域の指定がないプロファイル
+        self.regions: Dict[str, int] = {}
+        for i, profile in enumerate(profiles):
+            bit = 1 << i
+            for keyword in profile.keywords:
+                masks.setdefault(normalise(keyword), [0, 0])[0] |= bit
+            for keyword in profile.exclude:
+                masks.setdefault(normalise(keyword), [0, 0])[1] |= bit
+            if not profile.keywords:
+                self.any_keyword |= bit
+            if not profile.prefectures:
+                self.any_region |= bit
+            for prefecture in profile.prefectures:
+                self.regions[prefecture] = self.regions.get(prefecture, 0) | bit
+        # 語 -> (含めるプロファイル, 除くプロファイル)。その語に含まれる短い語の分も合わせる
+        self.masks: Dict[str, Tuple[int, int]] = {}
+        for keyword in masks:
+            include = exclude = 0
+            for other, (inc, exc) in masks.items():
+                if other in keyword:
+                    include |= inc
+                    exclude |= exc
+            self.masks[keyword] = (include, exclude)
+        keywords = sorted(self.masks, key=len, reverse=True)
+        self.pattern = re.compile("(?=(" + "|".join(map(_pattern, keywords)) + "))") if keywords else None
+
+    def match(self, record: Mapping[str, Any]) -> int:
+        """レコードが該当するプロファイルのビット集合"""
+        text = "\n".join([record.get(field) or "" for field in MATCH_FIELDS] + list(record.get("matched_keywords") or ()))
+        include = exclude = 0
+        if self.pattern is not None:
+            for found in set(self.pattern.findall(text)):
+                inc, exc = self.masks[normalise(found)]
+                include |= inc
+                exclude |= exc
+        region = self.any_region | self.regions.get(record.get("prefecture") or "", 0)
+        return (include | self.any_keyword) & ~exclude & region
+
+    def names(self, record: Mapping[str, Any]) -> List[str]:
+        """レコードが該当するプロファイル名"""
+        mask = self.match(record)
+        return [profile.name for i, profile in enumerate(self.profiles) if mask >> i & 1]
+
+    def route(self, records: Iterable[Mapping[str, Any]]) -> Dict[str, List[Mapping[str, Any]]]:
+        """レコードをプロファイルごとに振り分ける（プロファイル名 -> 該当するレコード。元の順序のまま）"""
+        routed: Dict[str, List[Mapping[str, Any]]] = {profile.name: [] for profile in self.profiles}
+        buckets = [routed[profile.name] for profile in self.profiles]
+        for record in records:
+            mask = self.match(record)
+            i = 0
+            while mask:
+                if mask & 1:
+                    buckets[i].append(record)
+                mask >>= 1
+                i += 1
+        return routed
+
+
+_matcher = None
+
+
+def get() -> Matcher:
+    """設定のプロファイルの照合器（初回に作成）"""
+    global _matcher
+    if _matcher is None:
+        _matcher = Matcher(load())
+    return _matcher
+
+
+if __name__ == "__main__":
+    from .main import load_results
+
+    parser = argparse.ArgumentParser(description="購読プロファイルの条件と、蓄積結果のうち該当する件数")
+    parser.parse_args()
+    matcher = get()
+    routed = matcher.route(load_results())
+    for profile in matcher.profiles:
+        print(f"{profile.name}: {len(routed[profile.name])}件（通知先 {'設定済み' if profile.recipients else '未設定'}）")
+        print(f"  キーワード: {', '.join(profile.keywords) or '（全件）'}"
+              + (f" / 除外: {', '.join(profile.exclude)}" if profile.exclude else ""))
+        print(f"  地域: {', '.join(profile.prefectures) or '（全国）'}")
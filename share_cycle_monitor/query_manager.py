@@ -0,0 +1,266 @@
+"""クエリ自動生成・クォータ管理・ローテーション"""
+import os
+import json
+import math
+from datetime import datetime
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from .config import (
+    TOPICS, ACTIONS, EVENT_QUERIES, PROCUREMENT_SITES,
+    QUOTA, DATE_WINDOW, QUERY_STATE_FILE, DATA_DIR,
+)
+from . import clock
+from . import serialization
+from . import storage
+
+
+def _generate_all_combinations() -> List[str]:
+    """トピック × アクション の全組み合わせを生成"""
+    return [f"{t['term']} {a['term']}" for t in TOPICS for a in ACTIONS]
+
+
+def _load_state() -> Dict[str, Any]:
+    """クエリ実行状態を読み込み"""
+    if os.path.exists(QUERY_STATE_FILE):
+        return serialization.load_file(QUERY_STATE_FILE)
+    return {}
+
+
+def merge_query_entries(entries: Dict[str, Dict[str, Any]]) -> None:
+    """クエリごとの状態を統合して保存（last_run の新しい方を優先。並行ワーカーの部分結果の統合用）"""
+    def update(state: Dict[str, Any]) -> Dict[str, Any]:
+        for query, entry in entries.items():
+            current = state.get(query, {})
+            if (entry.get("last_run") or "") >= (current.get("last_run") or ""):
+                state[query] = {**current, **entry}
+        return state
+
+    storage.update_json(QUERY_STATE_FILE, update, {})
+
+
+def _query_weight(query: str) -> float:
+    """クエリに含まれるトピック・アクションの重みの和"""
+    topic_weight = 0
+    action_weight = 0
+    for t in TOPICS:
+        if t["term"] in query:
+            topic_weight = t["weight"]
+            break
+    for a in ACTIONS:
+        if a["term"] in query:
+            action_weight = a["weight"]
+            break
+    return topic_weight + action_weight
+
+
+def past_yield(entry: Optional[Dict[str, Any]]) -> float:
+    """前回の実行での1回あたりの新規件数（(新規 + 1) / (回数 + 1)。未実行は1）"""
+    if not entry or not entry.get("pages"):
+        return 1.0
+    return (entry.get("new", 0) + 1) / (entry["pages"] + 1)
+
+
+def order_by_value(queries: List[str], state: Optional[Dict[str, Any]] = None,
+                   weight: Callable[[str], float] = _query_weight,
+                   key: Callable[[str], str] = lambda q: q) -> List[str]:
+    """クエリを期待値（重み × 前回の収穫）の高い順に並べる（同じ値なら元の順）
+
+    key はクエリから状態のキーを求める関数（官公需APIの検索語は "kkj:" 付きで記録する）。
+    """
+    state = _load_state() if state is None else state
+    return sorted(queries, key=lambda q: weight(q) * past_yield(state.get(key(q))), reverse=True)
+
+
+def _priority_score(query: str, state: Dict[str, Any], now: datetime) -> float:
+    """クエリの優先度スコアを算出"""
+    # 未実行日数ボーナス
+    last_run = state.get(query, {}).get("last_run")
+    if last_run:
+        days_since = (now - datetime.fromisoformat(last_run)).total_seconds() / 86400
+    else:
+        days_since = 30  # 未実行は30日相当のボーナス
+
+    return _query_weight(query) + days_since * 0.5
+
+
+def date_windows(queries: List[str], state: Dict[str, Any], now: datetime) -> Dict[str, str]:
+    """クエリごとの dateRestrict（前回実行からの経過日数 + 重複分、未実行は最大幅）"""
+    windows = {}
+    for q in queries:
+        last_run = state.get(q, {}).get("last_run")
+        if last_run:
+            elapsed = (now - datetime.fromisoformat(last_run)).total_seconds() / 86400
+            days = math.ceil(elapsed + DATE_WINDOW["overlap_days"])
+        else:
+            days = DATE_WINDOW["max_days"]
+        windows[q] = f"d{min(DATE_WINDOW['max_days'], max(DATE_WINDOW['min_days'], days))}"
+    return windows
+
+
+def select_queries_for_run(save: bool = True) -> Dict[str, List[str]]:
+    """今回実行するクエリを選択し、状態を更新（save=Falseなら状態は保存しない）"""
+    return plan_queries_for_run(save)[0]
+
+
+def plan_queries_for_run(save: bool = True, now: Optional[datetime] = None) -> Tuple[Dict[str, List[str]], Dict[str, str]]:
+    """今回実行するクエリと、クエリごとの dateRestrict を決めて状態を更新（save=Falseなら状態は保存しない）
+
+    now を揃えれば、同じ状態からは同じクエリが選ばれる（並行ワーカーが分担を決める際に使用）。
+    """
+    state = _load_state()
+    now = now or clock.now()
+    alloc = QUOTA["allocation"]
+
+    # --- Google一般検索 ---
+    all_combos = _generate_all_combinations()
+    scored = [(q, _priority_score(q, state, now)) for q in all_combos]
+    scored.sort(key=lambda x: x[1], reverse=True)
+    google_queries = [q for q, _ in scored[:alloc["google"]]]
+
+    # --- 入札サイト検索 ---
+    site_queries: Dict[str, List[str]] = {}
+    for site in PROCUREMENT_SITES:
+        name = site["name"]
+        domain = site["domain"]
+        limit = alloc.get(name, 4)
+        # トピックのみ（アクション不要、サイト自体が入札情報）
+        topic_scored = []
+        for t in TOPICS:
+            q = f"site:{domain} {t['term']}"
+            last_run = state.get(q, {}).get("last_run")
+            if last_run:
+                days_since = (now - datetime.fromisoformat(last_run)).total_seconds() / 86400
+            else:
+                days_since = 30
+            score = t["weight"] + days_since * 0.5
+            topic_scored.append((q, score))
+        topic_scored.sort(key=lambda x: x[1], reverse=True)
+        site_queries[name] = [q for q, _ in topic_scored[:limit]]
+
+    # --- イベント固有クエリ ---
+    event_scored = []
+    for q in EVENT_QUERIES:
+        last_run = state.get(q, {}).get("last_run")
+        if last_run:
+            days_since = (now - datetime.fromisoformat(last_run)).total_seconds() / 86400
+        else:
+            days_since = 30
+        event_scored.append((q, days_since))
+    event_scored.sort(key=lambda x: x[1], reverse=True)
+    event_queries = [q for q, _ in event_scored[:alloc["event"]]]
+
+    # 期間指定は前回の実行日時から決めるので、状態を更新する前に算出
+    all_selected = google_queries + event_queries
+    for queries in site_queries.values():
+        all_selected += queries
+    windows = date_windows(all_selected, state, now)
+
+    # 状態を更新（読み込んだ後に他のプロセスが保存した分は残す）
+    # 締め切りで打ち切った場合に戻せるよう、前回の実行日時を previous_run に残す
+    now_iso = now.isoformat()
+    if save:
+        def mark(current: Dict[str, Any]) -> Dict[str, Any]:
+            for q in all_selected:
+                entry = current.setdefault(q, {})
+                entry["previous_run"] = entry.get("last_run")
+                entry["last_run"] = now_iso
+            return current
+
+        storage.update_json(QUERY_STATE_FILE, mark, {})
+
+    total = len(all_selected)
+    print(f"クエリ選択完了: {total}件 + 追加ページ枠{alloc.get('pagination', 0)}件 (上限{QUOTA['per_run']})")
+
+    # 選択した中では期待値の高い順に実行する（締め切りで打ち切られるのは期待値の低いクエリから）
+    selected = {
+        "google": order_by_value(google_queries + event_queries, state),
+        **{name: order_by_value(queries, state) for name, queries in site_queries.items()},
+    }
+    return selected, windows
+
+
+def release_queries(queries: List[str], planned_at: datetime) -> None:
+    """締め切りで実行しなかったクエリの last_run を選択前に戻す（次回も選ばれるように）"""
+    if not queries:
+        return
+    planned = planned_at.isoformat()
+
+    def update(state: Dict[str, Any]) -> Dict[str, Any]:
+        for query in queries:
+            entry = state.get(query)
+            if entry is None or entry.get("last_run") != planned:
+                continue  # 他の実行がその後に実行済み
+            previous = entry.pop("previous_run", None)
+            if previous:
+                entry["last_run"] = previous
+            else:
+                entry.pop("last_run", None)
+            if not entry:
+                del state[query]
+        return state
+
+    storage.update_json(QUERY_STATE_FILE, update, {})
+
+
+def record_query_stats(stats: Dict[str, Dict[str, Any]]) -> None:
+    """クエリ別の取得結果（ページ数・件数・新規件数・ページごとの新規率）を状態に記録"""
+    if not stats:
+        return
+
+    def update(state: Dict[str, Any]) -> Dict[str, Any]:
+        for query, entry in stats.items():
+            state.setdefault(query, {}).update(entry)
+        return state
+
+    storage.update_json(QUERY_STATE_FILE, update, {})
+
+
+def yield_report() -> None:
+    """CSE 1回あたりの新規URL数を、実行ごと（run_metrics.jsonl）と期間指定ごと（query_state.json）に表示"""
+    from .metrics import RUN_METRICS_FILE
+
+    print("--- 実行ごと ---")
+    if os.path.exists(RUN_METRICS_FILE):
+        with open(RUN_METRICS_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                report = json.loads(line)
+                counters = report.get("counters", {})
+                calls = counters.get("cse_queries", 0)
+                if not calls:
+                    continue
+                started_at = report["started_at"][:16]
+                new = counters.get("cse_new_urls")
+                per_call = f"{new / calls:.2f}" if new is not None else "-"
+                print(f"  {started_at}  CSE {calls:3d}回  新規URL {new if new is not None else '-':>4}件  1回あたり {per_call}")
+
+    print("\n--- 期間指定ごと（各クエリの直近の実行） ---")
+    by_window: Dict[str, Dict[str, int]] = {}
+    for entry in _load_state().values():
+        if "date_restrict" not in entry:
+            continue
+        bucket = by_window.setdefault(entry["date_restrict"], {"queries": 0, "calls": 0, "new": 0})
+        bucket["queries"] += 1
+        bucket["calls"] += entry.get("pages", 0)
+        bucket["new"] += entry.get("new", 0)
+    for window, bucket in sorted(by_window.items(), key=lambda x: int(x[0][1:])):
+        per_call = bucket["new"] / bucket["calls"] if bucket["calls"] else 0.0
+        print(f"  {window:>4}  クエリ {bucket['queries']:3d}件  CSE {bucket['calls']:3d}回  "
+              f"新規URL {bucket['new']:4d}件  1回あたり {per_call:.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="クエリ選択（状態を更新）/ 新規URLの取得効率の表示")
+    parser.add_argument("--yield-report", action="store_true", help="CSE 1回あたりの新規URL数を表示（状態は更新しない）")
+    args = parser.parse_args()
+    if args.yield_report:
+        yield_report()
+        raise SystemExit(0)
+
+    selected, windows = plan_queries_for_run()
+    for category, queries in selected.items():
+        print(f"\n[{category}] ({len(queries)}件)")
+        for q in queries:
+            print(f"  - {q} ({windows[q]})")
+    total = sum(len(v) for v in selected.values())
+    print(f"\n合計: {total}件")
@@ -0,0 +1,153 @@
+"""Google CSE のクォータ管理と追加ページ取得の判定
+
+- QuotaTracker: 1日あたりのAPI呼び出し回数を data/quota_state.json に記録（日付が変わると0から）
+- SearchPlan: 1回の実行分。クエリごとの期間指定（dateRestrict）を持ち、前ページの新規URL率が閾値以上の
+  間だけ次のページ（start=11, 21, ...）を許可し、クエリごとのページ数・件数・新規件数を集計する
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from .config import DATE_WINDOW, PAGINATION, QUOTA, QUOTA_STATE_FILE
+from . import clock
+from . import metrics
+from . import serialization
+from . import storage
+
+PAGE_SIZE = 10
+
+
+class QuotaTracker:
+    """1日あたりの CSE 使用回数"""
+
+    def __init__(self, path: str, daily_limit: int):
+        self.path = path
+        self.daily_limit = daily_limit
+        self._state: Optional[Dict[str, Any]] = None
+        self.unsaved = {"used": 0, "pages": 0}  # 保存前に使った回数
+        self._lock = threading.Lock()
+
+    def _read(self, today: str) -> Dict[str, Any]:
+        state = serialization.load_file(self.path) if os.path.exists(self.path) else {}
+        if state.get("date") != today:
+            state = {"date": today, "used": 0, "pages": 0}
+        return state
+
+    def _load(self) -> Dict[str, Any]:
+        today = clock.now().date().isoformat()
+        if self._state is None or self._state.get("date") != today:
+            self._state = self._read(today)
+            self.unsaved = {"used": 0, "pages": 0}  # 日付が変わったら前日分は数えない
+        return self._state
+
+    def spend(self, pagination: bool = False) -> None:
+        """1回分の呼び出しを記録（pagination=True は追加ページ）"""
+        self.add(1, 1 if pagination else 0)
+
+    def add(self, used: int, pages: int = 0) -> None:
+        """使用回数を加算（並行ワーカーの部分結果の統合にも使う）"""
+        with self._lock:
+            state = self._load()
+            state["used"] += used
+            state["pages"] += pages
+            self.unsaved["used"] += used
+            self.unsaved["pages"] += pages
+
+    def remaining(self) -> int:
+        """今日の残り回数"""
+        with self._lock:
+            return max(0, self.daily_limit - self._load()["used"])
+
+    def save(self) -> None:
+        """保存（ファイルを読み直し、このプロセスで使った回数を加算する）"""
+        with self._lock:
+            with storage.locked(self.path):
+                state = self._read(clock.now().date().isoformat())
+                state["used"] += self.unsaved["used"]
+                state["pages"] += self.unsaved["pages"]
+                serialization.dump_file(self.path, state)
+            self._state = state
+            self.unsaved = {"used": 0, "pages": 0}
+
+
+tracker = QuotaTracker(QUOTA_STATE_FILE, QUOTA["daily_limit"])
+
+
+class SearchPlan:
+    """1回の実行での期間指定・追加ページ取得の判定とクエリ別集計（スレッドセーフ）"""
+
+    def __init__(self, seen_urls: set, budget: int, threshold: float, max_pages: int,
+                 quota: Optional[QuotaTracker] = None, windows: Optional[Dict[str, str]] = None):
+        self.seen_urls = seen_urls  # 参照のみ
+        self.windows = windows or {}
+        self.budget = budget
+        self.threshold = threshold
+        self.max_pages = max_pages
+        self.quota = quota
+        self.run_urls = set()
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def date_restrict(self, query: str) -> str:
+        """クエリの dateRestrict（未指定なら最大幅）"""
+        return self.windows.get(query, f"d{DATE_WINDOW['max_days']}")
+
+    def observe(self, query: str, urls: List[str]) -> float:
+        """1ページ分の結果を記録し、新規URL率を返す"""
+        with self._lock:
+            new = 0
+            for url in urls:
+                if url not in self.seen_urls and url not in self.run_urls:
+                    new += 1
+                self.run_urls.add(url)
+            stats = self.stats.setdefault(query, {
+                "date_restrict": self.date_restrict(query), "pages": 0, "results": 0, "new": 0, "novelty": [],
+            })
+            stats["pages"] += 1
+            stats["results"] += len(urls)
+            stats["new"] += new
+            novelty = new / len(urls) if urls else 0.0
+            stats["novelty"].append(round(novelty, 2))
+        metrics.count("cse_new_urls", new)
+        return novelty
+
+    def next_start(self, query: str, start: int, urls: List[str]) -> Optional[int]:
+        """前ページ（start からの urls）を踏まえ、次に取得する start を返す（打ち切りならNone）"""
+        novelty = self.observe(query, urls)
+        page = (start - 1) // PAGE_SIZE + 1
+        if len(urls) < PAGE_SIZE or novelty < self.threshold or page >= self.max_pages:
+            return None
+        with self._lock:
+            if self.budget <= 0:
+                return None
+            if self.quota is not None and self.quota.remaining() <= 0:
+                return None
+            self.budget -= 1
+        return start + PAGE_SIZE
+
+    def report(self) -> None:
+        """クエリ別の結果を表示"""
+        if not self.stats:
+            return
+        print("\n--- クエリ別結果 ---")
+        for query, stats in self.stats.items():
+            novelty = " → ".join(f"{n:.0%}" for n in stats["novelty"])
+            print(f"  {query} [{stats['date_restrict']}]: {stats['pages']}ページ / {stats['results']}件 / "
+                  f"新規{stats['new']}件 ({novelty})")
+        calls = sum(stats["pages"] for stats in self.stats.values())
+        new = sum(stats["new"] for stats in self.stats.values())
+        print(f"  追加ページ: {calls - len(self.stats)}回（残り枠 {self.budget}回）")
+        print(f"  新規URL: {new}件 / {calls}回 = 1回あたり {new / calls:.2f}件")
+
+
+def plan_for_run(seen_urls: set, windows: Optional[Dict[str, str]] = None,
+                 budget: Optional[int] = None) -> SearchPlan:
+    """設定値から今回の実行用の SearchPlan を作る（budget: 追加ページ枠。既定は設定値）"""
+    return SearchPlan(
+        seen_urls,
+        budget=QUOTA["allocation"].get("pagination", 0) if budget is None else budget,
+        threshold=PAGINATION["novelty_threshold"],
+        max_pages=PAGINATION["max_pages"],
+        quota=tracker,
+        windows=windows,
+    )
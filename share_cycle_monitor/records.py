@@ -0,0 +1,184 @@
+"""取得結果1件を表すレコード型
+
+従来の dict と同じ添字アクセス（item["url"] / item.get("prefecture")）ができる __slots__ クラス。
+- source / prefecture / organization / municipality / category / matched_keywords は sys.intern で共有
+- fetched_at は naive なエポックからのマイクロ秒（int）で保持し、読み出し時にISO文字列へ戻す
+- 定義外のキーは extra（必要になるまで None）に入れる
+JSON へは to_dict()（serialization の default）で従来と同じ形で書き出す。
+"""
+import sys
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+# 出力順（results.json のキー順）
+FIELDS = (
+    "title", "url", "snippet", "update_date", "source", "fetched_at", "prefecture",
+    "organization", "municipality", "matched_keywords", "category", "issue_date", "deadline",
+    "status", "final_url", "checked_at",  # リンク確認（liveness）の結果
+)
+# 値の種類が少なく、レコード間で重複するフィールド
+INTERNED = frozenset({"source", "prefecture", "organization", "municipality", "category"})
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING = object()
+
+# キー -> スロット名（fetched_at だけ型が変わるので別名）
+_SLOTS = {name: name for name in FIELDS}
+_SLOTS["fetched_at"] = "fetched_us"
+
+
+def to_microseconds(value: Any) -> Any:
+    """datetime / ISO文字列をエポックからのマイクロ秒に変換（解釈できない値はそのまま）"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return (value - _EPOCH) // _MICROSECOND
+    return value
+
+
+def from_microseconds(value: Any) -> Any:
+    """to_microseconds の逆変換（ISO文字列）"""
+    if isinstance(value, int):
+        return (_EPOCH + timedelta(microseconds=value)).isoformat()
+    return value
+
+
+class Record(MutableMapping):
+    """取得結果1件（dict互換の添字アクセス）"""
+    __slots__ = tuple(_SLOTS.values()) + ("extra",)
+
+    def __init__(self, fields: Dict[str, Any] = None, **kwargs: Any):
+        self.extra = None
+        for data in (fields, kwargs):
+            if not data:
+                continue
+            # __setitem__ を経由せず設定関数を直接呼ぶ（一括読み込み時の呼び出し回数を減らす）
+            for key, value in data.items():
+                setter = _SETTERS.get(key)
+                if setter is None:
+                    self[key] = value
+                else:
+                    setter(self, value)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """dict（results.json の1件）から生成"""
+        return cls(data)
+
+    def __getitem__(self, key: str) -> Any:
+        slot = _SLOTS.get(key)
+        if slot is None:
+            if self.extra is None:
+                raise KeyError(key)
+            return self.extra[key]
+        value = getattr(self, slot, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return from_microseconds(value) if slot == "fetched_us" else value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        setter = _SETTERS.get(key)
+        if setter is not None:
+            setter(self, value)
+            return
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        slot = _SLOTS.get(key)
+        try:
+            if slot is None:
+                del self.extra[key]
+            else:
+                delattr(self, slot)
+        except (AttributeError, KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for key, slot in _SLOTS.items():
+            if getattr(self, slot, _MISSING) is not _MISSING:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        slot = _SLOTS.get(key)
+        if slot is None:
+            return bool(self.extra) and key in self.extra
+        return getattr(self, slot, _MISSING) is not _MISSING
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # dict と同じく欠損時は default（MutableMapping の既定実装より速い）
+        slot = _SLOTS.get(key)
+        if slot is None:
+            return self.extra.get(key, default) if self.extra else default
+        value = getattr(self, slot, _MISSING)
+        if value is _MISSING:
+            return default
+        return from_microseconds(value) if slot == "fetched_us" else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 出力用の dict（matched_keywords はリストに戻す）"""
+        data = {}
+        for key, slot in _SLOTS.items():
+            value = getattr(self, slot, _MISSING)
+            if value is _MISSING:
+                continue
+            if slot == "fetched_us":
+                value = from_microseconds(value)
+            elif type(value) is tuple:
+                value = list(value)
+            data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Record({self.to_dict()!r})"
+
+
+def _interning(setter: Callable[[Record, Any], None]) -> Callable[[Record, Any], None]:
+    def set_interned(record: Record, value: Any) -> None:
+        setter(record, sys.intern(value) if type(value) is str else value)
+    return set_interned
+
+
+def _set_fetched_at(record: Record, value: Any) -> None:
+    record.fetched_us = to_microseconds(value)
+
+
+def _set_keywords(record: Record, value: Any) -> None:
+    if isinstance(value, list):
+        value = tuple(sys.intern(k) if type(k) is str else k for k in value)
+    record.matched_keywords = value
+
+
+# キー -> 値の設定関数（通常のフィールドはスロットの記述子をそのまま使う）
+_SETTERS: Dict[str, Callable[[Record, Any], None]] = {
+    key: getattr(Record, slot).__set__ for key, slot in _SLOTS.items()
+}
+for _key in INTERNED:
+    _SETTERS[_key] = _interning(_SETTERS[_key])
+_SETTERS["fetched_at"] = _set_fetched_at
+_SETTERS["matched_keywords"] = _set_keywords
+
+
+def from_dicts(items: Iterable[Dict[str, Any]]) -> List[Record]:
+    """dict のリスト（読み込んだ results.json 等）をレコードに変換"""
+    return [item if isinstance(item, Record) else Record(item) for item in items]
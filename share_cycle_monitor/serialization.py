@@ -0,0 +1,83 @@
+"""JSON の読み書き（orjson があれば使い、なければ標準の json）
+
+出力はどちらも UTF-8・インデント2で、results.json の形式は変わらない。
+Record 等 to_dict() を持つオブジェクトはそのまま渡せる。
+ファイルへの書き込みは storage のロックの中で一時ファイル経由の置き換えにする。
+"""
+import json
+import os
+import shutil
+from typing import Any, List
+
+from . import storage
+
+try:
+    import orjson
+except ImportError:  # 任意依存（pip install share-cycle-monitor[fast]）
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"JSONに変換できない型: {type(obj).__name__}")
+
+
+def dumps(data: Any, indent: bool = True) -> bytes:
+    """UTF-8 の JSON バイト列に変換"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(
+        data, default=_default, ensure_ascii=False,
+        indent=2 if indent else None, separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """JSON（bytes / str）を読み込み"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_file(path: str, data: Any) -> None:
+    """JSONファイルに保存（原子的に置き換え）"""
+    with storage.locked(path):
+        storage.atomic_write(path, dumps(data))
+
+
+def load_file(path: str) -> Any:
+    """JSONファイルを読み込み"""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def prepend_to_array_file(path: str, items: List[Any]) -> bool:
+    """JSON配列のファイルの先頭に items を追加（既存部分は解析せずにコピー）
+
+    dump_file で書いた形式（"[\n" で始まる配列）でなければ何もせず False を返す。
+    """
+    if not items:
+        return True
+    with storage.locked(path):
+        if not os.path.exists(path):
+            dump_file(path, items)
+            return True
+
+        with open(path, "rb") as f:
+            start = f.read(2)
+        if start == b"[]":
+            dump_file(path, items)
+            return True
+        head = dumps(items)
+        if start != b"[\n" or not head.endswith(b"\n]"):
+            return False
+
+        with open(path, "rb") as src, storage.atomic_open(path) as dst:
+            src.seek(2)
+            dst.write(head[:-2])
+            dst.write(b",\n")
+            shutil.copyfileobj(src, dst)
+    return True
@@ -0,0 +1,245 @@
+"""クエリローテーションのオフライン試算（CSE・APIは呼ばない）
+
+query_manager.select_queries_for_run を、時刻を差し替えた（clock）模擬の実行で N 日分繰り返し、
+ポリシー（TOPICS・ACTIONS の重み、QUOTA の配分等）ごとに次を並べて表示する:
+  - クエリごとの実行頻度と、実行の間隔の最大（staleness）
+  - 取り残されるクエリ（期間中に一度も実行されない、または間隔が DATE_WINDOW の max_days を超えて
+    dateRestrict の範囲から取りこぼしが出るもの）
+  - CSE の使用回数（1日あたり。追加ページ枠を含む）と1日の上限
+  - 新規URLの期待値（query_state.json に記録された直近の実行の、検索期間1日あたりの新規件数から。
+    記録のないクエリは記録のあるクエリの平均、どれにも記録がなければ --default-rate）
+
+状態は data/query_state.json の写しを一時ファイルに置いて更新するので、実データは変わらない。
+
+    python -m share_cycle_monitor.simulate --days 28
+    python -m share_cycle_monitor.simulate --days 56 --policy a.json --policy b.json --per-query
+    python -m share_cycle_monitor.simulate --from-empty          # 実行履歴のない状態から
+
+ポリシーのJSONは query_manager が使う設定の上書き（name は表示名、省略した設定は現在の値）:
+
+    {"name": "キックボード重視", "TOPICS": [...], "QUOTA": {"allocation": {"google": 12, ...}}}
+
+QUOTA・DATE_WINDOW は1段目のキーごとに上書きする（allocation は丸ごと置き換え）。
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+from . import clock
+from . import query_manager
+from . import serialization
+from .quota import PAGE_SIZE
+
+# ポリシーで上書きできる設定（query_manager が参照するもの）
+SETTINGS = ("TOPICS", "ACTIONS", "EVENT_QUERIES", "PROCUREMENT_SITES", "QUOTA", "DATE_WINDOW")
+# 1段目のキーごとに上書きする設定
+MERGED_SETTINGS = ("QUOTA", "DATE_WINDOW")
+
+
+class Policy(NamedTuple):
+    """試算するポリシー（設定名 -> 値。含まない設定は現在の値）"""
+    name: str
+    settings: Dict[str, Any]
+
+
+def current_policy() -> Policy:
+    """現在の設定"""
+    return Policy("現在の設定", {})
+
+
+def load_policy(path: str) -> Policy:
+    """ポリシーのJSONを読み込み"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    unknown = [key for key in data if key != "name" and key not in SETTINGS]
+    if unknown:
+        raise ValueError(f"上書きできない設定です: {', '.join(unknown)}（指定可能: {', '.join(SETTINGS)}）")
+    name = data.pop("name", os.path.splitext(os.path.basename(path))[0])
+    return Policy(name, data)
+
+
+@contextlib.contextmanager
+def _applied(policy: Policy, state_file: str) -> Iterator[None]:
+    """ポリシーの設定と一時的な状態ファイルを query_manager に差し込む（終了時に元に戻す）"""
+    saved = {name: getattr(query_manager, name) for name in SETTINGS + ("QUERY_STATE_FILE",)}
+    try:
+        for name, value in policy.settings.items():
+            if name in MERGED_SETTINGS:
+                value = {**saved[name], **value}
+            setattr(query_manager, name, value)
+        query_manager.QUERY_STATE_FILE = state_file
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(query_manager, name, value)
+        clock.set_clock(None)
+
+
+def candidate_queries() -> List[str]:
+    """選ばれうる全クエリ（query_manager の現在の設定から）"""
+    sites = [f"site:{site['domain']} {t['term']}" for site in query_manager.PROCUREMENT_SITES
+             for t in query_manager.TOPICS]
+    return query_manager._generate_all_combinations() + list(query_manager.EVENT_QUERIES) + sites
+
+
+def _window_days(entry: Dict[str, Any]) -> int:
+    return int(entry["date_restrict"][1:])
+
+
+def yield_rates(state: Dict[str, Any]) -> Dict[str, float]:
+    """記録された直近の実行から、クエリごとの検索期間1日あたりの新規件数"""
+    return {
+        query: entry.get("new", 0) / _window_days(entry)
+        for query, entry in state.items()
+        if entry.get("pages") and entry.get("date_restrict")
+    }
+
+
+def simulate(policy: Policy, days: float, state: Dict[str, Any], start: datetime,
+             default_rate: float) -> Dict[str, Any]:
+    """ポリシーで days 日分の選択を繰り返した結果"""
+    rates = yield_rates(state)
+    fallback = statistics.mean(rates.values()) if rates else default_rate
+    with tempfile.TemporaryDirectory(prefix="scm-simulate-") as tmp:
+        state_file = os.path.join(tmp, "query_state.json")
+        serialization.dump_file(state_file, state)
+        with _applied(policy, state_file):
+            quota = query_manager.QUOTA
+            max_days = query_manager.DATE_WINDOW["max_days"]
+            interval = timedelta(days=1) / quota["runs_per_day"]
+            queries = candidate_queries()
+            last_run = {q: datetime.fromisoformat(state[q]["last_run"])
+                        for q in queries if state.get(q, {}).get("last_run")}
+            runs: Dict[str, List[datetime]] = {q: [] for q in queries}
+            calls: List[int] = []
+            expected = 0.0
+            end = start + timedelta(days=days)
+            now = start
+            while now < end:
+                clock.freeze(now)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    selected = query_manager.select_queries_for_run()
+                chosen = [q for qs in selected.values() for q in qs]
+                for q in chosen:
+                    elapsed = (now - last_run[q]).total_seconds() / 86400 if q in last_run else max_days
+                    # 1回目のページ（PAGE_SIZE 件）で頭打ち。検索期間は max_days まで
+                    expected += min(rates.get(q, fallback) * min(elapsed, max_days), PAGE_SIZE)
+                    last_run[q] = now
+                    runs.setdefault(q, []).append(now)
+                calls.append(len(chosen) + quota["allocation"].get("pagination", 0))
+                now += interval
+
+    per_query = {}
+    for q, times in runs.items():
+        # 間隔: 開始時点 -> 各実行 -> 終了時点（開始前の実データの間隔はポリシーの比較に含めない）
+        points = [start] + times + [end]
+        gaps = [(b - a).total_seconds() / 86400 for a, b in zip(points, points[1:])]
+        per_query[q] = {"runs": len(times), "per_day": len(times) / days, "max_gap_days": max(gaps)}
+    starved = [q for q, r in per_query.items() if r["runs"] == 0 or r["max_gap_days"] > max_days]
+    gaps = [r["max_gap_days"] for r in per_query.values()]
+    runs_per_day = quota["runs_per_day"]
+    return {
+        "policy": policy.name,
+        "queries": len(per_query),
+        "ran": sum(1 for r in per_query.values() if r["runs"]),
+        "starved": starved,
+        "median_gap_days": statistics.median(gaps) if gaps else 0.0,
+        "max_gap_days": max(gaps) if gaps else 0.0,
+        "calls_per_day": sum(calls) / days,
+        "peak_calls_per_day": max(calls, default=0) * runs_per_day,
+        "daily_limit": quota["daily_limit"],
+        "expected_new": expected,
+        "rate_source": "記録" if rates else f"仮定 {default_rate}件/日",
+        "per_query": per_query,
+    }
+
+
+def _width(text: str) -> int:
+    """表示幅（全角は2）"""
+    return sum(2 if unicodedata.east_asian_width(ch) in "WF" else 1 for ch in text)
+
+
+def _ljust(text: str, width: int) -> str:
+    return text + " " * max(0, width - _width(text))
+
+
+def _rjust(text: str, width: int) -> str:
+    return " " * max(0, width - _width(text)) + text
+
+
+def _row(label: str, values: List[str], width: int) -> str:
+    return "  " + _ljust(label, 24) + "".join(_rjust(value, width) for value in values)
+
+
+def print_report(results: List[Dict[str, Any]], days: float, per_query: bool, top: int) -> None:
+    """ポリシーごとの結果を並べて表示"""
+    width = max(26, *(_width(r["policy"]) + 18 for r in results))
+    print(f"=== クエリローテーション試算: {days:g}日間 ===")
+    print(_row("", [r["policy"] for r in results], width))
+    print(_row("候補クエリ", [f"{r['queries']}件" for r in results], width))
+    print(_row("実行されたクエリ", [f"{r['ran']}件" for r in results], width))
+    print(_row("取り残されたクエリ", [f"{len(r['starved'])}件" for r in results], width))
+    print(_row("最大間隔（中央値）", [f"{r['median_gap_days']:.1f}日" for r in results], width))
+    print(_row("最大間隔（最悪）", [f"{r['max_gap_days']:.1f}日" for r in results], width))
+    print(_row("CSE使用 / 日", [f"{r['calls_per_day']:.1f}回" for r in results], width))
+    print(_row("CSE使用 / 日（上限）", [f"{r['peak_calls_per_day']} / {r['daily_limit']}" for r in results], width))
+    print(_row("新規URLの期待値", [f"{r['expected_new']:.1f}件" for r in results], width))
+    print(_row("（1日あたり）", [f"{r['expected_new'] / days:.2f}件" for r in results], width))
+    print(_row("期待値の根拠", [r["rate_source"] for r in results], width))
+    for r in results:
+        if r["peak_calls_per_day"] > r["daily_limit"]:
+            print(f"  警告: {r['policy']} は1日の上限（{r['daily_limit']}回）を超えます")
+
+    queries = sorted({q for r in results for q in r["per_query"]},
+                     key=lambda q: max(r["per_query"].get(q, {"max_gap_days": days})["max_gap_days"] for r in results),
+                     reverse=True)
+    if not per_query:
+        queries = queries[:top]
+        print(f"\n--- 間隔の長いクエリ（上位{top}件。全件は --per-query） ---")
+    else:
+        print("\n--- クエリごと ---")
+    label_width = max(_width(q) for q in queries) + 2 if queries else 24
+    print("  " + _ljust("クエリ", label_width) + "".join(_rjust(f"{r['policy']} 回/日・最大間隔", width) for r in results))
+    for q in queries:
+        cells = []
+        for r in results:
+            entry = r["per_query"].get(q)
+            if entry is None:
+                cells.append(_rjust("（候補外）", width))
+            else:
+                mark = " *" if q in r["starved"] else "  "
+                cells.append(_rjust(f"{entry['per_day']:.2f}  {entry['max_gap_days']:5.1f}日{mark}", width))
+        print("  " + _ljust(q, label_width) + "".join(cells))
+    print("  （* は取り残されたクエリ）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="クエリローテーションのオフライン試算（APIは呼ばない）")
+    parser.add_argument("--days", type=float, default=28, help="試算する日数")
+    parser.add_argument("--policy", action="append", default=[], metavar="JSON",
+                        help="比較するポリシー（複数指定可。現在の設定は常に先頭に表示）")
+    parser.add_argument("--from-empty", action="store_true", help="実行履歴のない状態から試算")
+    parser.add_argument("--default-rate", type=float, default=0.1,
+                        help="新規件数の記録がない場合に仮定する、検索期間1日あたりの新規件数")
+    parser.add_argument("--per-query", action="store_true", help="全クエリの頻度・最大間隔を表示")
+    parser.add_argument("--top", type=int, default=20, help="間隔の長いクエリを表示する件数")
+    parser.add_argument("--json", metavar="PATH", help="結果をJSONで保存")
+    args = parser.parse_args()
+
+    state: Dict[str, Any] = {}
+    if not args.from_empty and os.path.exists(query_manager.QUERY_STATE_FILE):
+        state = serialization.load_file(query_manager.QUERY_STATE_FILE)
+    start = clock.now().replace(minute=0, second=0, microsecond=0)
+    policies = [current_policy()] + [load_policy(path) for path in args.policy]
+    results = [simulate(policy, args.days, state, start, args.default_rate) for policy in policies]
+    print_report(results, args.days, args.per_query, args.top)
+    if args.json:
+        serialization.dump_file(args.json, results)
+        print(f"\n結果を保存: {args.json}")
@@ -0,0 +1,257 @@
+"""直接監視ページのスナップショットと前回との差分
+
+取得したページの本文（parsing で正規化した行）とリンクを、内容のハッシュを名前にして
+data/snapshots/objects/ に gzip で保存する（同じ内容は1つだけ）。data/snapshots/index.json には
+URL ごとに現在の版と過去の版のハッシュを残す。index.json は、検出した変更を結果に保存した後に保存する
+（記録するのは取得時、保存は main・daemon・workers.merge が結果を保存した後）。
+
+取得のたびに前回の版と比べ、追加・削除された行とリンクを Change にまとめる。
+数字だけが変わった行（更新日・アクセス数・日付入りのフッター等）は変更に数えないので、
+Change.meaningful が真になるのは新しい行かリンクが追加されたときだけ。
+
+    python -m share_cycle_monitor.snapshots                  # 保存済みの版の数と容量
+    python -m share_cycle_monitor.snapshots --diff URL       # URL の直近2つの版の差分
+    python -m share_cycle_monitor.snapshots --gc             # どの URL からも参照されない版を削除
+"""
+import argparse
+import difflib
+import gzip
+import hashlib
+import os
+import re
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urldefrag, urljoin
+
+from .config import SNAPSHOT_DIR, SNAPSHOTS
+from . import clock
+from . import serialization
+from . import storage
+from .parsing import ParsedPage
+
+_DIGITS = re.compile(r"\d+")
+
+
+class Change(NamedTuple):
+    """前回の版からの差分"""
+    added_lines: Tuple[str, ...]
+    removed_lines: Tuple[str, ...]
+    added_links: Tuple[Tuple[str, str], ...]
+    removed_links: Tuple[Tuple[str, str], ...]
+    ignored_lines: int  # 数字だけが変わったため数えなかった追加行
+
+    @property
+    def meaningful(self) -> bool:
+        """通知に回すべき変更か（行かリンクの追加）"""
+        return bool(self.added_lines or self.added_links)
+
+    @property
+    def added_text(self) -> str:
+        """追加された行とリンク文字列（キーワードの照合用）"""
+        return "\n".join(self.added_lines + tuple(text for _, text in self.added_links))
+
+
+def make(parsed: ParsedPage, url: str) -> Dict[str, Any]:
+    """解析結果からスナップショット（本文の行と、絶対URLにしたリンク）を作る"""
+    links, hrefs = [], set()
+    for href, text in parsed.links:
+        href = urldefrag(urljoin(url, href))[0]
+        if href not in hrefs:
+            hrefs.add(href)
+            links.append([href, text])
+    return {"lines": list(parsed.lines), "links": links}
+
+
+def content_hash(snapshot: Dict[str, Any]) -> str:
+    """スナップショットの内容のハッシュ（保存名）"""
+    return hashlib.sha256(serialization.dumps(snapshot, indent=False)).hexdigest()
+
+
+def diff(old: Dict[str, Any], new: Dict[str, Any]) -> Change:
+    """2つの版の差分（行は順序を考慮、リンクは href の有無で比べる）"""
+    added, removed = [], []
+    matcher = difflib.SequenceMatcher(None, old["lines"], new["lines"], autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != "equal":
+            removed.extend(old["lines"][i1:i2])
+            added.extend(new["lines"][j1:j2])
+    # 数字を伏せると削除行と同じになる追加行は、日付・件数の更新とみなす
+    removed_shapes = {_DIGITS.sub("#", line) for line in removed}
+    significant = [line for line in added if _DIGITS.sub("#", line) not in removed_shapes]
+
+    old_hrefs = {href for href, _ in old["links"]}
+    new_hrefs = {href for href, _ in new["links"]}
+    return Change(
+        added_lines=tuple(significant),
+        removed_lines=tuple(removed),
+        added_links=tuple((href, text) for href, text in new["links"] if href not in old_hrefs),
+        removed_links=tuple((href, text) for href, text in old["links"] if href not in new_hrefs),
+        ignored_lines=len(added) - len(significant),
+    )
+
+
+class SnapshotStore:
+    """スナップショットの保存先（スレッドセーフ。save するまでファイルには書かない）"""
+
+    def __init__(self, directory: str, settings: Dict[str, Any]):
+        self.directory = directory
+        self.settings = settings
+        self.index_path = os.path.join(directory, "index.json")
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._objects: Dict[str, bytes] = {}  # 未保存の版（ハッシュ -> 圧縮済みの内容）
+        self._lock = threading.Lock()
+        self.touched = set()  # 保存前に記録したURL
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], f"{digest}.json.gz")
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        return serialization.load_file(self.index_path) if os.path.exists(self.index_path) else {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._index is None:
+            self._index = self._read()
+        return self._index
+
+    def load(self, digest: str) -> Dict[str, Any]:
+        """ハッシュの版を読み込み"""
+        data = self._objects.get(digest)
+        if data is None:
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+        return serialization.loads(gzip.decompress(data))
+
+    def entry(self, url: str) -> Optional[Dict[str, Any]]:
+        """URLの版の記録（未取得ならNone）"""
+        with self._lock:
+            entry = self._load().get(url)
+            return dict(entry) if entry else None
+
+    def pages(self) -> int:
+        """版を記録しているURLの数"""
+        with self._lock:
+            return len(self._load())
+
+    def record(self, url: str, snapshot: Dict[str, Any]) -> Optional[Change]:
+        """今回の版を記録し、前回の版との差分を返す（初回はNone）"""
+        digest = content_hash(snapshot)
+        now = clock.now().isoformat()
+        with self._lock:
+            entry = self._load().get(url)
+            if entry is not None and entry["hash"] == digest:
+                entry["checked_at"] = now
+                self.touched.add(url)
+                return Change((), (), (), (), 0)
+            if digest not in self._objects and not os.path.exists(self._object_path(digest)):
+                self._objects[digest] = gzip.compress(serialization.dumps(snapshot, indent=False), mtime=0)
+            history = [digest] + (entry["history"] if entry else [])
+            self._index[url] = {
+                "hash": digest,
+                "history": history[:self.settings["history"]],
+                "checked_at": now,
+                "changed_at": now,
+            }
+            self.touched.add(url)
+            previous = entry["hash"] if entry else None
+        if previous is None:
+            return None
+        try:
+            return diff(self.load(previous), snapshot)
+        except FileNotFoundError:  # 前回の版が削除されていれば初回と同じ扱い
+            return None
+
+    def _save_objects(self) -> None:
+        # 版は内容のハッシュ名なので先に保存してよい（どの URL からも参照されなければ gc で消える）
+        for digest, data in self._objects.items():
+            storage.atomic_write(self._object_path(digest), data)
+        self._objects = {}
+
+    def pending(self) -> Dict[str, Dict[str, Any]]:
+        """保存前に記録したURLの版の記録を受け渡す（新しい版はここで保存し、記録は save の対象から外す）
+
+        並行ワーカーの部分結果や常駐モードのチェックポイントで、結果を保存した後に save(entries) で保存する。
+        """
+        with self._lock:
+            self._save_objects()
+            entries = {url: dict(self._index[url]) for url in sorted(self.touched)}
+            self.touched = set()
+            return entries
+
+    def save(self, entries: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """新しい版と、このプロセスで記録したURLの版の記録を保存
+
+        entries（pending で受け渡した記録）を渡すと、このプロセスで記録した分の代わりにそれを保存する。
+        直接監視の結果を保存した後に呼ぶ（先に保存すると、結果の保存に失敗した変更を次回検出できない）。
+        """
+        with self._lock:
+            self._save_objects()
+            current = self._load()
+            if entries is None:
+                entries = {url: current[url] for url in self.touched}
+                self.touched = set()
+            if not entries:
+                return
+            with storage.locked(self.index_path):
+                index = self._read()
+                index.update(entries)
+                serialization.dump_file(self.index_path, index)
+            # まだ保存していない記録（取得中の分）はメモリ上に残す
+            index.update({url: current[url] for url in self.touched})
+            self._index = index
+
+    def gc(self) -> int:
+        """どのURLの履歴にもない版を削除し、削除した数を返す"""
+        with storage.locked(self.index_path):
+            referenced = {digest for entry in self._read().values() for digest in entry["history"]}
+            removed = 0
+            for path in self.object_paths():
+                if os.path.basename(path).split(".")[0] not in referenced:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+    def object_paths(self) -> List[str]:
+        """保存済みの版のファイル"""
+        root = os.path.join(self.directory, "objects")
+        if not os.path.isdir(root):
+            return []
+        return [os.path.join(root, prefix, name) for prefix in sorted(os.listdir(root))
+                for name in sorted(os.listdir(os.path.join(root, prefix)))]
+
+
+store = SnapshotStore(SNAPSHOT_DIR, SNAPSHOTS)
+
+
+def print_change(change: Change) -> None:
+    """差分を表示"""
+    for line in change.added_lines:
+        print(f"  + {line}")
+    for line in change.removed_lines:
+        print(f"  - {line}")
+    for href, text in change.added_links:
+        print(f"  + [リンク] {text} <{href}>")
+    for href, text in change.removed_links:
+        print(f"  - [リンク] {text} <{href}>")
+    if change.ignored_lines:
+        print(f"  （数字だけの変更 {change.ignored_lines}行は除外）")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="直接監視ページのスナップショット")
+    parser.add_argument("--diff", metavar="URL", help="URL の直近2つの版の差分を表示")
+    parser.add_argument("--gc", action="store_true", help="どの URL の履歴にもない版を削除")
+    args = parser.parse_args()
+
+    if args.diff:
+        entry = store.entry(args.diff)
+        if entry is None or len(entry["history"]) < 2:
+            print(f"比較できる版がありません: {args.diff}")
+        else:
+            print(f"{args.diff}（最終変更 {entry['changed_at'][:16]}）")
+            print_change(diff(store.load(entry["history"][1]), store.load(entry["history"][0])))
+    elif args.gc:
+        print(f"削除した版: {store.gc()}件")
+    else:
+        paths = store.object_paths()
+        size = sum(os.path.getsize(path) for path in paths)
+        print(f"スナップショット: {store.pages()}ページ / {len(paths)}版 / {size / 1024:.1f} KiB ({SNAPSHOT_DIR})")
@@ -0,0 +1,174 @@
+"""蓄積結果の集計（data/stats.json）
+
+ダッシュボードが results.json の全件を走査しなくてよいように、件数・最終取得日時と
+都道府県・ソース・月（更新日の年月）・発注機関ごとの件数を保存する。
+24時間以内の新着数は、取得日時の1時間ごとの件数（直近 HOURLY_RETENTION 時間分）から求める。
+
+結果を追加・削除するたびに add / remove で差分だけを反映する（全件を読み直さない）。
+results.json を丸ごと書き換える処理（重複排除・地域の付与等）の後は rebuild で作り直す。
+
+    python -m share_cycle_monitor.stats --check     # results.json から集計し直した値と比較（不一致なら終了コード1）
+    python -m share_cycle_monitor.stats --rebuild   # results.json から作り直して保存
+"""
+import argparse
+import os
+import re
+import sys
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from .config import RESULTS_FILE, STATS_FILE
+from . import clock
+from . import serialization
+from . import storage
+
+# 1時間ごとの取得件数を残す時間数（24時間以内の新着数に使う）
+HOURLY_RETENTION = 48
+UNKNOWN = "不明"
+_MONTH = re.compile(r"(\d{4})[-/年](\d{1,2})")
+
+
+def _month(record: Mapping[str, Any]) -> str:
+    """更新日の年月（YYYY-MM。2026-2-5 のような表記もそろえる）"""
+    match = _MONTH.match(record.get("update_date") or "")
+    return f"{match.group(1)}-{int(match.group(2)):02d}" if match else UNKNOWN
+
+
+# 件数を数える項目: stats.json のキー -> レコードから集計キーを取り出す関数
+COUNTERS = {
+    "by_prefecture": lambda record: record.get("prefecture") or UNKNOWN,
+    "by_source": lambda record: record.get("source") or UNKNOWN,
+    "by_month": _month,
+    "by_organization": lambda record: record.get("organization") or UNKNOWN,
+}
+
+
+def empty() -> Dict[str, Any]:
+    """結果0件の集計"""
+    stats: Dict[str, Any] = {"total": 0, "last_fetched_at": None}
+    stats.update({name: {} for name in COUNTERS})
+    stats["fetched_by_hour"] = {}
+    return stats
+
+
+def _apply(stats: Dict[str, Any], records: Iterable[Mapping[str, Any]], sign: int, now: datetime) -> Dict[str, Any]:
+    oldest_hour = (now - timedelta(hours=HOURLY_RETENTION)).isoformat()[:13]
+    counters = {name: Counter(stats[name]) for name in COUNTERS}
+    hours = Counter(stats["fetched_by_hour"])
+    for record in records:
+        stats["total"] += sign
+        for name, key in COUNTERS.items():
+            counters[name][key(record)] += sign
+        fetched_at = record.get("fetched_at") or ""
+        if fetched_at[:13] >= oldest_hour:
+            hours[fetched_at[:13]] += sign
+        if sign > 0 and fetched_at > (stats["last_fetched_at"] or ""):
+            stats["last_fetched_at"] = fetched_at
+    # 0件になったキーと保持期間を過ぎた時間は落とす。キーは件数の多い順（月は新しい順で、不明は最後）
+    for name, counter in counters.items():
+        items = [(key, count) for key, count in counter.items() if count > 0]
+        if name == "by_month":
+            items.sort(key=lambda item: (item[0] != UNKNOWN, item[0]), reverse=True)
+        else:
+            items.sort(key=lambda item: (-item[1], item[0]))
+        stats[name] = dict(items)
+    stats["fetched_by_hour"] = {hour: count for hour, count in sorted(hours.items())
+                                if count > 0 and hour >= oldest_hour}
+    stats["updated_at"] = now.isoformat()
+    return stats
+
+
+def add(stats: Dict[str, Any], records: Iterable[Mapping[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """追加した結果を集計に反映"""
+    return _apply(stats, records, 1, now or clock.now())
+
+
+def remove(stats: Dict[str, Any], records: Iterable[Mapping[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """削除した結果を集計から除く（最終取得日時はそのまま）"""
+    return _apply(stats, records, -1, now or clock.now())
+
+
+def build(records: Iterable[Mapping[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """結果全件から集計"""
+    return add(empty(), records, now)
+
+
+def _read_results() -> List[Dict[str, Any]]:
+    data = serialization.load_file(RESULTS_FILE) if os.path.exists(RESULTS_FILE) else []
+    return data if isinstance(data, list) else []
+
+
+def load() -> Optional[Dict[str, Any]]:
+    """保存済みの集計（なければNone）"""
+    return serialization.load_file(STATS_FILE) if os.path.exists(STATS_FILE) else None
+
+
+def record_added(records: List[Mapping[str, Any]]) -> None:
+    """results.json に追加した結果を stats.json に反映（stats.json がなければ results.json から作る）"""
+    if not records:
+        return
+    storage.update_json(STATS_FILE, lambda stats: add(stats, records) if stats else build(_read_results()))
+
+
+def record_removed(records: List[Mapping[str, Any]]) -> None:
+    """results.json から削除した結果を stats.json から除く"""
+    if not records:
+        return
+    storage.update_json(STATS_FILE, lambda stats: remove(stats, records) if stats else build(_read_results()))
+
+
+def rebuild() -> Dict[str, Any]:
+    """results.json から集計し直して保存"""
+    with storage.locked(STATS_FILE):
+        stats = build(_read_results())
+        serialization.dump_file(STATS_FILE, stats)
+    return stats
+
+
+def check() -> List[str]:
+    """保存済みの集計と results.json から集計し直した値の違い（一致すれば空）"""
+    stored = load()
+    if stored is None:
+        return [f"{STATS_FILE} がありません"]
+    now = clock.now()
+    expected = build(_read_results(), now)
+    # 保存時より後に保持期間を過ぎた時間を、保存済みの側からも落としてから比べる
+    stored = remove(stored, [], now)
+    problems = []
+    for key in ("total", "last_fetched_at", "fetched_by_hour", *COUNTERS):
+        if stored.get(key) == expected[key]:
+            continue
+        if isinstance(expected[key], dict):
+            keys = sorted(set(stored.get(key) or {}) | set(expected[key]))
+            diffs = [f"{k}: {(stored.get(key) or {}).get(k, 0)} -> {expected[key].get(k, 0)}"
+                     for k in keys if (stored.get(key) or {}).get(k, 0) != expected[key].get(k, 0)]
+            problems.append(f"{key}: " + ", ".join(diffs[:5]) + (f" 他{len(diffs) - 5}件" if len(diffs) > 5 else ""))
+        else:
+            problems.append(f"{key}: {stored.get(key)} -> {expected[key]}")
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="蓄積結果の集計（data/stats.json）")
+    parser.add_argument("--check", action="store_true", help="results.json から集計し直した値と比較")
+    parser.add_argument("--rebuild", action="store_true", help="results.json から作り直して保存")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        stats = rebuild()
+        print(f"集計を作り直しました: {stats['total']}件 ({STATS_FILE})")
+    elif args.check:
+        problems = check()
+        if problems:
+            print("集計が results.json と一致しません（--rebuild で作り直せます）:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("集計は results.json と一致しています")
+    else:
+        stats = load() or build(_read_results())
+        print(f"全 {stats['total']}件 / 最終取得 {stats['last_fetched_at'] or '-'}")
+        for name in COUNTERS:
+            top = list(stats[name].items())[:5]
+            print(f"  {name}: " + ", ".join(f"{key} {count}" for key, count in top))
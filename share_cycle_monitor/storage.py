@@ -0,0 +1,95 @@
+"""data/ の状態ファイルの原子的な書き込みとファイルロック
+
+- atomic_open / atomic_write: 同じディレクトリの一時ファイルに書いて fsync し、os.replace で置き換える
+  （読む側が途中まで書かれたファイルを見ることはなく、書き込み中に止まっても元のファイルが残る）。
+  パーミッションは元のファイルのもの（新規なら通常のファイル作成と同じ 0o666 & ~umask）にそろえる
+- locked: <ファイル名>.lock への flock。読み込み -> 更新 -> 書き込みをこの中で行えば、並行する
+  他のプロセス（並行ワーカー・常駐モード・単発実行）の更新を上書きしない。
+  同一プロセス内ではスレッド間で排他し、同じスレッドからは入れ子にできる。fcntl のない環境ではプロセス間はロックしない。
+- update_json: locked の中で JSON を読み込み、関数で更新して書き戻す
+"""
+import contextlib
+import os
+import tempfile
+import threading
+from typing import IO, Any, Callable, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# umask は読むと変わってしまうので、起動時に1回だけ読む（スレッドから読むと他のファイル作成に影響する）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_guard = threading.Lock()
+_locks: Dict[str, threading.RLock] = {}
+_held: Dict[str, Any] = {}  # パス -> [入れ子の深さ, ロックファイル]（そのパスの RLock を持つスレッドだけが触る）
+
+
+@contextlib.contextmanager
+def locked(path: str) -> Iterator[None]:
+    """path の排他ロック（プロセス間・スレッド間）"""
+    key = os.path.abspath(path)
+    with _guard:
+        rlock = _locks.setdefault(key, threading.RLock())
+    with rlock:
+        held = _held.get(key)
+        if held is None:
+            os.makedirs(os.path.dirname(key), exist_ok=True)
+            lock_file = open(f"{key}.lock", "a")
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            held = _held[key] = [0, lock_file]
+        held[0] += 1
+        try:
+            yield
+        finally:
+            held[0] -= 1
+            if held[0] == 0:
+                del _held[key]
+                if fcntl is not None:
+                    fcntl.flock(held[1].fileno(), fcntl.LOCK_UN)
+                held[1].close()
+
+
+@contextlib.contextmanager
+def atomic_open(path: str) -> Iterator[IO[bytes]]:
+    """書き込み用の一時ファイルを開き、with を正常に抜けたら path と置き換える"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+            if hasattr(os, "fchmod"):  # mkstemp は 0o600 で作るので、置き換える前にそろえる
+                try:
+                    mode = os.stat(path).st_mode & 0o7777
+                except FileNotFoundError:
+                    mode = 0o666 & ~_UMASK
+                os.fchmod(f.fileno(), mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """path をバイト列で原子的に置き換え"""
+    with atomic_open(path) as f:
+        f.write(data)
+
+
+def update_json(path: str, update: Callable[[Any], Any], default: Any = None) -> Any:
+    """ロックした上で JSON を読み込み（なければ default）、update の戻り値を書き戻して返す"""
+    from . import serialization
+
+    with locked(path):
+        current = serialization.load_file(path) if os.path.exists(path) else default
+        updated = update(current)
+        serialization.dump_file(path, updated)
+    return updated
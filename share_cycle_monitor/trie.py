@@ -0,0 +1,75 @@
+"""最長一致の文字トライ
+
+各位置からトライを辿り、最も長く一致したキーを採用して次はその直後から探す
+（左から順に重ならない最長一致）。1位置あたりの比較はキーの最大長までなので、
+キーの数によらずテキスト長に比例した時間で1回走査できる。
+
+    trie = Trie()
+    trie.add("東京都", "tokyo")
+    trie.scan("東京都千代田区")  # [(0, 3, "tokyo")]
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# ノードは dict（文字 -> 子ノード）。キーの終端では _VALUE に値を持つ（文字は1文字なので衝突しない）
+_VALUE = ""
+
+
+class Trie:
+    """文字列キー -> 値 の最長一致トライ"""
+
+    def __init__(self, items: Iterable[Tuple[str, Any]] = ()):
+        self.root: Dict[str, Any] = {}
+        self.size = 0
+        for key, value in items:
+            self.add(key, value)
+
+    def add(self, key: str, value: Any) -> None:
+        """キーを追加（既存のキーなら値を上書き）"""
+        if not key:
+            raise ValueError("空のキーは追加できません")
+        node = self.root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        if _VALUE not in node:
+            self.size += 1
+        node[_VALUE] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """完全一致で値を取得"""
+        node = self.root
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return default
+        return node.get(_VALUE, default)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def longest_match(self, text: str, start: int = 0) -> Optional[Tuple[int, Any]]:
+        """text[start:] の先頭で最長一致するキーの (終了位置, 値)。なければNone"""
+        node = self.root
+        found = None
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if _VALUE in node:
+                found = (i + 1, node[_VALUE])
+        return found
+
+    def scan(self, text: str) -> List[Tuple[int, int, Any]]:
+        """text 中の重ならない最長一致を左から順に (開始, 終了, 値) で返す"""
+        matches = []
+        root = self.root
+        i = 0
+        n = len(text)
+        while i < n:
+            if text[i] in root:
+                match = self.longest_match(text, i)
+                if match is not None:
+                    matches.append((i, match[0], match[1]))
+                    i = match[0]
+                    continue
+            i += 1
+        return matches
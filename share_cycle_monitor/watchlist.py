@@ -0,0 +1,166 @@
+"""直接監視ページの一覧（resources/watch_pages.csv）とシャード巡回
+
+一覧の列: url, prefecture, organization, priority（high / normal）, keywords（COMMON_KEYWORDS に追加する語を | 区切り）, note
+prefecture / organization が空の行は、市区町村辞書（gazetteer）でホスト名から補う。
+
+巡回: priority=high のページは毎回。それ以外は URL の SHA-1 で shards 個のシャードに分け
+（一覧にページを追加・削除しても他のページのシャードは変わらない）、data/watch_state.json の
+カーソルが指すシャードを巡回する。カーソルは実行が最後まで終わったときだけ進むので、
+途中で止まった回のシャードは次回やり直す。シャード数は WATCH_LIST["revisit_hours"] の間の実行回数で、
+全ページがその時間内に1回は巡回される。カーソルはシャード数ごとに持つので、シャード数の違う
+常駐モードと cron の実行が同じ状態ファイルを使っても互いのカーソルを戻さない。
+
+    python -m share_cycle_monitor.watchlist   # シャードごとの件数と最終巡回日時
+"""
+import argparse
+import csv
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import DAEMON_JOBS, WATCH_LIST, WATCH_STATE_FILE
+from . import clock
+from . import gazetteer
+from . import serialization
+from . import storage
+
+WATCH_PAGES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "watch_pages.csv")
+
+# 共通キーワード
+COMMON_KEYWORDS = [
+    "シェアサイクル", "電動キックボード", "特定小型原動機付自転車", "特定小型原付",
+    "マイクロモビリティ", "公募", "募集", "事業者", "プロポーザル",
+    "自転車シェアリング", "コミュニティサイクル", "サイクルポート",
+]
+
+PRIORITIES = ("high", "normal")
+
+# 常駐モードの直接監視ジョブの1日あたり実行回数
+DAEMON_RUNS_PER_DAY = 24 * 60 / DAEMON_JOBS["direct"]["interval_minutes"]
+
+
+def load(path: str = WATCH_PAGES_FILE) -> List[Dict[str, Any]]:
+    """監視ページの一覧を読み込み"""
+    pages = []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            url = row["url"].strip()
+            priority = row.get("priority") or "normal"
+            if priority not in PRIORITIES:
+                raise ValueError(f"不明な優先度: {priority} ({url})")
+            extra = [k for k in (row.get("keywords") or "").split("|") if k and k not in COMMON_KEYWORDS]
+            page = {
+                "url": url,
+                "prefecture": row.get("prefecture") or "",
+                "organization": row.get("organization") or "",
+                "priority": priority,
+                "keywords": COMMON_KEYWORDS + extra,
+            }
+            if not page["prefecture"] or not page["organization"]:
+                place = gazetteer.get().lookup_host(url)
+                if place is not None:
+                    page["prefecture"] = page["prefecture"] or place.prefecture
+                    page["organization"] = page["organization"] or place.municipality
+            pages.append(page)
+    return pages
+
+
+def shard_of(url: str, shards: int) -> int:
+    """URLのシャード番号（実行・環境によらず同じ値）"""
+    return int.from_bytes(hashlib.sha1(url.encode("utf-8")).digest()[:4], "big") % shards
+
+
+def shard_count(runs_per_day: Optional[float] = None) -> int:
+    """revisit_hours の間に全シャードを1巡できるシャード数"""
+    runs = runs_per_day or WATCH_LIST["runs_per_day"]
+    return max(1, int(runs * WATCH_LIST["revisit_hours"] / 24))
+
+
+class Rotation:
+    """シャード数ごとの巡回カーソルとシャードごとの最終巡回日時（スレッドセーフ）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._state: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        state = serialization.load_file(self.path)
+        if "shards" in state:
+            # シャード数ごとに分ける前の形式（カーソル1つだけ）
+            return {str(state["shards"]): {"cursor": state["cursor"], "last_crawled": state["last_crawled"]}}
+        return state
+
+    def _load(self, shards: int) -> Dict[str, Any]:
+        if self._state is None:
+            self._state = self._read()
+        # シャード数が変わると割り当てが変わるので、そのシャード数では最初の1巡から始める
+        return self._state.setdefault(str(shards), {"cursor": 0, "last_crawled": {}})
+
+    def next_shard(self, shards: int) -> int:
+        """今回巡回するシャード"""
+        with self._lock:
+            return self._load(shards)["cursor"] % shards
+
+    def complete(self, shard: int, shards: int) -> None:
+        """シャードの巡回完了を記録し、カーソルを次へ進めて保存"""
+        with self._lock:
+            state = self._load(shards)
+            state["last_crawled"][str(shard)] = clock.now().isoformat()
+            state["cursor"] = (shard + 1) % shards
+            # 他のシャード数の分は他のプロセスが保存したものを残す
+            with storage.locked(self.path):
+                saved = self._read()
+                saved[str(shards)] = state
+                serialization.dump_file(self.path, saved)
+
+    def last_crawled(self, shards: int) -> Dict[int, Optional[datetime]]:
+        """シャードごとの最終巡回日時（未巡回はNone）"""
+        with self._lock:
+            crawled = self._load(shards)["last_crawled"]
+        return {
+            shard: datetime.fromisoformat(crawled[str(shard)]) if str(shard) in crawled else None
+            for shard in range(shards)
+        }
+
+    def overdue(self, shards: int) -> List[int]:
+        """revisit_hours 以上巡回していないシャード"""
+        limit = clock.now() - timedelta(hours=WATCH_LIST["revisit_hours"])
+        return [shard for shard, at in self.last_crawled(shards).items() if at is None or at < limit]
+
+
+rotation = Rotation(WATCH_STATE_FILE)
+
+
+def select_for_run(pages: List[Dict[str, Any]], runs_per_day: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+    """今回巡回するページ（優先ページ + カーソルのシャード）と (シャード番号, シャード数)"""
+    shards = shard_count(runs_per_day)
+    shard = rotation.next_shard(shards)
+    high = [page for page in pages if page["priority"] == "high"]
+    rotating = [page for page in pages if page["priority"] != "high" and shard_of(page["url"], shards) == shard]
+    print(f"直接監視: 優先{len(high)}件 + シャード{shard + 1}/{shards} {len(rotating)}件（全{len(pages)}件）")
+    return high + rotating, shard, shards
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="直接監視ページのシャード巡回状況")
+    parser.add_argument("--runs-per-day", type=float, help="1日の実行回数（既定: WATCH_LIST の値）")
+    args = parser.parse_args()
+
+    pages = load()
+    shards = shard_count(args.runs_per_day)
+    sizes = [0] * shards
+    for page in pages:
+        if page["priority"] != "high":
+            sizes[shard_of(page["url"], shards)] += 1
+    next_shard = rotation.next_shard(shards)
+    overdue = set(rotation.overdue(shards))
+    print(f"監視ページ: {len(pages)}件（優先 {sum(1 for p in pages if p['priority'] == 'high')}件）/ "
+          f"シャード数 {shards}（{WATCH_LIST['revisit_hours']}時間で1巡）")
+    for shard, at in rotation.last_crawled(shards).items():
+        marks = ("← 次回" if shard == next_shard else "") + (" 期限超過" if shard in overdue else "")
+        print(f"  シャード{shard + 1}: {sizes[shard]}件 / 最終巡回 {at.isoformat()[:16] if at else '-'} {marks}")
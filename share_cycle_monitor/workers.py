@@ -0,0 +1,203 @@
+"""並行ワーカーでの分担実行と、部分結果の統合
+
+1回の実行を N 個のワーカー（Actions の並列ジョブ・ローカルのプロセス）で分担する:
+
+    python -m share_cycle_monitor --worker 1/3 --run-id 42   # 担当分を取得し data/partials/42/worker-1.json に保存
+    python -m share_cycle_monitor --worker 2/3 --run-id 42
+    python -m share_cycle_monitor --worker 3/3 --run-id 42
+    python -m share_cycle_monitor --merge --run-id 42        # 部分結果を統合して data/ に反映し、通知
+
+分担: CSE のクエリと直接監視のページはそれぞれのハッシュで、分割できないソース（kkj）はソース名の
+ハッシュで1つのワーカーに割り当てる。クエリ選択と巡回シャードは、全ワーカーが同じ状態ファイルから
+同じ時刻（1時間単位に切り捨て）で決めるので一致する。ワーカーは結果・既出URL・クエリ状態・
+CSE使用回数・巡回カーソル・直接監視のスナップショットの記録を data/ に書かず、部分結果のファイルにだけ書き出す
+（スナップショットの版そのものは内容のハッシュ名なので data/snapshots/objects/ に保存し、記録は統合で結果を
+保存した後に保存する。統合前に止まっても、次回また同じ変更を検出する）。
+
+統合はワーカー番号順に行い、結果は URL で重複排除（番号の小さいワーカー・先に取得した順を優先、
+既出URLは除外）、既出URLは和集合、クエリ状態は last_run の新しい方、CSE使用回数は合算、
+ページのヘルス状態・スナップショットの記録は各ワーカーの更新分を取り込む。全ワーカーの部分結果が揃うまでは統合しない。
+巡回カーソルは、全ワーカーが担当ページを締め切り内に取得し終えた場合だけ進める。
+"""
+import os
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .config import PARTIALS_DIR
+from . import clock
+from . import serialization
+from . import watchlist
+from .records import from_dicts
+
+
+def default_run_id() -> str:
+    """--run-id 未指定時の実行ID（1時間単位。同じ時間帯に起動したワーカーは同じID）"""
+    return clock.now().strftime("%Y%m%d%H")
+
+
+def partial_dir(run_id: str) -> str:
+    """実行IDごとの部分結果のディレクトリ"""
+    return os.path.join(PARTIALS_DIR, run_id)
+
+
+class Worker:
+    """並行ワーカー1つ分の担当範囲と、部分結果に書き出す状態"""
+
+    def __init__(self, index: int, count: int, run_id: Optional[str] = None):
+        if not 0 <= index < count:
+            raise ValueError(f"ワーカー番号が範囲外です: {index + 1}/{count}")
+        self.index = index
+        self.count = count
+        self.run_id = run_id or default_run_id()
+        self.planned_at: datetime = clock.now().replace(minute=0, second=0, microsecond=0)
+        self.queries: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def label(self) -> str:
+        return f"{self.index + 1}/{self.count}"
+
+    @property
+    def path(self) -> str:
+        return os.path.join(partial_dir(self.run_id), f"worker-{self.index + 1}.json")
+
+    def owns(self, key: str) -> bool:
+        """キー（クエリ・URL・ソース名）がこのワーカーの担当か"""
+        # 巡回シャードと同じハッシュをそのまま使うと偏るので、接頭辞を付けて別の分け方にする
+        return watchlist.shard_of(f"worker:{key}", self.count) == self.index
+
+    def share(self, total: int) -> int:
+        """全体で total 回の枠のうち、このワーカーの分"""
+        return total // self.count + (1 if self.index < total % self.count else 0)
+
+    def assign_queries(self, selected: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """選択済みのクエリから担当分を取り出し、実行日時を記録"""
+        assigned = {name: [q for q in queries if self.owns(q)] for name, queries in selected.items()}
+        planned = self.planned_at.isoformat()
+        for queries in assigned.values():
+            for q in queries:
+                self.queries[q] = {"last_run": planned}
+        print(f"ワーカー {self.label}: クエリ {sum(len(qs) for qs in assigned.values())}件を担当")
+        return assigned
+
+    def record_query_stats(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        """クエリ別の取得結果（query_manager.record_query_stats の代わりに部分結果へ）"""
+        for query, entry in stats.items():
+            self.queries.setdefault(query, {}).update(entry)
+
+    def release_queries(self, queries: List[str]) -> None:
+        """締め切りで実行しなかったクエリを実行日時の記録から外す（統合後も前回の状態のまま）"""
+        for query in queries:
+            self.queries.pop(query, None)
+
+    def write_partial(self, sink, sources: List[str]) -> None:
+        """部分結果を保存（締め切りで直接監視のページを打ち切ったら、巡回シャードは完了扱いにしない）"""
+        from . import deadline
+        from . import health
+        from . import quota
+        from . import snapshots
+
+        watch_shard = None
+        if "direct" in sources and not deadline.current.dropped.get("direct"):
+            shards = watchlist.shard_count()
+            watch_shard = [watchlist.rotation.next_shard(shards), shards]
+        partial = {
+            "run_id": self.run_id,
+            "worker": self.index + 1,
+            "workers": self.count,
+            "sources": sources,
+            "planned_at": self.planned_at.isoformat(),
+            "finished_at": clock.now().isoformat(),
+            "new": sink.new,
+            "recent": sink.recent,
+            "urls": sorted(sink.urls),
+            "queries": self.queries,
+            "quota": dict(quota.tracker.unsaved),
+            "health": health.tracker.pending(),
+            "snapshots": snapshots.store.pending() if "direct" in sources else {},
+            "watch_shard": watch_shard,
+        }
+        serialization.dump_file(self.path, partial)
+        print(f"部分結果を保存: {self.path}（新着 {len(sink.new)}件 / URL {len(sink.urls)}件）")
+
+
+def load_partials(run_id: str) -> List[Dict[str, Any]]:
+    """実行IDの部分結果（ワーカー番号順）"""
+    directory = partial_dir(run_id)
+    if not os.path.isdir(directory):
+        return []
+    partials = [
+        serialization.load_file(os.path.join(directory, name))
+        for name in os.listdir(directory) if name.startswith("worker-") and name.endswith(".json")
+    ]
+    return sorted(partials, key=lambda p: p["worker"])
+
+
+def merge(run_id: str, notify: bool = True) -> bool:
+    """全ワーカーの部分結果を統合して data/ に反映（揃っていなければ何もせず False）"""
+    from . import health
+    from . import main
+    from . import quota
+    from .query_manager import merge_query_entries
+
+    partials = load_partials(run_id)
+    if not partials:
+        print(f"部分結果がありません: {partial_dir(run_id)}")
+        return False
+    count = partials[0]["workers"]
+    missing = sorted(set(range(1, count + 1)) - {p["worker"] for p in partials})
+    if missing or any(p["workers"] != count for p in partials):
+        print(f"部分結果が揃っていません（{len(partials)}/{count}、未完了: {missing}）。統合を中止します")
+        return False
+    if len({p["planned_at"] for p in partials}) > 1:
+        print("警告: ワーカーごとにクエリ選択の時刻が異なります（担当が重複・欠落している可能性があります）")
+
+    print(f"=== 部分結果の統合: {run_id}（{count}ワーカー） ===")
+    seen_urls = main.load_seen_urls()
+
+    # 新着: ワーカー番号順・取得順に並べ、URLで重複排除（統合までに他の実行で既出になったものも除く）
+    new, new_urls = [], set()
+    for partial in partials:
+        for record in from_dicts(partial["new"]):
+            if record["url"] not in seen_urls and record["url"] not in new_urls:
+                new.append(record)
+                new_urls.add(record["url"])
+    recent, recent_urls = [], set()
+    for record in [r for p in partials for r in from_dicts(p["recent"])] + new:
+        if record["url"] not in recent_urls:
+            recent.append(record)
+            recent_urls.add(record["url"])
+
+    main.append_results(new)
+    print(f"結果に追加: {len(new)}件")
+    for partial in partials:
+        seen_urls.update(partial["urls"])
+    main.save_seen_urls(seen_urls)
+    print(f"既出URL更新: {len(seen_urls)}件")
+
+    queries: Dict[str, Dict[str, Any]] = {}
+    for partial in partials:
+        queries.update(partial["queries"])
+    merge_query_entries(queries)
+    quota.tracker.add(sum(p["quota"]["used"] for p in partials), sum(p["quota"]["pages"] for p in partials))
+    quota.tracker.save()
+    for partial in partials:
+        health.tracker.absorb(partial["health"])
+    health.tracker.save()
+
+    shards = {tuple(p["watch_shard"]) for p in partials if p.get("watch_shard")}
+    if len(shards) == 1 and all(p.get("watch_shard") for p in partials):
+        watchlist.rotation.complete(*shards.pop())
+
+    if notify:
+        main.notify_results(recent)
+    # 直接監視の版の記録は、検出した変更を保存・通知した後に保存
+    entries: Dict[str, Dict[str, Any]] = {}
+    for partial in partials:
+        entries.update(partial.get("snapshots", {}))
+    if entries:
+        from . import snapshots
+        snapshots.store.save(entries)
+    shutil.rmtree(partial_dir(run_id))
+    print(f"=== 統合完了: {clock.now().isoformat()} ===")
+    return True
@@ -2,16 +2,29 @@
 
 let allData = [];
 let filteredData = [];
+let stats = null;
+
+// 集計（data/stats.json）の読み込み（なければ null。その場合は全件から数える）
+async function loadStats() {
+    try {
+        const response = await fetch('../data/stats.json');
+        return response.ok ? await response.json() : null;
+    } catch (error) {
+        return null;
+    }
+}
 
 // データ読み込み
 async function loadData() {
     try {
+        const statsRequest = loadStats();
         const response = await fetch('../data/results.json');
         if (!response.ok) {
             throw new Error('データの読み込みに失敗しました');
         }
         allData = await response.json();
         filteredData = [...allData];
+        stats = await statsRequest;
         updateStats();
         sortData('update_desc');  // デフォルトで更新日順にソート
         renderResults();
@@ -26,12 +39,20 @@ async function loadData() {
     }
 }
 
-// 統計情報更新
+// 統計情報更新（stats.json があればその集計を使う）
 function updateStats() {
     const totalCount = document.getElementById('total-count');
     const newCount = document.getElementById('new-count');
     const lastUpdate = document.getElementById('last-update');
 
+    if (stats) {
+        totalCount.textContent = stats.total;
+        newCount.textContent = countRecentHours(stats.fetched_by_hour);
+        lastUpdate.textContent = stats.last_fetched_at ? formatDateTime(new Date(stats.last_fetched_at)) : '-';
+        updatePrefectureCounts(stats.by_prefecture);
+        return;
+    }
+
     totalCount.textContent = allData.length;
 
     // 24時間以内の新着をカウント
@@ -52,6 +73,23 @@ function updateStats() {
     }
 }
 
+// 1時間ごとの取得件数（"YYYY-MM-DDTHH" -> 件数）から24時間以内の件数を合計
+function countRecentHours(fetchedByHour) {
+    const oneDayAgo = new Date(Date.now() - 24 * 60 * 60 * 1000);
+    return Object.entries(fetchedByHour || {})
+        .filter(([hour]) => new Date(`${hour}:59:59`) > oneDayAgo)
+        .reduce((sum, [, count]) => sum + count, 0);
+}
+
+// 都道府県フィルターの選択肢に件数を表示
+function updatePrefectureCounts(byPrefecture) {
+    document.querySelectorAll('#prefecture option').forEach(option => {
+        if (option.value) {
+            option.textContent = `${option.value} (${(byPrefecture || {})[option.value] || 0})`;
+        }
+    });
+}
+
 // 日付フォーマット（日時）
 function formatDateTime(date) {
     const month = date.getMonth() + 1;
@@ -82,6 +120,11 @@ function isNew(fetchedAt) {
     return new Date(fetchedAt) > oneDayAgo;
 }
 
+// リンク確認でページが見つからなかったか（status 0 は接続エラー）
+function isDeadLink(item) {
+    return item.checked_at != null && (item.status === 0 || item.status >= 400);
+}
+
 // 結果表示
 function renderResults() {
     const container = document.getElementById('results');
@@ -98,17 +141,19 @@ function renderResults() {
     const html = filteredData.map(item => {
         const isNewItem = isNew(item.fetched_at);
         const updateDateFormatted = formatDate(item.update_date);
+        const linkUrl = item.final_url || item.url;
 
         return `
             <article class="result-card ${isNewItem ? 'new' : ''}">
                 <div class="result-header">
                     <h2 class="result-title">
-                        <a href="${escapeHtml(item.url)}" target="_blank" rel="noopener noreferrer">
+                        <a href="${escapeHtml(linkUrl)}" target="_blank" rel="noopener noreferrer">
                             ${escapeHtml(item.title || '無題')}
                         </a>
                     </h2>
                     <div class="result-badges">
                         ${isNewItem ? '<span class="badge badge-new">NEW</span>' : ''}
+                        ${isDeadLink(item) ? '<span class="badge badge-dead">リンク切れ</span>' : ''}
                         ${item.update_date ? `<span class="badge badge-date">更新: ${updateDateFormatted}</span>` : ''}
                         ${item.prefecture ? `<span class="badge badge-prefecture">${escapeHtml(item.prefecture)}</span>` : ''}
                     </div>